@@ -0,0 +1,66 @@
+from django.http import FileResponse
+from django.utils import timezone
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from .exportaciones import marcar_huerfanos
+from .models import TrabajoExportacion
+
+
+class TrabajoExportacionSerializer(serializers.ModelSerializer):
+    progreso = serializers.SerializerMethodField()
+    descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrabajoExportacion
+        fields = [
+            "id", "recurso", "estado", "total", "procesadas", "progreso",
+            "descarga", "error", "creado", "terminado",
+        ]
+        read_only_fields = fields
+
+    def get_progreso(self, obj):
+        """Porcentaje de filas escritas, o ``None`` mientras no se conoce el total."""
+        if obj.estado == TrabajoExportacion.COMPLETADO:
+            return 100
+        if not obj.total:
+            return None
+        return min(100, obj.procesadas * 100 // obj.total)
+
+    def get_descarga(self, obj):
+        if obj.estado != TrabajoExportacion.COMPLETADO:
+            return None
+        return reverse("exportacion-descargar", args=[obj.pk], request=self.context.get("request"))
+
+
+class TrabajoExportacionViewSet(viewsets.ReadOnlyModelViewSet):
+    """Estado y descarga de las exportaciones en segundo plano del usuario."""
+
+    serializer_class = TrabajoExportacionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return TrabajoExportacion.objects.filter(usuario=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        marcar_huerfanos(self.get_queryset())
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        marcar_huerfanos(self.get_queryset())
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=True, methods=["get"])
+    def descargar(self, request, pk=None):
+        trabajo = self.get_object()
+        if trabajo.estado != TrabajoExportacion.COMPLETADO or not trabajo.archivo:
+            return Response({"detail": "La exportación aún no está lista."}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(
+            trabajo.archivo.open("rb"),
+            as_attachment=True,
+            filename=f"{trabajo.recurso}-{timezone.localtime(trabajo.terminado):%Y%m%d-%H%M%S}.csv",
+            content_type="text/csv; charset=utf-8",
+        )
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ComunConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "comun"
+    verbose_name = "Infraestructura común de la API"
@@ -0,0 +1,136 @@
+"""
+Caché compartida de respuestas GET para visitantes anónimos.
+
+Las claves incluyen una versión por modelo; cualquier cambio del modelo
+(``invalidar_respuestas``) la renueva y deja huérfanas todas las entradas
+anteriores sin tener que enumerarlas. Ante una falta, un solo proceso
+recalcula (candado con ``cache.add``) y el resto espera su resultado en lugar
+de ir todos a la base de datos a la vez.
+
+Solo se cachea entre solicitudes con una caché compartida (``CACHE_URL``):
+con la caché en memoria cada proceso vería solo sus propias invalidaciones.
+
+Los cambios frecuentes (los contadores de cupos con cada reserva) renuevan la
+versión con ``espaciado``: como mucho una vez por ventana, y el cambio que cae
+dentro de una ventana ya usada queda pendiente hasta la primera lectura
+posterior a ella.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+CABECERAS_GUARDADAS = ("ETag", "Last-Modified", "Cache-Control")
+ESPERA_CANDADO = 5
+INTERVALO_ESPERA = 0.05
+
+
+def _clave_version(model):
+    return f"respuestas:{model._meta.label_lower}:version"
+
+
+def _clave_ventana(model):
+    return f"respuestas:{model._meta.label_lower}:ventana"
+
+
+def _clave_pendiente(model):
+    return f"respuestas:{model._meta.label_lower}:pendiente"
+
+
+def _renovar(model):
+    version = time.time_ns()
+    cache.set(_clave_version(model), version, timeout=None)
+    return version
+
+
+def _version(model):
+    clave, pendiente = _clave_version(model), _clave_pendiente(model)
+    valores = cache.get_many([clave, pendiente])
+    espaciado = valores.get(pendiente)
+    if espaciado and cache.add(_clave_ventana(model), 1, timeout=espaciado):
+        # Hubo cambios dentro de una ventana ya cerrada: se aplican ahora.
+        cache.delete(pendiente)
+        return _renovar(model)
+    version = valores.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_respuestas(model, espaciado=0):
+    """
+    Descarta (al confirmar la transacción) las respuestas cacheadas de ``model``.
+
+    Con ``espaciado`` la versión se renueva a lo sumo una vez cada tantos
+    segundos; si la ventana está en uso el cambio queda pendiente.
+    """
+    def renovar():
+        if not espaciado or cache.add(_clave_ventana(model), 1, timeout=espaciado):
+            _renovar(model)
+        else:
+            cache.set(_clave_pendiente(model), espaciado, timeout=None)
+
+    transaction.on_commit(renovar)
+
+
+class CacheAnonimaMixin:
+    """
+    Cachea ``list`` y ``retrieve`` para usuarios anónimos, por ruta y query
+    string normalizado (parámetros ordenados, vacíos descartados).
+    """
+
+    def _clave_anonima(self, request):
+        model = self.queryset.model
+        parametros = sorted((k, v) for k, valores in request.query_params.lists() for v in valores if v != "")
+        firma = repr((request.path, parametros, getattr(request, "accepted_media_type", None)))
+        return f"respuestas:{model._meta.label_lower}:{_version(model)}:{hashlib.md5(firma.encode()).hexdigest()}"
+
+    def _desde_cache(self, request, guardada):
+        data, cabeceras = guardada
+        response = get_conditional_response(request, etag=cabeceras.get("ETag")) or Response(data)
+        for cabecera, valor in cabeceras.items():
+            response[cabecera] = valor
+        response["X-Cache"] = "HIT"
+        return response
+
+    def _con_cache_anonima(self, request, generar):
+        if not settings.CACHE_COMPARTIDA or (request.user and request.user.is_authenticated):
+            return generar()
+        clave = self._clave_anonima(request)
+        guardada = cache.get(clave)
+        if guardada is not None:
+            return self._desde_cache(request, guardada)
+
+        candado = f"{clave}:candado"
+        if not cache.add(candado, 1, timeout=ESPERA_CANDADO):
+            # Otro proceso ya está recalculando esta respuesta.
+            limite = time.monotonic() + ESPERA_CANDADO
+            while time.monotonic() < limite:
+                time.sleep(INTERVALO_ESPERA)
+                guardada = cache.get(clave)
+                if guardada is not None:
+                    return self._desde_cache(request, guardada)
+            return generar()
+
+        try:
+            response = generar()
+            if response.status_code == 200 and isinstance(response, Response):
+                cabeceras = {c: response[c] for c in CABECERAS_GUARDADAS if c in response}
+                cache.set(clave, (response.data, cabeceras), settings.API_CACHE_ANONIMA_SEGUNDOS)
+                response["X-Cache"] = "MISS"
+            return response
+        finally:
+            cache.delete(candado)
+
+    def list(self, request, *args, **kwargs):
+        return self._con_cache_anonima(request, lambda: super(CacheAnonimaMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._con_cache_anonima(
+            request, lambda: super(CacheAnonimaMixin, self).retrieve(request, *args, **kwargs)
+        )
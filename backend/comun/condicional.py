@@ -0,0 +1,74 @@
+"""
+GET condicional (ETag / Last-Modified) para los viewsets DRF.
+
+El detalle deriva su ETag y su Last-Modified de ``actualizado`` del objeto y
+el listado solo un ETag, a partir de un agregado barato sobre el queryset
+filtrado (máximo de ``actualizado`` y conteo), de modo que un cliente que ya
+tiene la página recibe 304 sin que se serialice nada. El listado no envía
+Last-Modified: borrar una fila no mueve el máximo de ``actualizado`` y un
+``If-Modified-Since`` respondería 304 con la página vieja; el conteo del ETag
+sí lo detecta. ``campos_modificado`` permite sumar campos de relaciones que
+también aparecen en la respuesta (p. ej. ``evento__actualizado``).
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+class GetCondicionalMixin:
+    campos_modificado = ("actualizado",)
+
+    def _etag(self, request, *huella):
+        usuario = request.user.pk if request.user and request.user.is_authenticated else None
+        # La misma huella puede renderizarse distinto según usuario, serializer o formato.
+        firma = repr((
+            request.get_full_path(),
+            usuario,
+            self.get_serializer_class().__name__,
+            getattr(request, "accepted_media_type", None),
+            *huella,
+        ))
+        return quote_etag(hashlib.md5(firma.encode()).hexdigest())
+
+    def _responder(self, request, etag, modificados, generar):
+        fechas = [fecha for fecha in modificados if fecha is not None]
+        ultimo = int(max(fechas).timestamp()) if fechas else None
+        response = get_conditional_response(request, etag=etag, last_modified=ultimo) or generar()
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if ultimo is not None:
+                response["Last-Modified"] = http_date(ultimo)
+            # El navegador guarda la respuesta pero la revalida siempre: los
+            # clientes existentes obtienen 304 sin cambios en el frontend.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        paginator = self.paginator
+        if paginator is not None and getattr(paginator, "usa_cursor", lambda request: False)(request):
+            # La huella recorrería todo el filtro, justo lo que el cursor evita.
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        huella = queryset.order_by().aggregate(
+            total=Count("pk"),
+            **{f"max_{i}": Max(campo) for i, campo in enumerate(self.campos_modificado)},
+        )
+        modificados = [huella[f"max_{i}"] for i in range(len(self.campos_modificado))]
+        etag = self._etag(request, huella["total"], *modificados)
+        return self._responder(request, etag, (), lambda: super(GetCondicionalMixin, self).list(
+            request, *args, **kwargs
+        ))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        modificados = []
+        for campo in self.campos_modificado:
+            valor = instance
+            for parte in campo.split("__"):
+                valor = getattr(valor, parte, None) if valor is not None else None
+            modificados.append(valor)
+        etag = self._etag(request, instance.pk, *modificados)
+        return self._responder(request, etag, modificados, lambda: Response(self.get_serializer(instance).data))
@@ -0,0 +1,33 @@
+"""
+Planes de consulta declarativos por acción para los viewsets DRF.
+
+Cada viewset declara qué relaciones carga y qué columnas lee según la acción,
+de modo que una página cueste un número fijo de consultas sin importar
+cuántas filas incluya::
+
+    plan_consultas = {
+        "*": {"prefetch_related": ["zonas"]},
+        "autocomplete": {},
+    }
+
+``"*"`` es el plan por defecto para las acciones sin plan propio.
+"""
+
+
+class PlanConsultasMixin:
+    plan_consultas = {}
+
+    def get_plan_consultas(self):
+        action = getattr(self, "action", None)
+        return self.plan_consultas.get(action, self.plan_consultas.get("*", {}))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        plan = self.get_plan_consultas()
+        if plan.get("select_related"):
+            queryset = queryset.select_related(*plan["select_related"])
+        if plan.get("prefetch_related"):
+            queryset = queryset.prefetch_related(*plan["prefetch_related"])
+        if plan.get("only"):
+            queryset = queryset.only(*plan["only"])
+        return queryset
@@ -0,0 +1,189 @@
+"""
+Exportaciones CSV en segundo plano.
+
+``POST /api/<recurso>/export/async/`` (con los mismos filtros que
+``export``) crea un ``TrabajoExportacion`` y responde de inmediato; un hilo
+escribe el CSV por bloques en ``EXPORTACIONES_ROOT`` (privado, con nombre
+aleatorio) e informa el avance, que se consulta en
+``/api/exportaciones/<id>/`` hasta que el archivo está listo para
+``/api/exportaciones/<id>/descargar/``.
+
+Los hilos viven en el proceso: si se reinicia, sus trabajos quedan sin avance.
+``marcar_huerfanos`` los da por fallidos al arrancar el servidor y al
+consultar el estado, para que no queden pendientes para siempre.
+
+Si el mismo usuario pide el mismo recurso con los mismos filtros mientras
+hay un trabajo en curso o un archivo aún vigente
+(``EXPORTACIONES_VIGENCIA_MINUTOS``), se devuelve ese trabajo en lugar de
+generar otro.
+"""
+import hashlib
+import json
+import logging
+import secrets
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from cuentas.export_utils import csv_chunks
+
+from .models import TrabajoExportacion
+
+logger = logging.getLogger(__name__)
+
+# Parámetros que no cambian el contenido del archivo.
+PARAMETROS_IGNORADOS = {"page", "page_size", "paginacion", "cursor", "count", "format", "modo"}
+# Un trabajo sin avance durante este plazo se da por perdido (p. ej. el proceso se reinició).
+PLAZO_SIN_AVANCE = timedelta(minutes=5)
+
+_ejecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exportaciones")
+
+
+def _huella(request, recurso, campos):
+    parametros = sorted(
+        (k, v) for k, valores in request.query_params.lists()
+        for v in valores if v != "" and k not in PARAMETROS_IGNORADOS
+    )
+    firma = json.dumps([recurso, request.user.pk, parametros, repr(campos)])
+    return hashlib.sha256(firma.encode("utf-8")).hexdigest()
+
+
+def ejecutar_exportacion(trabajo_id, queryset, campos):
+    """Escribe el CSV del trabajo, actualizando ``procesadas`` después de cada bloque."""
+    trabajos = TrabajoExportacion.objects.filter(pk=trabajo_id)
+    try:
+        trabajos.update(estado=TrabajoExportacion.EN_PROCESO, total=queryset.count(), actualizado=timezone.now())
+        procesadas = 0
+        with tempfile.TemporaryFile() as temporal:
+            for texto, filas in csv_chunks(queryset, campos):
+                temporal.write(texto.encode("utf-8"))
+                if filas:
+                    procesadas += filas
+                    trabajos.update(procesadas=procesadas, actualizado=timezone.now())
+            temporal.seek(0)
+            trabajo = trabajos.get()
+            # Nombre imposible de adivinar; la descarga usa uno legible.
+            nombre = f"{trabajo.recurso}-{secrets.token_urlsafe(24)}.csv"
+            trabajo.archivo.save(nombre, File(temporal), save=False)
+        trabajo.estado = TrabajoExportacion.COMPLETADO
+        trabajo.procesadas = procesadas
+        trabajo.terminado = timezone.now()
+        trabajo.save(update_fields=["archivo", "estado", "procesadas", "terminado", "actualizado"])
+    except Exception as exc:
+        logger.exception("Falló la exportación %s", trabajo_id)
+        ahora = timezone.now()
+        trabajos.update(estado=TrabajoExportacion.FALLIDO, error=str(exc), terminado=ahora, actualizado=ahora)
+
+
+def _ejecutar_en_hilo(trabajo_id, queryset, campos):
+    # El hilo abre su propia conexión; dentro de la petición no se debe cerrar la de ella.
+    try:
+        ejecutar_exportacion(trabajo_id, queryset, campos)
+    finally:
+        close_old_connections()
+
+
+def marcar_huerfanos(trabajos=None):
+    """
+    Da por fallidos los trabajos pendientes o en proceso sin avance durante
+    ``PLAZO_SIN_AVANCE``: su hilo se perdió con un reinicio. Devuelve cuántos.
+    """
+    ahora = timezone.now()
+    trabajos = TrabajoExportacion.objects.all() if trabajos is None else trabajos
+    return trabajos.filter(
+        estado__in=[TrabajoExportacion.PENDIENTE, TrabajoExportacion.EN_PROCESO],
+        actualizado__lt=ahora - PLAZO_SIN_AVANCE,
+    ).update(
+        estado=TrabajoExportacion.FALLIDO,
+        error="El proceso que generaba la exportación se detuvo. Vuelve a solicitarla.",
+        terminado=ahora,
+        actualizado=ahora,
+    )
+
+
+def marcar_huerfanos_al_iniciar():
+    """Para el arranque del servidor (``wsgi``/``asgi``); un fallo de la base no impide arrancar."""
+    try:
+        marcar_huerfanos()
+    except DatabaseError:
+        logger.exception("No se pudieron revisar las exportaciones interrumpidas")
+    finally:
+        # No heredar la conexión si el servidor hace fork de los workers después.
+        connections.close_all()
+
+
+def solicitar_exportacion(request, recurso, queryset, campos):
+    """
+    Devuelve ``(trabajo, nuevo)``: un trabajo vigente con la misma huella o
+    uno nuevo, que se encola al confirmar la transacción.
+    """
+    huella = _huella(request, recurso, campos)
+    ahora = timezone.now()
+    vigentes = TrabajoExportacion.objects.filter(
+        Q(estado=TrabajoExportacion.COMPLETADO,
+          terminado__gte=ahora - timedelta(minutes=settings.EXPORTACIONES_VIGENCIA_MINUTOS))
+        | Q(estado__in=[TrabajoExportacion.PENDIENTE, TrabajoExportacion.EN_PROCESO],
+            actualizado__gte=ahora - PLAZO_SIN_AVANCE),
+        huella=huella,
+    )
+    existente = vigentes.order_by("-creado").first()
+    if existente is not None:
+        return existente, False
+
+    trabajo = TrabajoExportacion.objects.create(usuario=request.user, recurso=recurso, huella=huella)
+
+    def encolar():
+        if settings.EXPORTACIONES_EN_SEGUNDO_PLANO:
+            _ejecutor.submit(_ejecutar_en_hilo, trabajo.pk, queryset, campos)
+        else:
+            ejecutar_exportacion(trabajo.pk, queryset, campos)
+
+    transaction.on_commit(encolar)
+    return trabajo, True
+
+
+def purgar_exportaciones(antes):
+    """Elimina los trabajos creados antes de ``antes`` y sus archivos. Devuelve cuántos se borraron."""
+    total = 0
+    for trabajo in TrabajoExportacion.objects.filter(creado__lt=antes).only("pk", "archivo").iterator():
+        if trabajo.archivo:
+            trabajo.archivo.delete(save=False)
+        trabajo.delete()
+        total += 1
+    return total
+
+
+class ExportacionAsincronaMixin:
+    """
+    Agrega ``export/async`` a un viewset que define ``campos_exportacion``,
+    con los mismos permisos que su acción ``export``.
+    """
+
+    campos_exportacion = []
+
+    def get_permissions(self):
+        if self.action == "export_async":
+            # El trabajo pertenece a quien lo pide, así que siempre hace falta sesión.
+            clases = self.export.kwargs.get("permission_classes", self.permission_classes)
+            return [IsAuthenticated(), *(clase() for clase in clases)]
+        return super().get_permissions()
+
+    @action(detail=False, methods=["post"], url_path="export/async")
+    def export_async(self, request):
+        """Encola la exportación CSV de los registros filtrados y devuelve el trabajo."""
+        from .api import TrabajoExportacionSerializer
+
+        queryset = self.filter_queryset(self.get_queryset())
+        trabajo, nuevo = solicitar_exportacion(request, self.basename, queryset, self.campos_exportacion)
+        serializer = TrabajoExportacionSerializer(trabajo, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED if nuevo else status.HTTP_200_OK)
@@ -0,0 +1,93 @@
+"""
+Soporte para el encabezado ``Idempotency-Key`` en los POST de creación.
+
+La primera respuesta (no 5xx) se guarda y se repite tal cual en los reintentos
+con la misma clave durante ``IDEMPOTENCIA_TTL_HORAS``, sin volver a validar ni
+tocar el aforo.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import RespuestaIdempotente
+
+ENCABEZADO = "Idempotency-Key"
+MAX_LARGO_CLAVE = 255
+# Una solicitud interrumpida no bloquea su clave más allá de este plazo.
+PLAZO_EN_CURSO = timedelta(minutes=1)
+
+
+def _sha256(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _huella(request):
+    return _sha256(json.dumps(request.data, cls=JSONEncoder, sort_keys=True))
+
+
+def idempotente(view_method):
+    """Decora ``create``/``post`` de una vista DRF para respetar ``Idempotency-Key``."""
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        clave = request.headers.get(ENCABEZADO)
+        if not clave:
+            return view_method(self, request, *args, **kwargs)
+        if len(clave) > MAX_LARGO_CLAVE:
+            return Response({"detail": f"{ENCABEZADO} supera {MAX_LARGO_CLAVE} caracteres."}, status=400)
+
+        usuario = request.user.pk if request.user and request.user.is_authenticated else "anon"
+        digest = _sha256(f"{usuario}:{request.method}:{request.path}:{clave}")
+        huella = _huella(request)
+        ahora = timezone.now()
+
+        RespuestaIdempotente.objects.filter(clave=digest, expira__lte=ahora).delete()
+        registro, creado = RespuestaIdempotente.objects.get_or_create(
+            clave=digest,
+            defaults={"huella": huella, "expira": ahora + PLAZO_EN_CURSO},
+        )
+        if not creado:
+            if registro.huella != huella:
+                return Response(
+                    {"detail": f"{ENCABEZADO} ya se usó con otro contenido."},
+                    status=422,
+                )
+            if registro.estado == RespuestaIdempotente.EN_CURSO:
+                return Response({"detail": "La solicitud original aún se está procesando."}, status=409)
+            return Response(registro.cuerpo, status=registro.estado, headers={"Idempotent-Replayed": "true"})
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            registro.delete()
+            raise
+
+        if response.status_code >= 500:
+            registro.delete()
+            return response
+
+        registro.estado = response.status_code
+        registro.cuerpo = json.loads(json.dumps(response.data, cls=JSONEncoder))
+        registro.expira = timezone.now() + timedelta(hours=settings.IDEMPOTENCIA_TTL_HORAS)
+        registro.save(update_fields=["estado", "cuerpo", "expira"])
+        return response
+
+    return wrapper
+
+
+def purgar_vencidas(lote=5000):
+    """Elimina por lotes las respuestas vencidas. Devuelve cuántas se borraron."""
+    total = 0
+    while True:
+        claves = list(
+            RespuestaIdempotente.objects.filter(expira__lte=timezone.now()).values_list("clave", flat=True)[:lote]
+        )
+        if not claves:
+            return total
+        total += RespuestaIdempotente.objects.filter(clave__in=claves).delete()[0]
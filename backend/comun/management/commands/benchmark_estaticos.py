@@ -0,0 +1,85 @@
+"""
+Mide la primera carga del SPA servido por Django + WhiteNoise.
+
+Descarga ``index.html`` y los scripts/estilos que referencia con cada
+codificación (sin comprimir, gzip y brotli) e informa bytes transferidos,
+tiempo total y las cabeceras de caché. Luego repite la carga como un
+navegador con caché: el índice debe responder 304 y los assets deben estar
+marcados ``immutable``.
+
+Requiere un servidor en ejecución con ``collectstatic``, ``STATIC_MANIFEST=1`` y
+``FRONTEND_SPA=1``:
+
+    python manage.py benchmark_estaticos --url http://localhost:8000/inicio
+"""
+import re
+import time
+from urllib.parse import urljoin
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+CODIFICACIONES = ["identity", "gzip", "br"]
+_ASSETS = re.compile(r"""<(?:script[^>]+src|link[^>]+href)=["']([^"']+\.(?:js|css))["']""")
+
+
+class Command(BaseCommand):
+    help = "Mide bytes y tiempo de la primera carga del frontend por codificación."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000/inicio")
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def _descargar(self, sesion, url, codificacion, cabeceras=None):
+        inicio = time.perf_counter()
+        response = sesion.get(url, headers={"Accept-Encoding": codificacion, **(cabeceras or {})}, stream=True)
+        transferidos = len(response.raw.read(decode_content=False))
+        return response, transferidos, time.perf_counter() - inicio
+
+    def handle(self, *args, **options):
+        sesion = requests.Session()
+        response = sesion.get(options["url"])
+        if response.status_code != 200:
+            raise CommandError(f"{options['url']} respondió {response.status_code}.")
+        assets = [urljoin(options["url"], ruta) for ruta in _ASSETS.findall(response.text)]
+        if not assets:
+            raise CommandError("El índice no referencia scripts ni estilos.")
+        urls = [options["url"], *assets]
+
+        for codificacion in CODIFICACIONES:
+            total_bytes = 0
+            tiempos = []
+            for _ in range(options["repeticiones"]):
+                total_bytes = 0
+                inicio = time.perf_counter()
+                for url in urls:
+                    _, transferidos, _ = self._descargar(sesion, url, codificacion)
+                    total_bytes += transferidos
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            self.stdout.write(
+                f"{codificacion:<9} {len(urls)} archivos  {total_bytes / 1024:10.1f} KiB  "
+                f"mejor {min(tiempos):7.1f} ms  mediana {sorted(tiempos)[len(tiempos) // 2]:7.1f} ms"
+            )
+
+        fallas = []
+        indice, _, _ = self._descargar(sesion, options["url"], "br")
+        revalidado, _, _ = self._descargar(
+            sesion, options["url"], "br", {"If-None-Match": indice.headers.get("ETag", "")}
+        )
+        self.stdout.write(f"\nindex.html  Cache-Control: {indice.headers.get('Cache-Control')}  "
+                          f"revalidación: {revalidado.status_code}")
+        if revalidado.status_code != 304:
+            fallas.append("index.html no responde 304 con su ETag")
+
+        for url in assets:
+            response, _, _ = self._descargar(sesion, url, "br")
+            cache_control = response.headers.get("Cache-Control", "")
+            self.stdout.write(
+                f"{url.rsplit('/', 1)[-1]:<40} {response.headers.get('Content-Encoding', 'identity'):<8} {cache_control}"
+            )
+            if "immutable" not in cache_control:
+                fallas.append(f"{url} sin caché immutable")
+
+        if fallas:
+            raise CommandError("; ".join(fallas))
+        self.stdout.write(self.style.SUCCESS("Caché y compresión configuradas correctamente."))
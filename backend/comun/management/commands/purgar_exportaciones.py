@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from comun.exportaciones import purgar_exportaciones
+
+
+class Command(BaseCommand):
+    help = "Elimina los trabajos de exportación antiguos y sus archivos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--horas", type=int, default=settings.EXPORTACIONES_RETENCION_HORAS)
+
+    def handle(self, *args, **options):
+        borrados = purgar_exportaciones(timezone.now() - timedelta(hours=options["horas"]))
+        if borrados or options["verbosity"] > 1:
+            self.stdout.write(f"Exportaciones eliminadas: {borrados}")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from comun.idempotencia import purgar_vencidas
+
+
+class Command(BaseCommand):
+    help = "Elimina las respuestas idempotentes vencidas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument("--cada", type=int, default=0, help="Repite cada N segundos (0 = una vez).")
+
+    def handle(self, *args, **options):
+        while True:
+            borradas = purgar_vencidas(lote=options["lote"])
+            if borradas or options["verbosity"] > 1:
+                self.stdout.write(f"Respuestas idempotentes eliminadas: {borradas}")
+            if not options["cada"]:
+                break
+            time.sleep(options["cada"])
@@ -0,0 +1,25 @@
+from django.db import connection
+
+
+class ConteoConsultasMiddleware:
+    """
+    Agrega ``X-Query-Count`` con las consultas SQL ejecutadas por la solicitud.
+
+    Solo se activa con ``API_QUERY_COUNT_HEADER=1``; lo usan los benchmarks de carga.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        consultas = 0
+
+        def contar(execute, sql, params, many, context):
+            nonlocal consultas
+            consultas += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            response = self.get_response(request)
+        response["X-Query-Count"] = str(consultas)
+        return response
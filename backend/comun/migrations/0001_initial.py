@@ -0,0 +1,27 @@
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RespuestaIdempotente",
+            fields=[
+                ("clave", models.CharField(help_text="SHA-256 de usuario, ruta y clave.", max_length=64, primary_key=True, serialize=False, verbose_name="Clave")),
+                ("huella", models.CharField(help_text="SHA-256 del cuerpo de la solicitud.", max_length=64, verbose_name="Huella")),
+                ("estado", models.PositiveSmallIntegerField(default=0, verbose_name="Estado HTTP")),
+                ("cuerpo", models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name="Cuerpo")),
+                ("expira", models.DateTimeField(verbose_name="Expira")),
+            ],
+            options={
+                "verbose_name": "respuesta idempotente",
+                "verbose_name_plural": "respuestas idempotentes",
+                "indexes": [models.Index(fields=["expira"], name="idempotencia_expira_idx")],
+            },
+        ),
+    ]
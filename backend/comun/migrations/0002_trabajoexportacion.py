@@ -0,0 +1,42 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comun", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrabajoExportacion",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("recurso", models.CharField(max_length=30, verbose_name="Recurso")),
+                ("huella", models.CharField(help_text="SHA-256 de recurso, usuario y filtros.", max_length=64, verbose_name="Huella")),
+                ("estado", models.CharField(choices=[("pendiente", "Pendiente"), ("en_proceso", "En proceso"), ("completado", "Completado"), ("fallido", "Fallido")], default="pendiente", max_length=20, verbose_name="Estado")),
+                ("total", models.PositiveIntegerField(blank=True, null=True, verbose_name="Total de filas")),
+                ("procesadas", models.PositiveIntegerField(default=0, verbose_name="Filas procesadas")),
+                ("archivo", models.FileField(blank=True, upload_to="exportaciones/", verbose_name="Archivo")),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                ("creado", models.DateTimeField(auto_now_add=True, verbose_name="Creado")),
+                ("actualizado", models.DateTimeField(auto_now=True, verbose_name="Actualizado")),
+                ("terminado", models.DateTimeField(blank=True, null=True, verbose_name="Terminado")),
+                ("usuario", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="exportaciones", to=settings.AUTH_USER_MODEL, verbose_name="Usuario")),
+            ],
+            options={
+                "verbose_name": "trabajo de exportación",
+                "verbose_name_plural": "trabajos de exportación",
+                "ordering": ["-creado"],
+                "indexes": [
+                    models.Index(fields=["huella", "-creado"], name="exportacion_huella_idx"),
+                    models.Index(fields=["creado"], name="exportacion_creado_idx"),
+                ],
+            },
+        ),
+    ]
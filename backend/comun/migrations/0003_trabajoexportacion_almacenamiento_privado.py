@@ -0,0 +1,35 @@
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from django.utils import timezone
+
+import comun.models
+
+
+def retirar_archivos_publicos(apps, schema_editor):
+    """Borra los CSV que quedaron bajo MEDIA_ROOT; esos trabajos deben pedirse de nuevo."""
+    TrabajoExportacion = apps.get_model("comun", "TrabajoExportacion")
+    ahora = timezone.now()
+    for trabajo in TrabajoExportacion.objects.exclude(archivo="").only("pk", "archivo").iterator():
+        default_storage.delete(trabajo.archivo.name)
+        TrabajoExportacion.objects.filter(pk=trabajo.pk).update(
+            archivo="",
+            estado="fallido",
+            error="El archivo se retiró al moverse las exportaciones a un almacenamiento privado.",
+            terminado=ahora,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comun", "0002_trabajoexportacion"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="trabajoexportacion",
+            name="archivo",
+            field=models.FileField(blank=True, storage=comun.models.almacenamiento_exportaciones, upload_to="", verbose_name="Archivo"),
+        ),
+        migrations.RunPython(retirar_archivos_publicos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class AlmacenamientoPrivado(FileSystemStorage):
+    """Archivos en disco sin URL pública: se entregan solo desde una vista con permisos."""
+
+    def url(self, name):
+        raise ValueError("Este almacenamiento no tiene URL pública.")
+
+
+def almacenamiento_exportaciones():
+    """Almacenamiento privado de los CSV exportados (``EXPORTACIONES_ROOT``)."""
+    return storages["exportaciones"]
+
+
+class RespuestaIdempotente(models.Model):
+    """Primera respuesta de un POST con ``Idempotency-Key``, para repetirla en reintentos."""
+
+    EN_CURSO = 0
+
+    clave = models.CharField("Clave", max_length=64, primary_key=True, help_text="SHA-256 de usuario, ruta y clave.")
+    huella = models.CharField("Huella", max_length=64, help_text="SHA-256 del cuerpo de la solicitud.")
+    estado = models.PositiveSmallIntegerField("Estado HTTP", default=EN_CURSO)
+    cuerpo = models.JSONField("Cuerpo", null=True, blank=True, encoder=DjangoJSONEncoder)
+    expira = models.DateTimeField("Expira")
+
+    class Meta:
+        verbose_name = "respuesta idempotente"
+        verbose_name_plural = "respuestas idempotentes"
+        indexes = [
+            models.Index(fields=["expira"], name="idempotencia_expira_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.clave[:12]} ({self.estado})"
+
+
+class TrabajoExportacion(models.Model):
+    """Exportación CSV generada en segundo plano; el archivo queda en ``EXPORTACIONES_ROOT``."""
+
+    PENDIENTE = "pendiente"
+    EN_PROCESO = "en_proceso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
+    ESTADOS = [
+        (PENDIENTE, "Pendiente"),
+        (EN_PROCESO, "En proceso"),
+        (COMPLETADO, "Completado"),
+        (FALLIDO, "Fallido"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="exportaciones", verbose_name="Usuario"
+    )
+    recurso = models.CharField("Recurso", max_length=30)
+    huella = models.CharField("Huella", max_length=64, help_text="SHA-256 de recurso, usuario y filtros.")
+    estado = models.CharField("Estado", max_length=20, choices=ESTADOS, default=PENDIENTE)
+    total = models.PositiveIntegerField("Total de filas", null=True, blank=True)
+    procesadas = models.PositiveIntegerField("Filas procesadas", default=0)
+    archivo = models.FileField("Archivo", storage=almacenamiento_exportaciones, blank=True)
+    error = models.TextField("Error", blank=True)
+    creado = models.DateTimeField("Creado", auto_now_add=True)
+    actualizado = models.DateTimeField("Actualizado", auto_now=True)
+    terminado = models.DateTimeField("Terminado", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "trabajo de exportación"
+        verbose_name_plural = "trabajos de exportación"
+        ordering = ["-creado"]
+        indexes = [
+            models.Index(fields=["huella", "-creado"], name="exportacion_huella_idx"),
+            models.Index(fields=["creado"], name="exportacion_creado_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.recurso} {self.pk} ({self.estado})"
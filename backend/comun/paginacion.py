@@ -0,0 +1,145 @@
+"""
+Paginación por cursor (keyset) opcional sobre ``(fecha, hora, id)``.
+
+Por defecto se mantiene la paginación por número de página. Con
+``?paginacion=cursor`` (o al seguir un enlace ``next`` con ``?cursor=``) cada
+página filtra a partir de la última fila vista en lugar de usar OFFSET, y no
+se ejecuta ``COUNT(*)``: el costo es el mismo en la primera página que en la
+milésima. El total es opcional: ``?count=estimado`` (estimación del
+planificador) o ``?count=exacto``.
+
+``?ordering=fecha`` pagina en orden ascendente; cualquier otro orden se
+ignora en este modo. Las filas sin fecha u hora no se incluyen.
+"""
+import base64
+import json
+from datetime import date, time
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PaginacionConCursor(PageNumberPagination):
+    cursor_query_param = "cursor"
+    modo_query_param = "paginacion"
+    conteo_query_param = "count"
+    tamano_query_param = "page_size"
+    max_tamano = 200
+
+    def usa_cursor(self, request):
+        params = request.query_params
+        return params.get(self.modo_query_param) == "cursor" or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._cursor = self.usa_cursor(request)
+        if not self._cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        descendente = request.query_params.get("ordering", "").strip() != "fecha"
+        queryset = queryset.filter(fecha__isnull=False, hora__isnull=False)
+        self._total = self._contar(queryset, request.query_params.get(self.conteo_query_param))
+
+        posicion = self._decodificar(request.query_params.get(self.cursor_query_param))
+        if posicion:
+            fecha, hora, pk = posicion
+            if descendente:
+                siguiente = Q(fecha__lt=fecha) | Q(fecha=fecha, hora__lt=hora) | Q(fecha=fecha, hora=hora, pk__lt=pk)
+                # La cota simple sobre ``fecha`` permite al planificador recorrer el índice por rango.
+                queryset = queryset.filter(Q(fecha__lte=fecha) & siguiente)
+            else:
+                siguiente = Q(fecha__gt=fecha) | Q(fecha=fecha, hora__gt=hora) | Q(fecha=fecha, hora=hora, pk__gt=pk)
+                queryset = queryset.filter(Q(fecha__gte=fecha) & siguiente)
+
+        orden = ("-fecha", "-hora", "-pk") if descendente else ("fecha", "hora", "pk")
+        tamano = self._tamano(request)
+        filas = list(queryset.order_by(*orden)[: tamano + 1])
+        self._hay_siguiente = len(filas) > tamano
+        self.page_rows = filas[:tamano]
+        return self.page_rows
+
+    def _tamano(self, request):
+        try:
+            tamano = int(request.query_params.get(self.tamano_query_param, self.page_size))
+        except ValueError:
+            tamano = self.page_size
+        return min(max(tamano, 1), self.max_tamano)
+
+    def _contar(self, queryset, modo):
+        if modo == "exacto":
+            return queryset.count()
+        if modo == "estimado":
+            plan = json.loads(queryset.order_by().explain(format="json"))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        return None
+
+    def _decodificar(self, cursor):
+        if not cursor:
+            return None
+        try:
+            fecha, hora, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            return date.fromisoformat(fecha), time.fromisoformat(hora), int(pk)
+        except (ValueError, TypeError):
+            raise NotFound("Cursor inválido.")
+
+    def _codificar(self, fila):
+        posicion = [fila.fecha.isoformat(), fila.hora.isoformat(), fila.pk]
+        return base64.urlsafe_b64encode(json.dumps(posicion).encode()).decode()
+
+    def get_next_link(self):
+        if not self._cursor:
+            return super().get_next_link()
+        if not self._hay_siguiente:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.modo_query_param)
+        return replace_query_param(url, self.cursor_query_param, self._codificar(self.page_rows[-1]))
+
+    def get_paginated_response(self, data):
+        if not self._cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": self._total,
+            "next": self.get_next_link(),
+            "previous": None,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count"]["nullable"] = True
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.modo_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Usa 'cursor' para paginar por (fecha, hora, id) sin OFFSET ni COUNT.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor devuelto en 'next'.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.conteo_query_param,
+                "required": False,
+                "in": "query",
+                "description": "En modo cursor: 'estimado' o 'exacto' para incluir el total.",
+                "schema": {"type": "string", "enum": ["estimado", "exacto"]},
+            },
+            {
+                "name": self.tamano_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"En modo cursor: filas por página (máximo {self.max_tamano}).",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,187 @@
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.mixins import CreateModelMixin
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from eventos.models import Evento
+from reservas.api import ReservaViewSet
+from reservas.models import Reserva
+from .exportaciones import PLAZO_SIN_AVANCE, marcar_huerfanos
+from .models import AlmacenamientoPrivado, RespuestaIdempotente, TrabajoExportacion
+
+
+@override_settings(EXPORTACIONES_EN_SEGUNDO_PLANO=False)
+class ExportacionesTests(TestCase):
+    def setUp(self):
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta, ignore_errors=True)
+        self.carpeta = Path(carpeta)
+        almacenamiento = AlmacenamientoPrivado(location=carpeta)
+        parche = mock.patch.object(TrabajoExportacion._meta.get_field("archivo"), "storage", almacenamiento)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+        self.usuario = get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        evento = Evento.objects.create(
+            titulo="Concierto de prueba", fecha=date(2030, 1, 15), hora=time(18, 0), lugar="Teatro municipal"
+        )
+        Reserva.objects.create(evento=evento, espacio="Sala", solicitante="Cultura")
+
+    def test_archivo_privado_con_nombre_aleatorio(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("reserva-export-async"))
+        self.assertEqual(response.status_code, 202)
+
+        # En modo síncrono la conexión de la petición sigue abierta después del trabajo.
+        trabajo = TrabajoExportacion.objects.get(pk=response.data["id"])
+        self.assertEqual(trabajo.estado, TrabajoExportacion.COMPLETADO)
+        ruta = Path(trabajo.archivo.path)
+        self.assertEqual(ruta.parent, self.carpeta)
+        self.assertNotIn(Path(settings.MEDIA_ROOT), ruta.parents)
+        self.assertRegex(ruta.name, r"^reserva-[\w-]{32}\.csv$")
+        with self.assertRaises(ValueError):
+            trabajo.archivo.url
+
+        descarga = self.client.get(reverse("exportacion-descargar", args=[trabajo.pk]))
+        self.assertEqual(descarga.status_code, 200)
+        self.assertIn(b"Cultura", b"".join(descarga.streaming_content))
+        self.assertNotIn(ruta.name, descarga["Content-Disposition"])
+
+        anonimo = APIClient().get(reverse("exportacion-descargar", args=[trabajo.pk]))
+        self.assertIn(anonimo.status_code, (401, 403))
+
+    def test_trabajos_sin_avance_se_marcan_fallidos(self):
+        perdido, activo = TrabajoExportacion.objects.bulk_create(
+            TrabajoExportacion(usuario=self.usuario, recurso="reservas", huella=huella, estado=estado)
+            for huella, estado in (("a", TrabajoExportacion.EN_PROCESO), ("b", TrabajoExportacion.PENDIENTE))
+        )
+        TrabajoExportacion.objects.filter(pk=perdido.pk).update(
+            actualizado=timezone.now() - PLAZO_SIN_AVANCE - timedelta(seconds=1)
+        )
+
+        self.assertEqual(marcar_huerfanos(), 1)
+        perdido.refresh_from_db()
+        activo.refresh_from_db()
+        self.assertEqual(perdido.estado, TrabajoExportacion.FALLIDO)
+        self.assertEqual(activo.estado, TrabajoExportacion.PENDIENTE)
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+        evento = Evento.objects.create(
+            titulo="Concierto de prueba", fecha=date(2030, 1, 15), hora=time(18, 0), lugar="Teatro municipal"
+        )
+        self.reservas = [
+            Reserva.objects.create(evento=evento, espacio="Sala", solicitante=solicitante)
+            for solicitante in ("Cultura", "Deportes")
+        ]
+
+    def test_listado_sin_last_modified_detecta_borrados(self):
+        url = reverse("reserva-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        # El borrado no mueve el máximo de ``actualizado``: con If-Modified-Since sería un 304.
+        self.reservas[1].delete()
+        desde = http_date(timezone.now().timestamp() + 60)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=desde).status_code, 200)
+        nueva = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(nueva.status_code, 200)
+        self.assertEqual(nueva.data["count"], 1)
+
+    def test_detalle_envia_last_modified(self):
+        url = reverse("reserva-detail", args=[self.reservas[0].pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        revalidada = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(revalidada.status_code, 304)
+
+
+class IdempotenciaTests(TestCase):
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        evento = Evento.objects.create(
+            titulo="Concierto de prueba", fecha=date(2030, 1, 15), hora=time(18, 0), lugar="Teatro municipal"
+        )
+        self.datos = {"evento": evento.pk, "espacio": "Sala", "solicitante": "Cultura", "cupos_solicitados": 2}
+
+    def _crear(self, datos=None, clave="clave-1", client=None):
+        return (client or self.client).post(
+            reverse("reserva-list"), datos or self.datos, format="json", HTTP_IDEMPOTENCY_KEY=clave
+        )
+
+    def test_reintento_repite_la_respuesta_sin_crear_otra_reserva(self):
+        primera = self._crear()
+        segunda = self._crear()
+        self.assertEqual(primera.status_code, 201)
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(segunda["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", primera)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_otro_contenido_con_la_misma_clave_es_422(self):
+        self.assertEqual(self._crear().status_code, 201)
+        response = self._crear({**self.datos, "cupos_solicitados": 3})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_reintento_durante_la_solicitud_original_es_409(self):
+        reintentos = []
+        original = ReservaViewSet.perform_create
+
+        def perform_create(vista, serializer):
+            reintentos.append(self._crear())
+            original(vista, serializer)
+
+        with mock.patch.object(ReservaViewSet, "perform_create", perform_create):
+            response = self._crear()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([reintento.status_code for reintento in reintentos], [409])
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_no_guarda_respuestas_5xx(self):
+        with mock.patch.object(CreateModelMixin, "create", return_value=Response(status=503)):
+            self.assertEqual(self._crear().status_code, 503)
+        with mock.patch.object(ReservaViewSet, "perform_create", side_effect=RuntimeError("caída")):
+            with self.assertRaises(RuntimeError):
+                self._crear()
+        self.assertFalse(RespuestaIdempotente.objects.exists())
+
+        response = self._crear()
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def test_la_clave_es_por_usuario(self):
+        otro = APIClient()
+        otro.force_authenticate(
+            get_user_model().objects.create_superuser("editora", "editora@municipio.local", "clave-segura")
+        )
+        primera = self._crear()
+        ajena = self._crear(client=otro)
+        self.assertEqual(ajena.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", ajena)
+        self.assertNotEqual(ajena.data["id"], primera.data["id"])
+        self.assertEqual(Reserva.objects.count(), 2)
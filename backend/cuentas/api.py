@@ -6,7 +6,10 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .export_utils import export_to_csv
+from comun.condicional import GetCondicionalMixin
+from comun.exportaciones import ExportacionAsincronaMixin
+from comun.idempotencia import idempotente
+from .export_utils import export_to_csv_copy, export_to_csv_stream
 from .models import Cuenta, SolicitudEliminacionCuenta
 from .permissions import IsAdmin, IsAdminOrSelf, get_user_role
 
@@ -129,13 +132,14 @@ class CuentaSelfSerializer(CuentaSerializer):
         ]
 
 
-class CuentaViewSet(viewsets.ModelViewSet):
+class CuentaViewSet(ExportacionAsincronaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """API CRUD para cuentas de usuarios municipales."""
 
     queryset = Cuenta.objects.all()
     serializer_class = CuentaSerializer
     permission_classes = [IsAuthenticated, IsAdminOrSelf]
     filterset_fields = ["rol", "activo"]
+    campos_exportacion = ['nombre', 'email', 'rol', 'activo', 'creado']
     search_fields = ["nombre", "usuario", "email"]
     ordering_fields = ["creado", "nombre"]
     ordering = ["-creado"]
@@ -160,6 +164,10 @@ class CuentaViewSet(viewsets.ModelViewSet):
                     return CuentaSelfSerializer
         return super().get_serializer_class()
 
+    @idempotente
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         if not (self.request.user.is_superuser or get_user_role(self.request.user) == Cuenta.ADMIN):
             raise serializers.ValidationError("Solo administradores pueden crear cuentas.")
@@ -175,8 +183,9 @@ class CuentaViewSet(viewsets.ModelViewSet):
     def export(self, request):
         """Exporta las cuentas filtradas a CSV."""
         queryset = self.filter_queryset(self.get_queryset())
-        fields = ['nombre', 'email', 'rol', 'activo', 'creado']
-        return export_to_csv(queryset, fields, filename='cuentas.csv')
+        # ``?modo=copy`` delega el CSV a PostgreSQL (COPY TO STDOUT).
+        exportar = export_to_csv_copy if request.query_params.get('modo') == 'copy' else export_to_csv_stream
+        return exportar(queryset, self.campos_exportacion, filename='cuentas.csv')
 
     @action(detail=False, methods=["get", "put", "patch"], permission_classes=[IsAuthenticated])
     def me(self, request):
@@ -4,3 +4,6 @@
 class CuentasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "cuentas"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,8 +1,26 @@
 """
 Sistema de permisos basado en roles para SGRE.
+
+El rol se resuelve una sola vez por solicitud (queda guardado en
+``request.user``). Con una caché compartida (``CACHE_URL``) además se reutiliza
+entre solicitudes con una versión que se renueva al guardar o eliminar
+cualquier ``Cuenta``; con la caché en memoria de cada proceso la renovación no
+llegaría a los demás y un rol revocado seguiría vigente, así que allí no se
+cachea entre solicitudes.
 """
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework import permissions
 
+CLAVE_VERSION_ROLES = "roles:version"
+# Atributo de ``request.user`` con el rol ya resuelto en esta solicitud.
+ATRIBUTO_ROL = "_rol_cuenta"
+_SIN_RESOLVER = object()
+
 
 class IsAdmin(permissions.BasePermission):
     """Permite acceso solo a usuarios con rol de administrador."""
@@ -15,13 +33,8 @@ class IsAdmin(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        # Verificar si el usuario tiene una cuenta con rol admin
-        from .models import Cuenta
-        try:
-            cuenta = Cuenta.objects.get(usuario=request.user.username)
-            return cuenta.activo and cuenta.rol == Cuenta.ADMIN
-        except Cuenta.DoesNotExist:
-            return False
+        # Verificar si el usuario tiene una cuenta activa con rol admin
+        return get_user_role(request.user) == "admin"
 
 
 class IsAdminOrEditor(permissions.BasePermission):
@@ -34,12 +47,7 @@ class IsAdminOrEditor(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        from .models import Cuenta
-        try:
-            cuenta = Cuenta.objects.get(usuario=request.user.username)
-            return cuenta.activo and cuenta.rol in [Cuenta.ADMIN, Cuenta.EDITOR]
-        except Cuenta.DoesNotExist:
-            return False
+        return get_user_role(request.user) in ["admin", "editor"]
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -60,12 +68,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        from .models import Cuenta
-        try:
-            cuenta = Cuenta.objects.get(usuario=request.user.username)
-            return cuenta.activo and cuenta.rol == Cuenta.ADMIN
-        except Cuenta.DoesNotExist:
-            return False
+        return get_user_role(request.user) == "admin"
 
 
 class IsEditorOrReadOnly(permissions.BasePermission):
@@ -83,12 +86,7 @@ class IsEditorOrReadOnly(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        from .models import Cuenta
-        try:
-            cuenta = Cuenta.objects.get(usuario=request.user.username)
-            return cuenta.activo and cuenta.rol in [Cuenta.ADMIN, Cuenta.EDITOR]
-        except Cuenta.DoesNotExist:
-            return False
+        return get_user_role(request.user) in ["admin", "editor"]
 
 
 class IsAdminOrSelf(permissions.BasePermission):
@@ -128,6 +126,37 @@ class IsAdminOrSelf(permissions.BasePermission):
         return False
 
 
+def _version_roles():
+    version = cache.get(CLAVE_VERSION_ROLES)
+    if version is None:
+        cache.add(CLAVE_VERSION_ROLES, time.time_ns(), timeout=None)
+        version = cache.get(CLAVE_VERSION_ROLES)
+    return version
+
+
+def invalidar_roles():
+    """Descarta (al confirmar la transacción) los roles cacheados de todos los usuarios."""
+    transaction.on_commit(lambda: cache.set(CLAVE_VERSION_ROLES, time.time_ns(), timeout=None))
+
+
+def _rol_en_base(username):
+    from .models import Cuenta
+    cuenta = Cuenta.objects.filter(usuario=username).values_list("rol", "activo").first()
+    # "" también se cachea: el usuario no tiene una cuenta activa.
+    return cuenta[0] if cuenta and cuenta[1] else ""
+
+
+def _rol_cuenta(username):
+    if not settings.CACHE_COMPARTIDA:
+        return _rol_en_base(username) or None
+    clave = f"roles:{_version_roles()}:{hashlib.md5(username.encode()).hexdigest()}"
+    rol = cache.get(clave)
+    if rol is None:
+        rol = _rol_en_base(username)
+        cache.set(clave, rol, settings.CUENTAS_ROL_CACHE_SEGUNDOS)
+    return rol or None
+
+
 def get_user_role(user):
     """
     Obtiene el rol del usuario desde la cuenta.
@@ -139,11 +168,8 @@ def get_user_role(user):
     if user.is_superuser:
         return 'admin'
     
-    from .models import Cuenta
-    try:
-        cuenta = Cuenta.objects.get(usuario=user.username)
-        if cuenta.activo:
-            return cuenta.rol
-        return None
-    except Cuenta.DoesNotExist:
-        return None
+    rol = getattr(user, ATRIBUTO_ROL, _SIN_RESOLVER)
+    if rol is _SIN_RESOLVER:
+        rol = _rol_cuenta(user.username)
+        setattr(user, ATRIBUTO_ROL, rol)
+    return rol
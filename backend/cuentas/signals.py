@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Cuenta
+from .permissions import invalidar_roles
+
+
+@receiver(post_save, sender=Cuenta)
+@receiver(post_delete, sender=Cuenta)
+def cuenta_modificada(sender, instance, **kwargs):
+    # Cambios de rol, de estado o de usuario invalidan los roles cacheados.
+    invalidar_roles()
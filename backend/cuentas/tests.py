@@ -1,3 +1,121 @@
-﻿from django.test import TestCase
+﻿from datetime import date, datetime, time, timezone as dt_timezone
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from eventos.models import Evento, ZonaEvento
+from reservas.api import ReservaViewSet
+from reservas.models import Reserva
+from .api import CuentaViewSet
+from .export_utils import export_to_csv_copy, export_to_csv_stream
+from .models import Cuenta
+
+
+class ConsultasApiTests(TestCase):
+    """Listado, detalle y exportación de cuentas cuestan lo mismo con pocas o muchas filas."""
+
+    CONSULTAS = {"list": 3, "detail": 1, "export": 1}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+
+    def test_consultas_constantes(self):
+        for cantidad in (2, 18):
+            inicio = Cuenta.objects.count()
+            cuentas = Cuenta.objects.bulk_create(
+                Cuenta(nombre=f"Cuenta {i}", usuario=f"usuario{i}") for i in range(inicio, inicio + cantidad)
+            )
+            urls = {
+                "list": reverse("cuenta-list"),
+                "detail": reverse("cuenta-detail", args=[cuentas[-1].pk]),
+                "export": reverse("cuenta-export"),
+            }
+            for accion, url in urls.items():
+                with self.subTest(accion, cuentas=Cuenta.objects.count()):
+                    with self.assertNumQueries(self.CONSULTAS[accion]):
+                        response = self.client.get(url)
+                        b"".join(response.streaming_content if response.streaming else [response.content])
+                    self.assertEqual(response.status_code, 200)
+
+
+class ResolucionRolesTests(TestCase):
+    """El rol cuesta a lo sumo una consulta por solicitud y solo se comparte con caché compartida."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        get_user_model().objects.create_user("editor")
+        self.cuenta = Cuenta.objects.create(nombre="Editor municipal", usuario="editor", rol=Cuenta.EDITOR)
+
+    def pedir(self, consultas):
+        # Usuario recién cargado: sin el rol resuelto en una solicitud anterior.
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.get(username="editor"))
+        with self.assertNumQueries(consultas):
+            return client.get(reverse("reporte-list")).status_code
+
+    def test_sin_cache_compartida_consulta_en_cada_solicitud(self):
+        self.assertEqual(self.pedir(3), 200)
+        self.assertEqual(self.pedir(3), 200)
+        # Sin señal de invalidación: el rol revocado rige en la siguiente solicitud.
+        Cuenta.objects.filter(pk=self.cuenta.pk).update(rol=Cuenta.CONSULTA)
+        self.assertEqual(self.pedir(1), 403)
+
+    @override_settings(CACHE_COMPARTIDA=True)
+    def test_con_cache_compartida_reutiliza_e_invalida(self):
+        self.assertEqual(self.pedir(3), 200)
+        self.assertEqual(self.pedir(2), 200)
+        self.cuenta.rol = Cuenta.CONSULTA
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cuenta.save()
+        self.assertEqual(self.pedir(1), 403)
+
+
+class ExportacionCopyTests(TestCase):
+    """``COPY TO`` y el exportador en streaming entregan exactamente los mismos bytes."""
+
+    def contenido(self, exportar, queryset, campos):
+        return b"".join(
+            bloque if isinstance(bloque, bytes) else bloque.encode("utf-8")
+            for bloque in exportar(queryset, campos).streaming_content
+        )
+
+    def assertMismoCsv(self, queryset, campos):
+        stream = self.contenido(export_to_csv_stream, queryset, campos)
+        self.assertEqual(self.contenido(export_to_csv_copy, queryset, campos), stream)
+        return stream
+
+    def test_reservas(self):
+        general = Evento.objects.create(
+            titulo="Concierto de prueba", fecha=date(2030, 1, 15), hora=time(18, 0), lugar="Teatro municipal"
+        )
+        por_zonas = Evento.objects.create(
+            titulo='Gala "de invierno", 2030', fecha=date(2030, 6, 1), hora=time(20, 30, 15),
+            lugar="Estadio", modo_aforo=Evento.MODO_ZONAS,
+        )
+        zona = ZonaEvento.objects.create(evento=por_zonas, nombre="Platea", cupo_total=100)
+        sin_zona = Reserva.objects.create(evento=general, espacio="Sala", solicitante="Línea 1\nLínea 2")
+        con_zona = Reserva.objects.create(
+            evento=por_zonas, zona=zona, espacio="Sala", solicitante="Cultura", estado=Reserva.CONFIRMADA
+        )
+        Reserva.objects.filter(pk=sin_zona.pk).update(
+            espacio="", creado=datetime(2030, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+        )
+        Reserva.objects.filter(pk=con_zona.pk).update(
+            creado=datetime(2030, 1, 1, 12, 0, 0, 5, tzinfo=dt_timezone.utc)
+        )
+
+        csv = self.assertMismoCsv(Reserva.objects.order_by("pk"), ReservaViewSet.campos_exportacion)
+        self.assertNotIn(b"\r\n", csv)
+        self.assertIn(b"2030-01-01 12:00:00.000005+00:00", csv)
+
+    def test_cuentas(self):
+        Cuenta.objects.create(nombre="Sin correo", usuario="sin_correo")
+        Cuenta.objects.create(nombre="Con correo", usuario="con_correo", email="a@municipio.local", activo=False)
+        self.assertMismoCsv(Cuenta.objects.order_by("pk"), CuentaViewSet.campos_exportacion)
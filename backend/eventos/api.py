@@ -1,20 +1,56 @@
+from django.core.files.storage import default_storage
+from django.db.models import Exists, F, OuterRef, Q
+from django_filters import rest_framework as django_filters
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, serializers, viewsets
+from rest_framework import filters, serializers, status, viewsets
 from rest_framework.decorators import action
-from cuentas.export_utils import export_to_csv
+from rest_framework.response import Response
+from comun.cache_respuestas import CacheAnonimaMixin
+from comun.condicional import GetCondicionalMixin
+from comun.exportaciones import ExportacionAsincronaMixin
+from comun.consultas import PlanConsultasMixin
+from comun.paginacion import PaginacionConCursor
+from cuentas.export_utils import export_to_csv_copy, export_to_csv_stream
 from cuentas.permissions import IsEditorOrReadOnly
+from .busqueda import BusquedaEventoFilter, sugerencias
+from .calendario import calendario_mes
 from .models import Evento, ZonaEvento
 
 
+class EventoFilter(django_filters.FilterSet):
+    con_cupos = django_filters.BooleanFilter(method="filter_con_cupos")
+
+    def filter_con_cupos(self, queryset, name, value):
+        if value is None:
+            return queryset
+        zona_libre = ZonaEvento.objects.filter(evento=OuterRef("pk")).filter(
+            Q(cupo_total=0) | Q(cupos_reservados__lt=F("cupo_total"))
+        )
+        con_cupos = (
+            Q(modo_aforo=Evento.MODO_GENERAL)
+            & (Q(cupo_total=0) | Q(cupos_reservados__lt=F("cupo_total")))
+        ) | (Q(modo_aforo=Evento.MODO_ZONAS) & Exists(zona_libre))
+        return queryset.filter(con_cupos) if value else queryset.exclude(con_cupos)
+
+    class Meta:
+        model = Evento
+        fields = ["estado", "fecha", "hora"]
+
+
 class ZonaEventoSerializer(serializers.ModelSerializer):
+    disponible = serializers.IntegerField(read_only=True, allow_null=True)
+
     class Meta:
         model = ZonaEvento
-        fields = ["id", "nombre", "cupo_total"]
+        fields = ["id", "nombre", "cupo_total", "cupos_reservados", "disponible"]
+        read_only_fields = ["cupos_reservados"]
 
 
 class EventoSerializer(serializers.ModelSerializer):
     estado_display = serializers.CharField(source="get_estado_display", read_only=True)
     zonas = ZonaEventoSerializer(many=True, read_only=True)
+    disponible = serializers.IntegerField(read_only=True, allow_null=True)
+    imagen_variantes = serializers.SerializerMethodField()
 
     class Meta:
         model = Evento
@@ -29,30 +65,92 @@ class EventoSerializer(serializers.ModelSerializer):
             "estado_display",
             "descripcion",
             "imagen_portada",
+            "imagen_variantes",
             "modo_aforo",
             "cupo_total",
+            "cupos_reservados",
+            "disponible",
             "zonas",
             "creado",
             "actualizado",
         ]
+        read_only_fields = ["cupos_reservados"]
+
+    def get_imagen_variantes(self, obj):
+        """URLs ``{variante: {formato: url}}``; ``None`` mientras no se hayan generado."""
+        if not obj.imagen_variantes:
+            return None
+        request = self.context.get("request")
+        urls = {}
+        for variante, formatos in obj.imagen_variantes.items():
+            urls[variante] = {}
+            for formato, ruta in formatos.items():
+                url = default_storage.url(ruta)
+                urls[variante][formato] = request.build_absolute_uri(url) if request else url
+        return urls
+
 
+class EventoAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    titulo = serializers.CharField()
+    lugar = serializers.CharField()
+    fecha = serializers.DateField()
 
-class EventoViewSet(viewsets.ModelViewSet):
+
+class EventoViewSet(
+    ExportacionAsincronaMixin, PlanConsultasMixin, CacheAnonimaMixin, GetCondicionalMixin, viewsets.ModelViewSet
+):
     """API CRUD para eventos institucionales."""
 
     queryset = Evento.objects.all()
+    # Las zonas se precargan para que ``zonas`` y ``disponible`` no consulten por evento.
+    plan_consultas = {
+        "*": {"prefetch_related": ["zonas"]},
+        "autocomplete": {},
+        "calendario": {},
+    }
+    pagination_class = PaginacionConCursor
     serializer_class = EventoSerializer
     # Permite lectura pública; ediciones solo para editores/admins
     permission_classes = [IsEditorOrReadOnly]
-    filterset_fields = ["estado", "fecha", "hora"]
-    search_fields = ["titulo", "lugar", "direccion", "descripcion"]
+    filterset_class = EventoFilter
+    campos_exportacion = ['titulo', 'fecha', 'hora', 'lugar', 'direccion', 'modo_aforo', 'cupo_total', 'estado', 'creado']
     ordering_fields = ["fecha", "hora", "creado"]
     ordering = ["-fecha", "-hora"]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ``?search=`` usa el índice de texto completo y ordena por relevancia.
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BusquedaEventoFilter]
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Sugerencias livianas para el buscador: ``?q=`` (mínimo 2 caracteres)
+        y ``?limite=`` (por defecto 8, máximo 20). Tolera errores de tipeo.
+        """
+        texto = request.query_params.get("q", "").strip()
+        if len(texto) < 2:
+            return Response([])
+        try:
+            limite = min(max(int(request.query_params.get("limite", 8)), 1), 20)
+        except ValueError:
+            limite = 8
+        resultado = sugerencias(self.get_queryset(), texto, limite)
+        return Response(EventoAutocompleteSerializer(resultado, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def calendario(self, request):
+        """Eventos por estado y aforo disponible por día de ``?mes=AAAA-MM``."""
+        try:
+            anio, mes = (int(parte) for parte in request.query_params.get("mes", "").split("-"))
+            if not 1 <= mes <= 12 or not 1 <= anio <= 9999:
+                raise ValueError
+        except ValueError:
+            return Response({"mes": "Usa el formato AAAA-MM."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(calendario_mes(anio, mes))
 
     @action(detail=False, methods=['get'])
     def export(self, request):
         """Exporta los eventos filtrados a CSV."""
         queryset = self.filter_queryset(self.get_queryset())
-        fields = ['titulo', 'fecha', 'hora', 'lugar', 'direccion', 'modo_aforo', 'cupo_total', 'estado', 'creado']
-        return export_to_csv(queryset, fields, filename='eventos.csv')
+        # ``?modo=copy`` delega el CSV a PostgreSQL (COPY TO STDOUT).
+        exportar = export_to_csv_copy if request.query_params.get('modo') == 'copy' else export_to_csv_stream
+        return exportar(queryset, self.campos_exportacion, filename='eventos.csv')
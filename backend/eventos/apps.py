@@ -4,3 +4,6 @@
 class EventosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "eventos"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,108 @@
+"""
+Búsqueda de texto completo de eventos sobre la columna ``Evento.busqueda``.
+
+La columna guarda un ``tsvector`` ponderado (título > lugar > dirección >
+descripción) con la configuración ``es_unaccent``: raíces en español y sin
+tildes, creada en la migración ``0009_busqueda``. Un índice GIN la sirve, en
+lugar del ``ILIKE '%término%'`` de ``SearchFilter`` que recorre toda la tabla.
+
+El autocompletado usa en cambio índices trigram sobre ``titulo`` y ``lugar``,
+que resuelven prefijos, subcadenas y errores de tipeo sin esperar palabras
+completas.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+from rest_framework import filters
+
+CONFIG_BUSQUEDA = "es_unaccent"
+CAMPOS_BUSQUEDA = (("titulo", "A"), ("lugar", "B"), ("direccion", "C"), ("descripcion", "D"))
+
+
+def vector_busqueda():
+    """Expresión que calcula ``Evento.busqueda`` a partir de sus columnas de texto."""
+    vector = None
+    for campo, peso in CAMPOS_BUSQUEDA:
+        parte = SearchVector(campo, weight=peso, config=CONFIG_BUSQUEDA)
+        vector = parte if vector is None else vector + parte
+    return vector
+
+
+def consulta_busqueda(texto):
+    # "websearch" acepta lo que escribe un usuario: comillas, OR y -exclusiones.
+    return SearchQuery(texto, config=CONFIG_BUSQUEDA, search_type="websearch")
+
+
+class BusquedaEventoFilter(filters.BaseFilterBackend):
+    """
+    Reemplaza a ``SearchFilter`` con el mismo parámetro ``?search=``.
+
+    Sin ``?ordering=`` explícito los resultados salen por relevancia; el orden
+    por defecto del viewset queda como desempate. Debe ir después de
+    ``OrderingFilter`` en ``filter_backends``.
+    """
+
+    search_param = filters.SearchFilter.search_param
+    ordering_param = filters.OrderingFilter.ordering_param
+
+    def filter_queryset(self, request, queryset, view):
+        texto = request.query_params.get(self.search_param, "").strip()
+        if not texto:
+            return queryset
+        consulta = consulta_busqueda(texto)
+        queryset = queryset.filter(busqueda=consulta).annotate(rango=SearchRank(F("busqueda"), consulta))
+        if self.ordering_param not in request.query_params:
+            desempate = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by("-rango", *desempate)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Búsqueda de texto completo (título, lugar, dirección, descripción).",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+def sugerencias(queryset, texto, limite):
+    """
+    Eventos cuyo título o lugar contiene ``texto`` o se le parece (trigramas).
+
+    Primero los que empiezan por el texto, luego por similitud. Devuelve
+    diccionarios ``id/titulo/lugar/fecha`` y los guarda unos segundos en caché:
+    los prefijos cortos se repiten mucho mientras la gente escribe.
+    """
+    texto = " ".join(texto.split()).lower()
+    clave = "eventos:autocomplete:" + hashlib.sha1(f"{limite}:{texto}".encode()).hexdigest()
+    resultado = cache.get(clave)
+    if resultado is not None:
+        return resultado
+
+    # Sobre UPPER(...) para que tanto el LIKE de ``contains`` como el ``%>`` de
+    # ``trigram_word_similar`` usen los índices de expresión de la migración 0010.
+    coincide = (
+        Q(titulo_upper__contains=texto.upper())
+        | Q(lugar_upper__contains=texto.upper())
+        | Q(titulo_upper__trigram_word_similar=texto)
+        | Q(lugar_upper__trigram_word_similar=texto)
+    )
+    resultado = list(
+        queryset.alias(titulo_upper=Upper("titulo"), lugar_upper=Upper("lugar"))
+        .filter(coincide)
+        .annotate(
+            prefijo=Case(When(titulo__istartswith=texto, then=Value(1)), default=Value(0), output_field=IntegerField()),
+            similitud=Greatest(TrigramWordSimilarity(texto, "titulo"), TrigramWordSimilarity(texto, "lugar")),
+        )
+        .order_by("-prefijo", "-similitud", "fecha", "id")
+        .values("id", "titulo", "lugar", "fecha")[:limite]
+    )
+    cache.set(clave, resultado, settings.EVENTOS_AUTOCOMPLETE_CACHE_SEGUNDOS)
+    return resultado
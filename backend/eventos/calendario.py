@@ -0,0 +1,114 @@
+"""
+Resumen mensual de eventos y aforo por día para ``/api/eventos/calendario/``.
+
+Se calcula con un único GROUP BY por fecha sobre ``Evento``: la ocupación sale
+de los contadores materializados (``cupos_reservados`` del evento y de sus
+zonas), que el motor de reservas mantiene al día, así que no hace falta sumar
+la tabla de reservas. El resultado se guarda en caché por mes y se invalida al
+cambiar un evento, una zona, una reserva o una retención de ese mes.
+
+La invalidación solo llega a todos los procesos con una caché compartida
+(``CACHE_URL``); con la caché en memoria el plazo por defecto baja a 30 s
+(``EVENTOS_CALENDARIO_CACHE_SEGUNDOS``).
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Evento, ZonaEvento
+
+
+def _clave(anio, mes):
+    return f"eventos:calendario:{anio:04d}-{mes:02d}"
+
+
+def invalidar_calendario(*fechas):
+    """Descarta el calendario de los meses de ``fechas`` cuando confirma la transacción."""
+    claves = {_clave(fecha.year, fecha.month) for fecha in fechas if fecha}
+    if claves:
+        transaction.on_commit(lambda: cache.delete_many(list(claves)))
+
+
+def _suma_zonas(expresion):
+    return Subquery(
+        ZonaEvento.objects.filter(evento=OuterRef("pk"))
+        .order_by()
+        .values("evento")
+        .annotate(total=Sum(expresion))
+        .values("total")[:1],
+        output_field=IntegerField(),
+    )
+
+
+def _resumen(anio, mes):
+    inicio = date(anio, mes, 1)
+    fin = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+
+    # Igual que ``Evento.disponible``: sin límite si el cupo general es 0, si
+    # el evento por zonas no tiene zonas o si alguna zona no tiene límite.
+    zonas = ZonaEvento.objects.filter(evento=OuterRef("pk"))
+    sin_limite = (Q(modo_aforo=Evento.MODO_GENERAL) & Q(cupo_total=0)) | (
+        Q(modo_aforo=Evento.MODO_ZONAS) & (~Exists(zonas) | Exists(zonas.filter(cupo_total=0)))
+    )
+    capacidad = Case(
+        When(sin_limite, then=Value(None)),
+        When(modo_aforo=Evento.MODO_GENERAL, then=F("cupo_total")),
+        default=_suma_zonas("cupo_total"),
+        output_field=IntegerField(),
+    )
+    disponible = Case(
+        When(sin_limite, then=Value(None)),
+        When(modo_aforo=Evento.MODO_GENERAL, then=Greatest(F("cupo_total") - F("cupos_reservados"), 0)),
+        default=_suma_zonas(Greatest(F("cupo_total") - F("cupos_reservados"), 0)),
+        output_field=IntegerField(),
+    )
+
+    por_estado = {
+        estado: Count("pk", filter=Q(estado=estado)) for estado, _ in Evento.ESTADOS
+    }
+    filas = (
+        Evento.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+        .alias(capacidad_evento=capacidad, disponible_evento=disponible)
+        .values("fecha")
+        .annotate(
+            total=Count("pk"),
+            capacidad=Coalesce(Sum("capacidad_evento"), 0),
+            disponible=Coalesce(Sum("disponible_evento"), 0),
+            sin_limite=Count("pk", filter=Q(capacidad_evento__isnull=True)),
+            **por_estado,
+        )
+        .order_by("fecha")
+    )
+    return {
+        "mes": f"{anio:04d}-{mes:02d}",
+        "dias": [
+            {
+                "fecha": fila["fecha"].isoformat(),
+                "total": fila["total"],
+                "estados": {estado: fila[estado] for estado in por_estado},
+                "capacidad": fila["capacidad"],
+                "disponible": fila["disponible"],
+                "sin_limite": fila["sin_limite"],
+            }
+            for fila in filas
+        ],
+    }
+
+
+def calendario_mes(anio, mes):
+    """
+    Eventos por estado, aforo total y cupos disponibles de cada día del mes.
+
+    ``capacidad`` y ``disponible`` suman solo los eventos con límite;
+    ``sin_limite`` cuenta los que no lo tienen.
+    """
+    clave = _clave(anio, mes)
+    resumen = cache.get(clave)
+    if resumen is None:
+        resumen = _resumen(anio, mes)
+        cache.set(clave, resumen, settings.EVENTOS_CALENDARIO_CACHE_SEGUNDOS)
+    return resumen
@@ -0,0 +1,148 @@
+"""
+Variantes redimensionadas de ``Evento.imagen_portada``.
+
+Por cada portada se generan, junto al original, versiones WebP y JPEG en
+tres tamaños (``thumbnail``, ``card`` y ``full``) y sus rutas se guardan en
+``Evento.imagen_variantes``; el listado sirve la variante adecuada en lugar
+del archivo original. La generación corre en segundo plano tras confirmar la
+transacción que sube la imagen; ``generar_variantes_imagenes`` completa las
+existentes con un pool de procesos.
+
+``generar_archivos`` solo trabaja con el storage (sin base de datos), de modo
+que puede ejecutarse en procesos hijos.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from comun.cache_respuestas import invalidar_respuestas
+
+logger = logging.getLogger(__name__)
+
+# Lado mayor en píxeles de cada variante (nunca se agranda el original).
+VARIANTES = {"thumbnail": 320, "card": 800, "full": 1600}
+FORMATOS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+_ejecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="imagenes")
+
+
+def ruta_variante(nombre, variante, formato):
+    base, _ = os.path.splitext(nombre)
+    extension = "jpg" if formato == "jpeg" else formato
+    return f"{base}__{variante}.{extension}"
+
+
+def _preparar(imagen, formato):
+    con_alfa = imagen.mode in ("RGBA", "LA") or (imagen.mode == "P" and "transparency" in imagen.info)
+    if formato == "webp":
+        return imagen.convert("RGBA" if con_alfa else "RGB")
+    if con_alfa:
+        # JPEG no tiene transparencia: se compone sobre fondo blanco.
+        fondo = Image.new("RGB", imagen.size, (255, 255, 255))
+        fondo.paste(imagen.convert("RGBA"), mask=imagen.convert("RGBA").getchannel("A"))
+        return fondo
+    return imagen.convert("RGB")
+
+
+def generar_archivos(nombre):
+    """
+    Escribe las variantes de la imagen ``nombre`` y devuelve sus rutas como
+    ``{variante: {formato: ruta}}``. Sobrescribe las que ya existieran.
+    """
+    with default_storage.open(nombre, "rb") as archivo:
+        with Image.open(archivo) as original:
+            imagen = ImageOps.exif_transpose(original)
+            imagen.load()
+
+    variantes = {}
+    for variante, lado in VARIANTES.items():
+        reducida = imagen.copy()
+        reducida.thumbnail((lado, lado), Image.LANCZOS)
+        variantes[variante] = {}
+        for formato, opciones in FORMATOS.items():
+            contenido = BytesIO()
+            _preparar(reducida, formato).save(contenido, **opciones)
+            ruta = ruta_variante(nombre, variante, formato)
+            if default_storage.exists(ruta):
+                default_storage.delete(ruta)
+            variantes[variante][formato] = default_storage.save(ruta, ContentFile(contenido.getvalue()))
+    return variantes
+
+
+def eliminar_archivos(variantes):
+    for formatos in (variantes or {}).values():
+        for ruta in formatos.values():
+            default_storage.delete(ruta)
+
+
+def eliminar_variantes(nombre):
+    """
+    Borra las variantes de la portada ``nombre`` a partir de sus rutas, sin
+    depender de ``Evento.imagen_variantes`` (que puede no estar al día en la
+    instancia que se guarda o elimina).
+    """
+    if not nombre:
+        return
+    for variante in VARIANTES:
+        for formato in FORMATOS:
+            default_storage.delete(ruta_variante(nombre, variante, formato))
+
+
+def guardar_variantes(evento_id, nombre, variantes):
+    """
+    Registra las variantes solo si el evento sigue teniendo esa portada; si
+    entretanto se subió otra, las recién generadas se descartan.
+    """
+    from .models import Evento
+
+    actualizado = Evento.objects.filter(pk=evento_id, imagen_portada=nombre).update(
+        imagen_variantes=variantes, actualizado=timezone.now()
+    )
+    if not actualizado:
+        eliminar_archivos(variantes)
+    else:
+        invalidar_respuestas(Evento)
+    return bool(actualizado)
+
+
+def procesar_portada(evento_id, nombre):
+    try:
+        guardar_variantes(evento_id, nombre, generar_archivos(nombre))
+    except Exception:
+        logger.exception("No se pudieron generar las variantes de %s", nombre)
+
+
+def _procesar_en_hilo(evento_id, nombre):
+    # El hilo abre su propia conexión; dentro de la petición no se debe cerrar la de ella.
+    try:
+        procesar_portada(evento_id, nombre)
+    finally:
+        close_old_connections()
+
+
+def programar_variantes(evento_id, nombre, anterior=None):
+    """
+    Al confirmar la transacción borra las variantes de la portada ``anterior``
+    y genera las de la portada ``nombre`` (si no se quitó).
+    """
+    def encolar():
+        eliminar_variantes(anterior)
+        if not nombre:
+            return
+        if settings.EVENTOS_IMAGENES_EN_SEGUNDO_PLANO:
+            _ejecutor.submit(_procesar_en_hilo, evento_id, nombre)
+        else:
+            procesar_portada(evento_id, nombre)
+
+    transaction.on_commit(encolar)
@@ -0,0 +1,109 @@
+"""
+Compara ``?search=`` con texto completo (índice GIN) contra el ``ILIKE`` de
+``SearchFilter`` sobre un catálogo grande de eventos.
+
+Siembra los eventos con ``generate_series`` (títulos y lugares combinando
+palabras con y sin tildes), calcula sus vectores en un solo UPDATE y mide la
+página y el conteo que arma el listado para cada término.
+
+    python manage.py benchmark_busqueda --eventos 500000 --repeticiones 20
+"""
+import json
+import statistics
+import time
+
+from django.contrib.postgres.search import SearchRank
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from eventos.busqueda import consulta_busqueda, vector_busqueda
+from eventos.models import Evento
+
+PREFIJO_SIEMBRA = "Búsqueda "
+TERMINOS = ["concierto", "musica", "teatro municipal", "exposición fotográfica", "feria plaza"]
+CAMPOS_ILIKE = ["titulo", "lugar", "direccion", "descripcion"]
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+class Command(BaseCommand):
+    help = "Mide la búsqueda de eventos por texto completo contra ILIKE."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--eventos", type=int, default=500000)
+        parser.add_argument("--repeticiones", type=int, default=20)
+        parser.add_argument("--conservar", action="store_true", help="No elimina los eventos sembrados.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Este benchmark requiere PostgreSQL.")
+
+        self._sembrar(options["eventos"])
+        try:
+            for termino in TERMINOS:
+                self._comparar(termino, options["repeticiones"])
+        finally:
+            if not options["conservar"]:
+                with connection.cursor() as cursor:
+                    cursor.execute("DELETE FROM eventos_evento WHERE titulo LIKE %s", [PREFIJO_SIEMBRA + "%"])
+
+    @transaction.atomic
+    def _sembrar(self, eventos):
+        self.stdout.write(f"Sembrando {eventos} eventos...")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO eventos_evento
+                    (titulo, fecha, hora, lugar, direccion, estado, descripcion, modo_aforo,
+                     cupo_total, cupos_reservados, creado, actualizado)
+                SELECT %s || (ARRAY['Concierto', 'Obra de teatro', 'Exposición', 'Feria', 'Taller', 'Charla'])[1 + g %% 6]
+                       || ' de ' || (ARRAY['música', 'fotografía', 'artesanías', 'cine', 'danza', 'ciencia', 'poesía'])[1 + g %% 7]
+                       || ' ' || g,
+                       CURRENT_DATE + (g %% 365), TIME '08:00' + (g %% 12) * INTERVAL '1 hour',
+                       (ARRAY['Teatro Municipal', 'Plaza de Armas', 'Biblioteca Pública', 'Centro Cultural',
+                              'Estadio', 'Parque Central'])[1 + g %% 6] || ' ' || (g %% 50),
+                       'Calle ' || (g %% 500) || ' #' || g, 'confirmado',
+                       'Actividad abierta a la comunidad número ' || g, 'general', 0, 0, NOW(), NOW()
+                FROM generate_series(1, %s) AS g
+                """,
+                [PREFIJO_SIEMBRA, eventos],
+            )
+        Evento.objects.filter(titulo__startswith=PREFIJO_SIEMBRA).update(busqueda=vector_busqueda())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE eventos_evento")
+
+    def _comparar(self, termino, repeticiones):
+        ilike = Q()
+        for campo in CAMPOS_ILIKE:
+            ilike |= Q(**{f"{campo}__icontains": termino})
+        consulta = consulta_busqueda(termino)
+        variantes = [
+            ("ILIKE", Evento.objects.filter(ilike).order_by("-fecha", "-hora")),
+            (
+                "texto completo",
+                Evento.objects.filter(busqueda=consulta)
+                .annotate(rango=SearchRank(F("busqueda"), consulta))
+                .order_by("-rango", "-fecha", "-hora"),
+            ),
+        ]
+
+        self.stdout.write(f"\n«{termino}»")
+        for nombre, queryset in variantes:
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                total = queryset.count()
+                list(queryset[:10])
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            plan = json.loads(queryset[:10].explain(format="json"))[0]["Plan"]
+            nodos = sorted({n["Node Type"] for n in _nodos(plan) if n.get("Relation Name") == "eventos_evento"})
+            self.stdout.write(
+                f"  {nombre:<15} {total:>8} resultados  "
+                f"mediana {statistics.median(tiempos):8.1f} ms  p95 {sorted(tiempos)[int(len(tiempos) * 0.95) - 1]:8.1f} ms  "
+                f"{', '.join(nodos)}"
+            )
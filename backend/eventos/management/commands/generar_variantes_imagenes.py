@@ -0,0 +1,56 @@
+"""
+Genera las variantes de las portadas de eventos que aún no las tienen.
+
+El redimensionado se reparte en un pool de procesos (Pillow es CPU intensivo);
+cada proceso solo lee y escribe archivos, y el proceso principal registra las
+rutas en la base de datos a medida que terminan.
+
+    python manage.py generar_variantes_imagenes --procesos 4
+    python manage.py generar_variantes_imagenes --todas   # regenera también las existentes
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from eventos.imagenes import generar_archivos, guardar_variantes
+from eventos.models import Evento
+
+
+class Command(BaseCommand):
+    help = "Genera en paralelo las variantes WebP/JPEG de las portadas de eventos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--todas", action="store_true", help="Regenera también las que ya tienen variantes.")
+
+    def handle(self, *args, **options):
+        eventos = Evento.objects.exclude(imagen_portada="").exclude(imagen_portada__isnull=True)
+        if not options["todas"]:
+            eventos = eventos.filter(imagen_variantes={})
+        pendientes = list(eventos.order_by("pk").values_list("pk", "imagen_portada"))
+        if not pendientes:
+            self.stdout.write("No hay portadas pendientes.")
+            return
+
+        # Los procesos hijos no deben heredar conexiones abiertas.
+        connections.close_all()
+        generadas = fallidas = 0
+        with ProcessPoolExecutor(max_workers=options["procesos"], initializer=django.setup) as pool:
+            tareas = {pool.submit(generar_archivos, nombre): (pk, nombre) for pk, nombre in pendientes}
+            for tarea in as_completed(tareas):
+                pk, nombre = tareas[tarea]
+                try:
+                    variantes = tarea.result()
+                except Exception as exc:
+                    fallidas += 1
+                    self.stderr.write(f"Evento {pk} ({nombre}): {exc}")
+                    continue
+                if guardar_variantes(pk, nombre, variantes):
+                    generadas += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Variantes generadas para {generadas} eventos."))
+        if fallidas:
+            self.stderr.write(f"{fallidas} portadas no se pudieron procesar.")
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0006_indexes_aforo"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evento",
+            name="cupos_reservados",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Cupos ocupados por reservas no canceladas (se mantiene automáticamente).",
+                verbose_name="Cupos reservados",
+            ),
+        ),
+        migrations.AddField(
+            model_name="zonaevento",
+            name="cupos_reservados",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Cupos reservados"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0007_cupos_reservados"),
+    ]
+
+    operations = [
+        # (fecha, hora, id) sirve el ORDER BY por defecto (también en sentido inverso)
+        # y reemplaza al índice de una sola columna sobre fecha.
+        migrations.AddIndex(
+            model_name="evento",
+            index=models.Index(fields=["fecha", "hora", "id"], name="evento_fecha_hora_idx"),
+        ),
+        migrations.RemoveIndex(
+            model_name="evento",
+            name="evento_fecha_idx",
+        ),
+    ]
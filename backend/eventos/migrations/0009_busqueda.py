@@ -0,0 +1,52 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+CREAR_CONFIGURACION = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = pg_catalog.spanish);
+        ALTER TEXT SEARCH CONFIGURATION es_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+"""
+
+# Misma expresión que ``eventos.busqueda.vector_busqueda`` para las filas existentes.
+CALCULAR_VECTORES = """
+UPDATE eventos_evento SET busqueda =
+    setweight(to_tsvector('es_unaccent', coalesce(titulo, '')), 'A')
+    || setweight(to_tsvector('es_unaccent', coalesce(lugar, '')), 'B')
+    || setweight(to_tsvector('es_unaccent', coalesce(direccion, '')), 'C')
+    || setweight(to_tsvector('es_unaccent', coalesce(descripcion, '')), 'D');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0008_indexes_fecha_hora"),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CREAR_CONFIGURACION, "DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent;"),
+        migrations.AddField(
+            model_name="evento",
+            name="busqueda",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Vector de texto completo de título, lugar, dirección y descripción (se mantiene automáticamente).",
+                null=True,
+            ),
+        ),
+        migrations.RunSQL(CALCULAR_VECTORES, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="evento",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["busqueda"], name="evento_busqueda_idx"),
+        ),
+    ]
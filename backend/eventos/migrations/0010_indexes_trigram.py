@@ -0,0 +1,34 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0009_busqueda"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # Sobre UPPER(...), igual que filtra ``eventos.busqueda.sugerencias``.
+        migrations.AddIndex(
+            model_name="evento",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("titulo"), name="gin_trgm_ops"
+                ),
+                name="evento_titulo_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="evento",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("lugar"), name="gin_trgm_ops"
+                ),
+                name="evento_lugar_trgm_idx",
+            ),
+        ),
+    ]
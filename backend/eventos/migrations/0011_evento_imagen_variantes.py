@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0010_indexes_trigram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evento",
+            name="imagen_variantes",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Rutas de las versiones redimensionadas de la portada (se generan automáticamente).",
+                verbose_name="Variantes de la imagen",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0011_evento_imagen_variantes"),
+    ]
+
+    operations = [
+        # Default en la base para los INSERT que no pasan por el ORM (siembras y cargas masivas).
+        migrations.AlterField(
+            model_name="evento",
+            name="imagen_variantes",
+            field=models.JSONField(
+                blank=True,
+                db_default={},
+                default=dict,
+                editable=False,
+                help_text="Rutas de las versiones redimensionadas de la portada (se generan automáticamente).",
+                verbose_name="Variantes de la imagen",
+            ),
+        ),
+    ]
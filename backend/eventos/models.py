@@ -1,7 +1,14 @@
-﻿from django.db import models
+﻿from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.functions import Upper
+from django.utils import timezone
 from django.core.validators import MinLengthValidator, MaxLengthValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
 
+from .busqueda import CAMPOS_BUSQUEDA, vector_busqueda
+from .imagenes import programar_variantes
+
 
 def validate_imagen_portada(file):
     max_size_bytes = 5 * 1024 * 1024
@@ -64,6 +71,14 @@ class Evento(models.Model):
             validate_imagen_portada,
         ],
     )
+    imagen_variantes = models.JSONField(
+        "Variantes de la imagen",
+        default=dict,
+        db_default={},
+        blank=True,
+        editable=False,
+        help_text="Rutas de las versiones redimensionadas de la portada (se generan automáticamente).",
+    )
     modo_aforo = models.CharField(
         "Modo de aforo",
         max_length=20,
@@ -76,6 +91,17 @@ class Evento(models.Model):
         default=0,
         help_text="Aforo total si el modo es general.",
     )
+    cupos_reservados = models.PositiveIntegerField(
+        "Cupos reservados",
+        default=0,
+        editable=False,
+        help_text="Cupos ocupados por reservas no canceladas (se mantiene automáticamente).",
+    )
+    busqueda = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Vector de texto completo de título, lugar, dirección y descripción (se mantiene automáticamente).",
+    )
     creado = models.DateTimeField(auto_now_add=True)
     actualizado = models.DateTimeField(auto_now=True)
 
@@ -83,10 +109,62 @@ class Evento(models.Model):
         ordering = ["-fecha", "-hora"]
         verbose_name = "evento"
         verbose_name_plural = "eventos"
+        indexes = [
+            models.Index(fields=["fecha", "hora", "id"], name="evento_fecha_hora_idx"),
+            models.Index(fields=["estado"], name="evento_estado_idx"),
+            GinIndex(fields=["busqueda"], name="evento_busqueda_idx"),
+            GinIndex(OpClass(Upper("titulo"), name="gin_trgm_ops"), name="evento_titulo_trgm_idx"),
+            GinIndex(OpClass(Upper("lugar"), name="gin_trgm_ops"), name="evento_lugar_trgm_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.titulo
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "fecha" in field_names and "hora" in field_names:
+            instance._fecha_hora_original = (instance.fecha, instance.hora)
+        if "imagen_portada" in field_names:
+            instance._imagen_original = instance.imagen_portada.name or ""
+        return instance
+
+    def save(self, *args, **kwargs):
+        original = getattr(self, "_fecha_hora_original", None)
+        reprogramado = original is not None and original != (self.fecha, self.hora)
+        update_fields = kwargs.get("update_fields")
+        texto_modificado = update_fields is None or any(campo in update_fields for campo, _ in CAMPOS_BUSQUEDA)
+        imagen_original = getattr(self, "_imagen_original", None) if self.pk else ""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            imagen = (self.imagen_portada.name or "") if imagen_original is not None else None
+            if imagen is not None and imagen != imagen_original:
+                # Hasta que estén las nuevas variantes se sirve la imagen original.
+                programar_variantes(self.pk, imagen, anterior=imagen_original)
+                if self.imagen_variantes:
+                    self.imagen_variantes = {}
+                    Evento.objects.filter(pk=self.pk).update(imagen_variantes={})
+            if texto_modificado:
+                Evento.objects.filter(pk=self.pk).update(busqueda=vector_busqueda())
+            if reprogramado:
+                # Un solo UPDATE sobre las reservas en lugar de re-guardarlas una a una.
+                self.reservas.update(fecha=self.fecha, hora=self.hora, actualizado=timezone.now())
+        self._fecha_hora_original = (self.fecha, self.hora)
+        if imagen is not None:
+            self._imagen_original = imagen
+
+    @property
+    def disponible(self):
+        """Cupos libres del evento; ``None`` si no hay límite de aforo."""
+        if self.modo_aforo == self.MODO_ZONAS:
+            zonas = [zona.disponible for zona in self.zonas.all()]
+            if not zonas or None in zonas:
+                return None
+            return sum(zonas)
+        if not self.cupo_total:
+            return None
+        return max(self.cupo_total - self.cupos_reservados, 0)
+
 
 class ZonaEvento(models.Model):
     evento = models.ForeignKey(
@@ -97,12 +175,23 @@ class ZonaEvento(models.Model):
     )
     nombre = models.CharField("Nombre", max_length=100, validators=[MinLengthValidator(2)])
     cupo_total = models.PositiveIntegerField("Cupo total", default=0)
+    cupos_reservados = models.PositiveIntegerField("Cupos reservados", default=0, editable=False)
 
     class Meta:
         verbose_name = "zona de evento"
         verbose_name_plural = "zonas de evento"
         unique_together = ("evento", "nombre")
         ordering = ["nombre"]
+        indexes = [
+            models.Index(fields=["evento"], name="zona_evento_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.evento.titulo} - {self.nombre}"
+
+    @property
+    def disponible(self):
+        """Cupos libres de la zona; ``None`` si no hay límite de aforo."""
+        if not self.cupo_total:
+            return None
+        return max(self.cupo_total - self.cupos_reservados, 0)
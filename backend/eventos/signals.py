@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from comun.cache_respuestas import invalidar_respuestas
+from .calendario import invalidar_calendario
+from .imagenes import eliminar_variantes
+from .models import Evento, ZonaEvento
+
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def invalidar_calendario_evento(sender, instance, **kwargs):
+    # En post_save ``_fecha_hora_original`` aún conserva la fecha previa a una reprogramación.
+    original = getattr(instance, "_fecha_hora_original", None)
+    invalidar_calendario(instance.fecha, original[0] if original else None)
+    invalidar_respuestas(Evento)
+
+
+@receiver(post_delete, sender=Evento)
+def eliminar_variantes_evento(sender, instance, **kwargs):
+    # Si la eliminación se revierte, las variantes se conservan.
+    nombre = instance.imagen_portada.name
+    transaction.on_commit(lambda: eliminar_variantes(nombre))
+
+
+@receiver(post_save, sender=ZonaEvento)
+@receiver(post_delete, sender=ZonaEvento)
+def zona_modificada(sender, instance, origin=None, **kwargs):
+    # En la cascada de un evento ya se invalida su mes.
+    if isinstance(origin, Evento) or getattr(origin, "model", None) is Evento:
+        return
+    # Las zonas forman parte de la representación del evento (y de su ETag).
+    Evento.objects.filter(pk=instance.evento_id).update(actualizado=timezone.now())
+    invalidar_respuestas(Evento)
+    invalidar_calendario(Evento.objects.filter(pk=instance.evento_id).values_list("fecha", flat=True).first())
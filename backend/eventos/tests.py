@@ -1,3 +1,126 @@
-﻿from django.test import TestCase
+﻿import shutil
+import tempfile
+from datetime import date, time
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .imagenes import FORMATOS, VARIANTES, ruta_variante
+from .models import Evento, ZonaEvento
+
+
+def crear_evento(**datos):
+    datos.setdefault("titulo", "Concierto de prueba")
+    datos.setdefault("fecha", date(2030, 1, 15))
+    datos.setdefault("hora", time(18, 0))
+    datos.setdefault("lugar", "Teatro municipal")
+    return Evento.objects.create(**datos)
+
+
+def imagen_png(nombre="portada.png"):
+    contenido = BytesIO()
+    Image.new("RGB", (1200, 800), (30, 90, 160)).save(contenido, format="PNG")
+    return SimpleUploadedFile(nombre, contenido.getvalue(), content_type="image/png")
+
+
+class InsercionDirectaTests(TestCase):
+    def test_insert_sin_imagen_variantes_usa_el_default_de_la_base(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO eventos_evento
+                    (titulo, fecha, hora, lugar, direccion, estado, descripcion, modo_aforo,
+                     cupo_total, cupos_reservados, creado, actualizado)
+                VALUES ('Evento sembrado', CURRENT_DATE, TIME '10:00', 'Plaza', '', 'confirmado', '',
+                        'general', 0, 0, NOW(), NOW())
+                RETURNING id
+                """
+            )
+            evento_id = cursor.fetchone()[0]
+        self.assertEqual(Evento.objects.get(pk=evento_id).imagen_variantes, {})
+
+
+@override_settings(EVENTOS_IMAGENES_EN_SEGUNDO_PLANO=False)
+class VariantesImagenTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def _rutas(self, nombre):
+        return [ruta_variante(nombre, variante, formato) for variante in VARIANTES for formato in FORMATOS]
+
+    def _crear_con_portada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            evento = crear_evento(imagen_portada=imagen_png())
+        evento.refresh_from_db()
+        self.assertEqual(set(evento.imagen_variantes), set(VARIANTES))
+        return evento
+
+    def test_reemplazar_portada_borra_las_variantes_anteriores(self):
+        evento = self._crear_con_portada()
+        anterior = evento.imagen_portada.name
+        # Instancia leída antes de que existieran las variantes: no puede depender de su JSON.
+        evento.imagen_variantes = {}
+
+        evento.imagen_portada = imagen_png("otra.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            evento.save()
+
+        self.assertFalse(any(default_storage.exists(ruta) for ruta in self._rutas(anterior)))
+        evento.refresh_from_db()
+        self.assertTrue(all(default_storage.exists(ruta) for ruta in self._rutas(evento.imagen_portada.name)))
+
+    def test_eliminar_evento_borra_sus_variantes(self):
+        evento = self._crear_con_portada()
+        rutas = self._rutas(evento.imagen_portada.name)
+        self.assertTrue(all(default_storage.exists(ruta) for ruta in rutas))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            evento.delete()
+
+        self.assertFalse(any(default_storage.exists(ruta) for ruta in rutas))
+
+
+class ConsultasApiTests(TestCase):
+    """El costo en consultas de listado, detalle y exportación no depende de cuántos eventos haya."""
+
+    CONSULTAS = {"list": 4, "detail": 2, "export": 1}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+
+    def sembrar(self, cantidad):
+        for _ in range(cantidad):
+            evento = crear_evento(modo_aforo=Evento.MODO_ZONAS, estado=Evento.CONFIRMADO)
+            ZonaEvento.objects.create(evento=evento, nombre="Platea", cupo_total=100)
+            ZonaEvento.objects.create(evento=evento, nombre="Palco", cupo_total=20)
+        return evento
+
+    def test_consultas_constantes(self):
+        for cantidad in (2, 18):
+            evento = self.sembrar(cantidad)
+            urls = {
+                "list": reverse("evento-list"),
+                "detail": reverse("evento-detail", args=[evento.pk]),
+                "export": reverse("evento-export"),
+            }
+            for accion, url in urls.items():
+                with self.subTest(accion, eventos=Evento.objects.count()):
+                    with self.assertNumQueries(self.CONSULTAS[accion]):
+                        response = self.client.get(url)
+                        # La exportación es streaming: se consume dentro de la medición.
+                        b"".join(response.streaming_content if response.streaming else [response.content])
+                    self.assertEqual(response.status_code, 200)
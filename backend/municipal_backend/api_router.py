@@ -1,14 +1,18 @@
 from rest_framework import routers
 
+from comun.api import TrabajoExportacionViewSet
 from cuentas.api import CuentaViewSet
 from eventos.api import EventoViewSet
-from reservas.api import ReservaViewSet
+from reservas.api import EsperaReservaViewSet, ImportacionViewSet, ReservaViewSet
 from reportes.api import ReporteViewSet
 
 router = routers.DefaultRouter()
 router.register("cuentas", CuentaViewSet, basename="cuenta")
 router.register("eventos", EventoViewSet, basename="evento")
 router.register("reservas", ReservaViewSet, basename="reserva")
+router.register("espera", EsperaReservaViewSet, basename="espera")
 router.register("reportes", ReporteViewSet, basename="reporte")
+router.register("exportaciones", TrabajoExportacionViewSet, basename="exportacion")
+router.register("importaciones", ImportacionViewSet, basename="importacion")
 
 urlpatterns = router.urls
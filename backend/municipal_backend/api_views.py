@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticate
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from comun.idempotencia import idempotente
 from cuentas.api import CuentaSerializer
 from cuentas.models import Cuenta
 from cuentas.permissions import get_user_role
@@ -124,6 +125,7 @@ class SessionLoginAPIView(APIView):
 class SessionRegisterAPIView(APIView):
     permission_classes = [AllowAny]
 
+    @idempotente
     def post(self, request):
         nombre = (request.data.get("nombre") or "").strip()
         usuario = (request.data.get("usuario") or "").strip()
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'municipal_backend.settings')
 
 application = get_asgi_application()
+
+# Los trabajos de exportación de un proceso anterior ya no tienen hilo que los termine.
+from comun.exportaciones import marcar_huerfanos_al_iniciar  # noqa: E402
+
+marcar_huerfanos_al_iniciar()
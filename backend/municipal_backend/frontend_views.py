@@ -0,0 +1,34 @@
+import hashlib
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
+
+
+class FrontendIndexView(View):
+    """
+    Entrega el ``index.html`` del build de Vite para las rutas del SPA.
+
+    A diferencia de los assets con hash (cacheados sin vencimiento por
+    WhiteNoise), el índice se revalida en cada carga con su ETag, de modo que
+    un despliegue nuevo se ve de inmediato y las visitas repetidas reciben 304.
+    """
+
+    def _ruta(self):
+        for base in (settings.STATIC_ROOT, settings.FRONTEND_DIST_DIR):
+            ruta = base / "index.html"
+            if ruta.exists():
+                return ruta
+        raise Http404("No hay build del frontend.")
+
+    def get(self, request, *args, **kwargs):
+        contenido = self._ruta().read_bytes()
+        etag = quote_etag(hashlib.md5(contenido).hexdigest())
+        response = get_conditional_response(request, etag=etag) or HttpResponse(
+            contenido, content_type="text/html; charset=utf-8"
+        )
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True, max_age=0)
+        return response
@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import re
+
+from corsheaders.defaults import default_headers
 
 
 def env_bool(name: str, default: bool = False) -> bool:
@@ -45,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
      # Terceros
     "rest_framework",
@@ -53,6 +57,7 @@ INSTALLED_APPS = [
     "corsheaders",
 
     # Apps del dominio
+    "comun",
     "cuentas",
     "eventos",
     "reservas",
@@ -63,6 +68,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # Debe ir antes de CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
+    "whitenoise.middleware.WhiteNoiseMiddleware",  # Justo después de SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +77,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if env_bool("API_QUERY_COUNT_HEADER", False):
+    MIDDLEWARE.insert(0, "comun.middleware.ConteoConsultasMiddleware")
+
 ROOT_URLCONF = 'municipal_backend.urls'
 
 TEMPLATES = [
@@ -148,6 +157,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = Path(os.getenv("STATIC_ROOT", BASE_DIR / "staticfiles"))
 
 FRONTEND_DIST_DIR = BASE_DIR.parent / "frontend" / "dist"
 if FRONTEND_DIST_DIR.exists():
@@ -155,10 +165,42 @@ if FRONTEND_DIST_DIR.exists():
 else:
     STATICFILES_DIRS = []
 
+# Sirve el index.html del SPA (build de Vite con base /static/) en las rutas
+# que no atiende Django, con caché corta; los assets van por WhiteNoise.
+FRONTEND_SPA = env_bool("FRONTEND_SPA", False)
+
+# Con STATIC_MANIFEST=1, collectstatic agrega hash al nombre y precomprime cada
+# archivo en gzip y brotli (si está instalado el paquete ``Brotli``). Es opt-in:
+# ese almacenamiento falla en cada ``{% static %}`` hasta que exista el manifiesto
+# generado por ``collectstatic``, así que solo se activa en despliegues que lo ejecutan.
+STATIC_MANIFEST = env_bool("STATIC_MANIFEST", False)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
+
+def _estatico_inmutable(path, url):
+    """Archivos con hash de Django (app.0123456789ab.css) o de Vite (assets/index-AbC12xyZ.js)."""
+    return bool(re.search(r"\.[0-9a-f]{12}\.\w+$", url) or re.search(r"/assets/[^/]+-[\w-]{8}\.\w+$", url))
+
+
+# Los archivos con hash se cachean sin vencimiento (``immutable``); el resto, 60 s.
+WHITENOISE_IMMUTABLE_FILE_TEST = _estatico_inmutable
+
 # Media (uploads locales)
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Genera las variantes de las portadas en un hilo aparte (False: dentro de la petición).
+EVENTOS_IMAGENES_EN_SEGUNDO_PLANO = env_bool("EVENTOS_IMAGENES_EN_SEGUNDO_PLANO", True)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -187,9 +229,72 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {
         "anon": os.getenv("API_THROTTLE_ANON", "100/min"),
         "user": os.getenv("API_THROTTLE_USER", "1000/min"),
+        "checkin": os.getenv("API_THROTTLE_CHECKIN", "60000/min"),
     },
 }
 
+# Minutos que se mantienen apartados los cupos de una reserva en curso.
+RESERVAS_RETENCION_MINUTOS = int(os.getenv("RESERVAS_RETENCION_MINUTOS", "10"))
+
+# Días que se guardan las bajas de reservas para los deltas de check-in sin conexión;
+# un lector con un cursor más antiguo recibe el snapshot completo.
+RESERVAS_BAJAS_RETENCION_DIAS = int(os.getenv("RESERVAS_BAJAS_RETENCION_DIAS", "30"))
+
+# Horas que se guarda la respuesta de un POST con Idempotency-Key.
+IDEMPOTENCIA_TTL_HORAS = int(os.getenv("IDEMPOTENCIA_TTL_HORAS", "24"))
+
+# Tamaño máximo (MB) de un archivo para POST /api/importaciones/, que se procesa dentro
+# de la petición; lo que no entre en el timeout del worker va por ``importar_lotes``.
+IMPORTACIONES_MAX_MB = int(os.getenv("IMPORTACIONES_MAX_MB", "5"))
+
+# Exportaciones CSV en segundo plano (False: se generan dentro de la petición).
+EXPORTACIONES_EN_SEGUNDO_PLANO = env_bool("EXPORTACIONES_EN_SEGUNDO_PLANO", True)
+# Minutos en que un archivo ya generado se reutiliza para los mismos filtros.
+EXPORTACIONES_VIGENCIA_MINUTOS = int(os.getenv("EXPORTACIONES_VIGENCIA_MINUTOS", "10"))
+# Horas que se guardan los trabajos y sus archivos antes de ``purgar_exportaciones``.
+EXPORTACIONES_RETENCION_HORAS = int(os.getenv("EXPORTACIONES_RETENCION_HORAS", "24"))
+# Carpeta de los CSV exportados: fuera de MEDIA_ROOT y sin URL pública; solo se
+# entregan por /api/exportaciones/<id>/descargar/ a quien pidió el trabajo.
+EXPORTACIONES_ROOT = Path(os.getenv("EXPORTACIONES_ROOT", BASE_DIR / "exportaciones"))
+STORAGES["exportaciones"] = {
+    "BACKEND": "comun.models.AlmacenamientoPrivado",
+    "OPTIONS": {"location": EXPORTACIONES_ROOT},
+}
+
+# Caché compartida. Con CACHE_URL=redis://... usa Redis (requiere el paquete ``redis``);
+# sin ella, memoria local de cada proceso.
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}
+        if CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "municipal"}
+    )
+}
+# Con la memoria local cada proceso solo ve sus propias invalidaciones: lo que se
+# invalida por evento debe vivir poco o no cachearse entre solicitudes.
+CACHE_COMPARTIDA = bool(CACHE_URL)
+
+# Segundos que se reutilizan las sugerencias de /api/eventos/autocomplete/ por texto.
+EVENTOS_AUTOCOMPLETE_CACHE_SEGUNDOS = int(os.getenv("EVENTOS_AUTOCOMPLETE_CACHE_SEGUNDOS", "30"))
+
+# Segundos que se guarda una respuesta de la API para visitantes anónimos (listado y
+# detalle de eventos); cualquier cambio de un evento o zona la invalida antes.
+# Solo se usa con caché compartida (CACHE_COMPARTIDA).
+API_CACHE_ANONIMA_SEGUNDOS = int(os.getenv("API_CACHE_ANONIMA_SEGUNDOS", "300"))
+# Los cambios de cupos (cada reserva) renuevan esa caché como mucho una vez por este plazo.
+API_CACHE_ANONIMA_CUPOS_SEGUNDOS = int(os.getenv("API_CACHE_ANONIMA_CUPOS_SEGUNDOS", "5"))
+
+# Segundos que se guarda el calendario de un mes; se invalida antes si cambian sus datos.
+# Sin caché compartida la invalidación no alcanza a los otros procesos y el plazo es corto.
+EVENTOS_CALENDARIO_CACHE_SEGUNDOS = int(
+    os.getenv("EVENTOS_CALENDARIO_CACHE_SEGUNDOS", "3600" if CACHE_COMPARTIDA else "30")
+)
+
+# Segundos que se comparte el rol resuelto de un usuario entre solicitudes (solo con
+# caché compartida); guardar o eliminar una cuenta lo invalida antes.
+CUENTAS_ROL_CACHE_SEGUNDOS = int(os.getenv("CUENTAS_ROL_CACHE_SEGUNDOS", "300"))
+
 # Email: consola por defecto (útil en dev). Sobrescribir con variables SMTP cuando se tengan.
 EMAIL_BACKEND = os.getenv(
     "EMAIL_BACKEND",
@@ -218,6 +323,7 @@ CORS_ALLOWED_ORIGINS = [
     os.getenv("FRONTEND_ORIGIN", "http://localhost:5173"),
 ]
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 CSRF_TRUSTED_ORIGINS = [
     os.getenv("FRONTEND_ORIGIN", "http://localhost:5173"),
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from django.views.generic import RedirectView
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
@@ -13,6 +13,7 @@ from municipal_backend.api_views import (
     SessionLogoutAPIView,
     SessionStatusAPIView,
 )
+from municipal_backend.frontend_views import FrontendIndexView
 
 urlpatterns = [
     path("", RedirectView.as_view(pattern_name="cuentas:panel", permanent=False)),
@@ -45,3 +46,9 @@ urlpatterns = [
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.FRONTEND_SPA:
+    # Al final: solo recibe las rutas del SPA que no atiende ninguna vista de Django.
+    urlpatterns += [
+        re_path(r"^(?!api/|admin/|static/|media/).*$", FrontendIndexView.as_view(), name="frontend"),
+    ]
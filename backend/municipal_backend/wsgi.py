@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'municipal_backend.settings')
 
 application = get_wsgi_application()
+
+# Los trabajos de exportación de un proceso anterior ya no tienen hilo que los termine.
+from comun.exportaciones import marcar_huerfanos_al_iniciar  # noqa: E402
+
+marcar_huerfanos_al_iniciar()
@@ -4,7 +4,9 @@ from rest_framework import filters as drf_filters, serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 
-from cuentas.export_utils import export_to_csv
+from comun.condicional import GetCondicionalMixin
+from comun.exportaciones import ExportacionAsincronaMixin
+from cuentas.export_utils import export_to_csv_copy, export_to_csv_stream
 from cuentas.permissions import IsAdminOrEditor
 from .models import Reporte
 
@@ -46,13 +48,14 @@ class ReporteSerializer(serializers.ModelSerializer):
         ]
 
 
-class ReporteViewSet(viewsets.ModelViewSet):
+class ReporteViewSet(ExportacionAsincronaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """API CRUD para reportes generados por el sistema."""
 
     queryset = Reporte.objects.all()
     serializer_class = ReporteSerializer
     permission_classes = [IsAuthenticated, IsAdminOrEditor]
     filterset_class = ReporteFilter
+    campos_exportacion = ['titulo', 'fecha', 'publicado', 'creado']
     search_fields = ["titulo", "descripcion", "categorias"]
     ordering_fields = ["fecha", "creado"]
     ordering = ["-fecha", "-creado"]
@@ -62,5 +65,6 @@ class ReporteViewSet(viewsets.ModelViewSet):
     def export(self, request):
         """Exporta los reportes filtrados a CSV."""
         queryset = self.filter_queryset(self.get_queryset())
-        fields = ['titulo', 'fecha', 'publicado', 'creado']
-        return export_to_csv(queryset, fields, filename='reportes.csv')
+        # ``?modo=copy`` delega el CSV a PostgreSQL (COPY TO STDOUT).
+        exportar = export_to_csv_copy if request.query_params.get('modo') == 'copy' else export_to_csv_stream
+        return exportar(queryset, self.campos_exportacion, filename='reportes.csv')
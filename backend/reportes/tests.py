@@ -1,3 +1,38 @@
-﻿from django.test import TestCase
+﻿from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Reporte
+
+
+class ConsultasApiTests(TestCase):
+    """Listado, detalle y exportación de reportes cuestan lo mismo con pocas o muchas filas."""
+
+    CONSULTAS = {"list": 3, "detail": 1, "export": 1}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+
+    def test_consultas_constantes(self):
+        for cantidad in (2, 18):
+            reportes = Reporte.objects.bulk_create(
+                Reporte(titulo=f"Reporte mensual {i}", fecha=date(2030, 1, 15), categorias=[Reporte.CATEGORIA_EVENTOS])
+                for i in range(cantidad)
+            )
+            urls = {
+                "list": reverse("reporte-list"),
+                "detail": reverse("reporte-detail", args=[reportes[-1].pk]),
+                "export": reverse("reporte-export"),
+            }
+            for accion, url in urls.items():
+                with self.subTest(accion, reportes=Reporte.objects.count()):
+                    with self.assertNumQueries(self.CONSULTAS[accion]):
+                        response = self.client.get(url)
+                        b"".join(response.streaming_content if response.streaming else [response.content])
+                    self.assertEqual(response.status_code, 200)
@@ -1,10 +1,53 @@
-﻿from django.contrib import admin
+﻿from django import forms
+from django.contrib import admin
 
-from .models import Reserva
+from .models import EsperaReserva, Reserva
+from .services import guardar_reserva, validar_zona, verificar_aforo
+
+
+class ReservaAdminForm(forms.ModelForm):
+    class Meta:
+        model = Reserva
+        fields = "__all__"
+
+    def clean(self):
+        cleaned_data = super().clean()
+        evento = cleaned_data.get("evento")
+        cupos = cleaned_data.get("cupos_solicitados")
+        if cupos is not None and cupos <= 0:
+            self.add_error("cupos_solicitados", "Debe ser mayor a 0.")
+        elif evento and cupos:
+            validar_zona(evento, cleaned_data.get("zona"))
+            # El formulario del admin se valida y se guarda en la misma transacción,
+            # así que el bloqueo del evento/zona se mantiene hasta ``save_model``.
+            verificar_aforo(
+                evento,
+                cleaned_data.get("zona"),
+                cupos,
+                estado=cleaned_data.get("estado") or Reserva.PENDIENTE,
+                reserva_id=self.instance.pk,
+            )
+        return cleaned_data
 
 
 @admin.register(Reserva)
 class ReservaAdmin(admin.ModelAdmin):
-    list_display = ("codigo", "espacio", "fecha", "hora", "solicitante", "estado")
+    form = ReservaAdminForm
+    list_display = ("codigo", "espacio", "fecha", "hora", "solicitante", "estado", "asistencia")
     list_filter = ("estado", "fecha")
     search_fields = ("codigo", "espacio", "solicitante")
+
+    def save_model(self, request, obj, form, change):
+        guardar_reserva(obj)
+
+
+@admin.register(EsperaReserva)
+class EsperaReservaAdmin(admin.ModelAdmin):
+    list_display = ("evento", "zona", "turno", "solicitante", "cupos_solicitados", "estado")
+    list_filter = ("estado",)
+    search_fields = ("solicitante", "evento__titulo")
+    readonly_fields = ("turno", "estado", "reserva")
+
+    def has_add_permission(self, request):
+        # Las entradas se crean por la API para asignar el turno bajo bloqueo.
+        return False
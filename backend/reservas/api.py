@@ -1,13 +1,45 @@
-from django.db.models import Sum
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, serializers, viewsets
+from rest_framework import filters, mixins, permissions, serializers, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 
-from cuentas.export_utils import export_to_csv
+from comun.condicional import GetCondicionalMixin
+from comun.consultas import PlanConsultasMixin
+from comun.exportaciones import ExportacionAsincronaMixin
+from comun.paginacion import PaginacionConCursor
+from comun.idempotencia import idempotente
+from cuentas.export_utils import export_to_csv_copy, export_to_csv_stream
 from cuentas.models import Cuenta
-from cuentas.permissions import IsAdminOrEditor, get_user_role
+from cuentas.permissions import IsAdmin, IsAdminOrEditor, get_user_role
 from eventos.models import Evento, ZonaEvento
-from .models import Reserva
+from . import importacion, sincronizacion
+from .models import EsperaReserva, Reserva, RetencionCupos
+from .services import (
+    ASISTENCIA_OK,
+    anotar_posiciones,
+    crear_reservas_en_lote,
+    encolar_espera,
+    guardar_reserva,
+    liberar_retencion,
+    posicion_en_espera,
+    registrar_asistencia,
+    retener_cupos,
+    retirar_espera,
+    validar_zona,
+)
+
+MAX_RESERVAS_LOTE = 1000
+MAX_CODIGOS_CHECKIN = 500
+MAX_REGISTROS_OFFLINE = 5000
 
 
 class IsReservaRequester(permissions.BasePermission):
@@ -48,6 +80,11 @@ class ReservaSerializer(serializers.ModelSerializer):
     zona = serializers.PrimaryKeyRelatedField(
         queryset=ZonaEvento.objects.all(), required=False, allow_null=True
     )
+    retencion = serializers.UUIDField(
+        write_only=True,
+        required=False,
+        help_text="Token de una retención de cupos vigente del mismo evento/zona.",
+    )
 
     class Meta:
         model = Reserva
@@ -66,10 +103,12 @@ class ReservaSerializer(serializers.ModelSerializer):
             "estado",
             "estado_display",
             "notas",
+            "asistencia",
+            "retencion",
             "creado",
             "actualizado",
         ]
-        read_only_fields = ["codigo", "fecha", "hora", "estado_display", "creado", "actualizado"]
+        read_only_fields = ["codigo", "fecha", "hora", "estado_display", "asistencia", "creado", "actualizado"]
 
     def validate(self, attrs):
         request = self.context.get("request")
@@ -93,49 +132,101 @@ class ReservaSerializer(serializers.ModelSerializer):
         if cupos <= 0:
             raise serializers.ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
 
-        if evento.modo_aforo == Evento.MODO_GENERAL:
-            if zona is not None:
-                raise serializers.ValidationError({"zona": "Este evento no usa zonas."})
-            reservados = (
-                Reserva.objects.filter(evento=evento)
-                .exclude(pk=self.instance.pk if self.instance else None)
-                .aggregate(total=Sum("cupos_solicitados"))
-                .get("total")
-                or 0
-            )
-            disponible = max(evento.cupo_total - reservados, 0)
-            if cupos > disponible and evento.cupo_total:
-                raise serializers.ValidationError({
-                    "cupos_solicitados": f"No hay cupos suficientes. Disponible: {disponible}.",
-                })
-        else:
-            if not zona:
-                raise serializers.ValidationError({"zona": "Selecciona una zona."})
-            if zona.evento_id != evento.id:
-                raise serializers.ValidationError({"zona": "La zona no pertenece a este evento."})
-            reservados = (
-                Reserva.objects.filter(evento=evento, zona=zona)
-                .exclude(pk=self.instance.pk if self.instance else None)
-                .aggregate(total=Sum("cupos_solicitados"))
-                .get("total")
-                or 0
-            )
-            disponible = max(zona.cupo_total - reservados, 0)
-            if cupos > disponible and zona.cupo_total:
-                raise serializers.ValidationError({
-                    "cupos_solicitados": f"No hay cupos suficientes en la zona. Disponible: {disponible}.",
-                })
+        try:
+            validar_zona(evento, zona)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+
+        token = attrs.pop("retencion", None)
+        if token:
+            if self.instance:
+                raise serializers.ValidationError({"retencion": "Solo se usa al crear una reserva."})
+            retencion = RetencionCupos.objects.filter(
+                token=token, solicitante=request.user.get_username(), expira__gt=timezone.now()
+            ).first()
+            if retencion is None:
+                raise serializers.ValidationError({"retencion": "Retención no encontrada o vencida."})
+            if (retencion.evento_id, retencion.zona_id) != (evento.id, zona.id if zona else None):
+                raise serializers.ValidationError({"retencion": "La retención es de otro evento o zona."})
+            attrs["retencion"] = retencion
 
         return attrs
 
+    def create(self, validated_data):
+        retencion = validated_data.pop("retencion", None)
+        return self._guardar(Reserva(**validated_data), retencion=retencion)
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        return self._guardar(instance)
+
+    def _guardar(self, reserva, retencion=None):
+        # El control de aforo ocurre bajo bloqueo dentro del motor de reservas.
+        try:
+            return guardar_reserva(reserva, retencion=retencion)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+
+
+class RetencionCuposSerializer(serializers.ModelSerializer):
+    evento = serializers.PrimaryKeyRelatedField(queryset=Evento.objects.all())
+    zona = serializers.PrimaryKeyRelatedField(
+        queryset=ZonaEvento.objects.all(), required=False, allow_null=True
+    )
+
+    class Meta:
+        model = RetencionCupos
+        fields = ["token", "evento", "zona", "cupos_solicitados", "expira"]
+        read_only_fields = ["token", "expira"]
+
+    def create(self, validated_data):
+        try:
+            return retener_cupos(RetencionCupos(**validated_data))
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+
+
+class CheckinOfflineSerializer(serializers.Serializer):
+    codigo = serializers.CharField(max_length=32)
+    momento = serializers.DateTimeField()
+
+
+class ReservaLoteItemSerializer(serializers.ModelSerializer):
+    """Elemento de ``POST /api/reservas/bulk/``; evento y zona se resuelven en bloque."""
+
+    evento = serializers.IntegerField()
+    zona = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Reserva
+        fields = ["espacio", "solicitante", "evento", "zona", "cupos_solicitados", "estado", "notas"]
+        extra_kwargs = {
+            "espacio": {"required": False},
+            "solicitante": {"required": False},
+        }
+
+    def validate_cupos_solicitados(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Debe ser mayor a 0.")
+        return value
+
 
-class ReservaViewSet(viewsets.ModelViewSet):
+class ReservaViewSet(ExportacionAsincronaMixin, PlanConsultasMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """API CRUD para reservas de espacios municipales."""
 
     queryset = Reserva.objects.all()
+    plan_consultas = {"*": {"select_related": ["evento", "zona"]}}
+    # Cada reserva muestra el título del evento y el nombre de la zona.
+    campos_modificado = ("actualizado", "evento__actualizado")
+    pagination_class = PaginacionConCursor
     serializer_class = ReservaSerializer
     permission_classes = [IsReservaRequester]
     filterset_fields = ["estado", "fecha", "espacio", "evento", "zona"]
+    campos_exportacion = [
+        'codigo', 'espacio', 'fecha', 'hora', 'solicitante', 'estado',
+        ('evento', 'evento__titulo'), ('zona', 'zona__nombre'), 'cupos_solicitados', 'creado',
+    ]
     search_fields = [
         "codigo",
         "espacio",
@@ -147,6 +238,8 @@ class ReservaViewSet(viewsets.ModelViewSet):
     ordering_fields = ["fecha", "hora", "creado", "cupos_solicitados"]
     ordering = ["-fecha", "-hora"]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Solo lo leen las acciones con ``ScopedRateThrottle`` (check-in); el resto usa los throttles por defecto.
+    throttle_scope = "checkin"
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -160,6 +253,10 @@ class ReservaViewSet(viewsets.ModelViewSet):
 
         return queryset.filter(solicitante=request.user.get_username())
 
+    @idempotente
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         role = get_user_role(self.request.user)
         if self.request.user.is_superuser or role in [Cuenta.ADMIN, Cuenta.EDITOR]:
@@ -170,9 +267,364 @@ class ReservaViewSet(viewsets.ModelViewSet):
                 estado=Reserva.PENDIENTE,
             )
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    @idempotente
+    def bulk(self, request):
+        """Crea varias reservas en una sola transacción y devuelve el resultado por elemento."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "Envía una lista de reservas."}, status=400)
+        if len(items) > MAX_RESERVAS_LOTE:
+            return Response(
+                {"detail": f"Máximo {MAX_RESERVAS_LOTE} reservas por solicitud."},
+                status=400,
+            )
+
+        role = get_user_role(request.user)
+        is_manager = request.user.is_superuser or role in [Cuenta.ADMIN, Cuenta.EDITOR]
+        username = request.user.get_username()
+
+        serializers_items = [ReservaLoteItemSerializer(data=item) for item in items]
+        validos = [serializer.is_valid() for serializer in serializers_items]
+        datos = [serializer.validated_data for serializer, ok in zip(serializers_items, validos) if ok]
+        eventos = Evento.objects.in_bulk({dato["evento"] for dato in datos})
+        zonas = ZonaEvento.objects.in_bulk({dato["zona"] for dato in datos if dato.get("zona")})
+
+        resultados = [None] * len(items)
+        pendientes = []
+        for indice, (serializer, ok) in enumerate(zip(serializers_items, validos)):
+            if not ok:
+                resultados[indice] = serializer.errors
+                continue
+            dato = dict(serializer.validated_data)
+            evento = eventos.get(dato.pop("evento"))
+            zona_id = dato.pop("zona", None)
+            zona = zonas.get(zona_id) if zona_id else None
+            if evento is None:
+                resultados[indice] = {"evento": ["Evento no encontrado."]}
+                continue
+            if zona_id and zona is None:
+                resultados[indice] = {"zona": ["Zona no encontrada."]}
+                continue
+            try:
+                validar_zona(evento, zona)
+            except DjangoValidationError as exc:
+                resultados[indice] = exc.message_dict
+                continue
+
+            if not is_manager:
+                dato["solicitante"] = username
+                dato["estado"] = Reserva.PENDIENTE
+            dato.setdefault("espacio", evento.lugar or evento.titulo or "Reserva evento")
+            if not dato.get("solicitante"):
+                resultados[indice] = {"solicitante": ["Este campo es requerido."]}
+                continue
+            pendientes.append((indice, Reserva(evento=evento, zona=zona, **dato)))
+
+        creados = crear_reservas_en_lote([reserva for _, reserva in pendientes])
+        for (indice, _), resultado in zip(pendientes, creados):
+            if isinstance(resultado, DjangoValidationError):
+                resultados[indice] = resultado.message_dict
+            else:
+                resultados[indice] = resultado
+
+        respuesta = []
+        for indice, resultado in enumerate(resultados):
+            if isinstance(resultado, Reserva):
+                respuesta.append({"indice": indice, "ok": True, "id": resultado.pk, "codigo": resultado.codigo})
+            else:
+                respuesta.append({"indice": indice, "ok": False, "errores": resultado})
+        creadas = sum(1 for item in respuesta if item["ok"])
+        return Response(
+            {"creadas": creadas, "rechazadas": len(respuesta) - creadas, "resultados": respuesta},
+            status=201 if creadas else 400,
+        )
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        url_path="retenciones",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def retenciones(self, request):
+        """
+        POST aparta cupos por unos minutos y devuelve el token para confirmar la reserva.
+        DELETE (``?token=``) libera una retención propia que ya no se usará.
+        """
+        username = request.user.get_username()
+        if request.method == "DELETE":
+            try:
+                token = uuid.UUID(str(request.query_params.get("token") or request.data.get("token")))
+            except ValueError:
+                token = None
+            retencion = token and RetencionCupos.objects.filter(token=token, solicitante=username).first()
+            if not retencion:
+                return Response({"detail": "Retención no encontrada."}, status=404)
+            liberar_retencion(retencion)
+            return Response(status=204)
+
+        serializer = RetencionCuposSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        serializer.save(solicitante=username)
+        return Response(serializer.data, status=201)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="checkin",
+        permission_classes=[IsAdminOrEditor],
+        throttle_classes=[ScopedRateThrottle],
+    )
+    def checkin(self, request):
+        """
+        Registra asistencia en la entrada por ``codigo`` o por lote (``codigos``).
+
+        Los lectores que sincronizan en ráfagas envían hasta ``MAX_CODIGOS_CHECKIN``
+        códigos por llamada; ``evento`` restringe los códigos válidos a ese evento.
+        """
+        codigos = request.data.get("codigos")
+        if codigos is None and request.data.get("codigo"):
+            codigos = [request.data["codigo"]]
+        if not isinstance(codigos, list) or not codigos:
+            return Response({"detail": "Envía 'codigo' o una lista 'codigos'."}, status=400)
+        if len(codigos) > MAX_CODIGOS_CHECKIN:
+            return Response(
+                {"detail": f"Máximo {MAX_CODIGOS_CHECKIN} códigos por solicitud."},
+                status=400,
+            )
+
+        evento_id = request.data.get("evento")
+        if evento_id is not None and not str(evento_id).isdigit():
+            return Response({"evento": "Debe ser un id numérico."}, status=400)
+
+        resultados = registrar_asistencia(codigos, evento_id=evento_id)
+        aceptados = sum(1 for _, resultado in resultados if resultado == ASISTENCIA_OK)
+        return Response({
+            "aceptados": aceptados,
+            "rechazados": len(resultados) - aceptados,
+            "resultados": [{"codigo": codigo, "resultado": resultado} for codigo, resultado in resultados],
+        })
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="checkin-offline",
+        permission_classes=[IsAdminOrEditor],
+        throttle_classes=[ScopedRateThrottle],
+    )
+    def checkin_offline(self, request):
+        """Sube en una sola solicitud los check-ins (``codigo`` + ``momento``) hechos sin conexión."""
+        registros = request.data.get("registros")
+        if not isinstance(registros, list) or not registros:
+            return Response({"detail": "Envía una lista 'registros'."}, status=400)
+        if len(registros) > MAX_REGISTROS_OFFLINE:
+            return Response(
+                {"detail": f"Máximo {MAX_REGISTROS_OFFLINE} registros por solicitud."},
+                status=400,
+            )
+        serializer = CheckinOfflineSerializer(data=registros, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        evento_id = request.data.get("evento")
+        if evento_id is not None and not str(evento_id).isdigit():
+            return Response({"evento": "Debe ser un id numérico."}, status=400)
+
+        codigos = [registro["codigo"] for registro in serializer.validated_data]
+        momentos = {registro["codigo"]: registro["momento"] for registro in serializer.validated_data}
+        resultados = registrar_asistencia(codigos, evento_id=evento_id, momentos=momentos)
+        aceptados = sum(1 for _, resultado in resultados if resultado == ASISTENCIA_OK)
+        return Response({
+            "aceptados": aceptados,
+            "rechazados": len(resultados) - aceptados,
+            "resultados": [{"codigo": codigo, "resultado": resultado} for codigo, resultado in resultados],
+        })
+
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminOrEditor])
+    def snapshot(self, request):
+        """
+        Descarga los códigos válidos de ``?evento=`` en formato binario compacto.
+
+        Con ``?desde=<cursor>`` devuelve solo los cambios posteriores (altas,
+        cancelaciones, bajas y asistencias). El cursor siguiente viaja en la
+        cabecera del archivo y en ``X-Sgre-Cursor``; si el cursor es anterior
+        a la retención de bajas se responde con el snapshot completo.
+        """
+        evento_id = request.query_params.get("evento", "")
+        desde = request.query_params.get("desde")
+        if not evento_id.isdigit():
+            return Response({"evento": "Indica el id del evento."}, status=400)
+        if desde is not None and not desde.isdigit():
+            return Response({"desde": "Cursor inválido."}, status=400)
+
+        evento = get_object_or_404(Evento.objects.only("pk"), pk=evento_id)
+        contenido, cursor = sincronizacion.empaquetar(
+            evento,
+            desde=sincronizacion.desde_cursor(desde) if desde is not None else None,
+        )
+        response = HttpResponse(contenido, content_type=sincronizacion.CONTENT_TYPE)
+        response["X-Sgre-Cursor"] = str(cursor)
+        response["Content-Disposition"] = f'attachment; filename="checkin-{evento.pk}-{cursor}.bin"'
+        return response
+
     @action(detail=False, methods=['get'], permission_classes=[IsAdminOrEditor])
     def export(self, request):
         """Exporta las reservas filtradas a CSV."""
         queryset = self.filter_queryset(self.get_queryset())
-        fields = ['codigo', 'espacio', 'fecha', 'hora', 'solicitante', 'estado', 'evento', 'zona', 'cupos_solicitados', 'creado']
-        return export_to_csv(queryset, fields, filename='reservas.csv')
+        # ``?modo=copy`` delega el CSV a PostgreSQL (COPY TO STDOUT).
+        exportar = export_to_csv_copy if request.query_params.get('modo') == 'copy' else export_to_csv_stream
+        return exportar(queryset, self.campos_exportacion, filename='reservas.csv')
+
+
+class IsEsperaRequester(permissions.BasePermission):
+    """
+    Cualquier usuario autenticado puede anotarse en la lista de espera.
+    Cada uno ve y retira sus propias entradas; admins/editores, todas.
+    """
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated)
+
+    def has_object_permission(self, request, view, obj):
+        role = get_user_role(request.user)
+        if request.user.is_superuser or role in [Cuenta.ADMIN, Cuenta.EDITOR]:
+            return True
+        return obj.solicitante == request.user.get_username()
+
+
+class EsperaReservaSerializer(serializers.ModelSerializer):
+    estado_display = serializers.CharField(source="get_estado_display", read_only=True)
+    evento_titulo = serializers.CharField(source="evento.titulo", read_only=True)
+    zona_nombre = serializers.CharField(source="zona.nombre", read_only=True)
+    evento = serializers.PrimaryKeyRelatedField(queryset=Evento.objects.all())
+    zona = serializers.PrimaryKeyRelatedField(
+        queryset=ZonaEvento.objects.all(), required=False, allow_null=True
+    )
+    posicion = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EsperaReserva
+        fields = [
+            "id",
+            "evento",
+            "evento_titulo",
+            "zona",
+            "zona_nombre",
+            "turno",
+            "posicion",
+            "espacio",
+            "solicitante",
+            "cupos_solicitados",
+            "notas",
+            "estado",
+            "estado_display",
+            "reserva",
+            "creado",
+            "actualizado",
+        ]
+        read_only_fields = ["turno", "estado", "reserva", "creado", "actualizado"]
+        extra_kwargs = {
+            "espacio": {"required": False},
+            "solicitante": {"required": False},
+        }
+
+    def get_posicion(self, obj):
+        # Los listados la traen anotada (``anotar_posiciones``); una entrada recién creada no.
+        if hasattr(obj, "posicion"):
+            return obj.posicion
+        return posicion_en_espera(obj)
+
+    def validate(self, attrs):
+        evento = attrs["evento"]
+        if attrs.get("cupos_solicitados", 1) <= 0:
+            raise serializers.ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
+        try:
+            validar_zona(evento, attrs.get("zona"))
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+        if not attrs.get("espacio"):
+            attrs["espacio"] = evento.lugar or evento.titulo or "Reserva evento"
+        return attrs
+
+    def create(self, validated_data):
+        try:
+            return encolar_espera(EsperaReserva(**validated_data))
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict)
+
+
+class EsperaReservaViewSet(
+    PlanConsultasMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Lista de espera FIFO para eventos o zonas sin cupos disponibles."""
+
+    queryset = EsperaReserva.objects.all()
+    plan_consultas = {"*": {"select_related": ["evento", "zona"]}}
+    serializer_class = EsperaReservaSerializer
+    permission_classes = [IsEsperaRequester]
+    filterset_fields = ["estado", "evento", "zona"]
+    ordering_fields = ["turno", "creado"]
+    ordering = ["turno"]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+
+    def get_queryset(self):
+        queryset = anotar_posiciones(super().get_queryset())
+        role = get_user_role(self.request.user)
+        if self.request.user.is_superuser or role in [Cuenta.ADMIN, Cuenta.EDITOR]:
+            return queryset
+        return queryset.filter(solicitante=self.request.user.get_username())
+
+    def perform_create(self, serializer):
+        role = get_user_role(self.request.user)
+        if self.request.user.is_superuser or role in [Cuenta.ADMIN, Cuenta.EDITOR]:
+            if not serializer.validated_data.get("solicitante"):
+                raise serializers.ValidationError({"solicitante": "Este campo es requerido."})
+            serializer.save()
+        else:
+            serializer.save(solicitante=self.request.user.get_username())
+
+    def perform_destroy(self, instance):
+        if instance.estado != EsperaReserva.ESPERANDO:
+            raise serializers.ValidationError({"estado": "La entrada ya no está en espera."})
+        retirar_espera(instance)
+
+
+class ImportacionSerializer(serializers.Serializer):
+    tipo = serializers.ChoiceField(choices=sorted(importacion.CAMPOS))
+    archivo = serializers.FileField()
+    formato = serializers.ChoiceField(choices=importacion.FORMATOS, required=False)
+
+
+class ImportacionViewSet(viewsets.GenericViewSet):
+    """
+    Importación por lotes (CSV o NDJSON) de eventos, zonas y reservas.
+
+    El formato se deduce de la extensión del archivo si no se indica. Corre
+    dentro de la petición, así que acepta hasta ``IMPORTACIONES_MAX_MB``; las
+    cargas mayores van por ``importar_lotes`` o ``importar_copy``.
+    """
+
+    serializer_class = ImportacionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    parser_classes = [MultiPartParser]
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        archivo = serializer.validated_data["archivo"]
+        if archivo.size > settings.IMPORTACIONES_MAX_MB * 1024 * 1024:
+            return Response(
+                {"archivo": (
+                    f"El archivo supera {settings.IMPORTACIONES_MAX_MB} MB. Las cargas grandes se hacen con "
+                    "`manage.py importar_lotes` o `manage.py importar_copy`."
+                )},
+                status=413,
+            )
+        formato = serializer.validated_data.get("formato") or importacion.formato_de(archivo.name)
+        archivo.seek(0)
+        resultado = importacion.importar(serializer.validated_data["tipo"], archivo.file, formato)
+        return Response(resultado, status=201 if resultado["creadas"] else 400)
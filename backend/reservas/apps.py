@@ -4,3 +4,6 @@
 class ReservasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reservas"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,412 @@
+"""
+Importación masiva con ``COPY FROM`` (PostgreSQL + psycopg 3).
+
+El CSV se copia tal cual a una tabla temporal de texto; la validación corre
+por conjuntos (un UPDATE por regla que marca ``error`` en las filas que la
+incumplen) y las filas válidas se fusionan con un único INSERT ... SELECT.
+Los contadores de cupos se ajustan con un UPDATE agregado por evento/zona y
+la caché se invalida explícitamente, ya que no se disparan señales.
+
+- ``eventos``: inserta eventos nuevos.
+- ``zonas``: inserta o actualiza (``evento``, ``nombre``) el ``cupo_total``.
+- ``reservas``: inserta reservas, descontando el aforo en el orden del
+  archivo; dentro de cada evento/zona, desde la primera reserva que no
+  entra se rechazan las siguientes.
+
+Las filas con error se informan con su línea y no detienen la importación.
+"""
+import csv
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from comun.cache_respuestas import invalidar_respuestas
+from eventos.busqueda import vector_busqueda
+from eventos.calendario import invalidar_calendario
+from eventos.models import Evento, ZonaEvento
+from .models import Reserva
+
+TABLA = "copia_importacion"
+TAMANO_BLOQUE = 1024 * 1024
+MAX_ERRORES = 1000
+
+# Conversores que devuelven NULL en lugar de fallar, para validar por conjuntos.
+FUNCIONES = [
+    ("a_entero", "bigint"),
+    ("a_fecha", "date"),
+    ("a_hora", "time"),
+]
+
+EVENTO = Evento._meta.db_table
+ZONA = ZonaEvento._meta.db_table
+RESERVA = Reserva._meta.db_table
+
+
+def _valores(choices):
+    return [valor for valor, _ in choices]
+
+
+def _largo(columna, minimo, maximo, opcional=False):
+    condicion = f"char_length(coalesce({columna}, '')) NOT BETWEEN {minimo} AND {maximo}"
+    if opcional:
+        condicion = f"coalesce({columna}, '') <> '' AND {condicion}"
+    return condicion, [], f"{columna}: entre {minimo} y {maximo} caracteres."
+
+
+def _opcion(columna, choices):
+    return (
+        f"coalesce({columna}, '') <> '' AND {columna} <> ALL(%s)",
+        [_valores(choices)],
+        f"{columna}: usa uno de {', '.join(_valores(choices))}.",
+    )
+
+
+def _entero(columna, minimo=0):
+    return (
+        f"coalesce({columna}, '') <> '' AND coalesce(pg_temp.a_entero({columna}), {minimo - 1}) < {minimo}",
+        [],
+        f"{columna}: debe ser un entero mayor o igual a {minimo}.",
+    )
+
+
+# Cada importación: columnas del CSV, obligatorias y reglas (condición SQL, parámetros, mensaje).
+IMPORTACIONES = {
+    "eventos": {
+        "columnas": ["titulo", "fecha", "hora", "lugar", "direccion", "estado", "descripcion", "modo_aforo", "cupo_total"],
+        "obligatorias": ["titulo", "fecha", "hora", "lugar"],
+        "reglas": [
+            _largo("titulo", 5, 200),
+            ("pg_temp.a_fecha(fecha) IS NULL", [], "fecha: usa el formato AAAA-MM-DD."),
+            ("pg_temp.a_hora(hora) IS NULL", [], "hora: usa el formato HH:MM."),
+            _largo("lugar", 3, 200),
+            _largo("direccion", 5, 200, opcional=True),
+            _opcion("estado", Evento.ESTADOS),
+            ("char_length(coalesce(descripcion, '')) > 2000", [], "descripcion: máximo 2000 caracteres."),
+            _opcion("modo_aforo", Evento.MODOS_AFORO),
+            _entero("cupo_total"),
+        ],
+    },
+    "zonas": {
+        "columnas": ["evento", "nombre", "cupo_total"],
+        "obligatorias": ["evento", "nombre"],
+        "reglas": [
+            (
+                f"NOT EXISTS (SELECT 1 FROM {EVENTO} e WHERE e.id = pg_temp.a_entero(t.evento))",
+                [],
+                "evento: no existe.",
+            ),
+            _largo("nombre", 2, 100),
+            _entero("cupo_total"),
+            (
+                f"t.linea IN (SELECT linea FROM (SELECT linea, row_number() OVER "
+                f"(PARTITION BY evento, nombre ORDER BY linea) AS n FROM {TABLA} WHERE error IS NULL) d "
+                f"WHERE d.n > 1)",
+                [],
+                "nombre: zona repetida en el archivo.",
+            ),
+            (
+                f"EXISTS (SELECT 1 FROM {ZONA} z WHERE z.evento_id = pg_temp.a_entero(t.evento) "
+                f"AND z.nombre = t.nombre AND coalesce(pg_temp.a_entero(t.cupo_total), 0) > 0 "
+                f"AND z.cupos_reservados > pg_temp.a_entero(t.cupo_total))",
+                [],
+                "cupo_total: es menor que los cupos ya reservados en la zona.",
+            ),
+        ],
+    },
+    "reservas": {
+        "columnas": ["codigo", "espacio", "solicitante", "evento", "zona", "cupos_solicitados", "estado", "notas"],
+        "obligatorias": ["espacio", "solicitante", "evento"],
+        "reglas": [
+            (
+                "coalesce(codigo, '') <> '' AND codigo !~ '^[a-z0-9-]{4,32}$'",
+                [],
+                "codigo: de 4 a 32 minúsculas, números o guiones.",
+            ),
+            (
+                f"coalesce(codigo, '') <> '' AND (EXISTS (SELECT 1 FROM {RESERVA} r WHERE r.codigo = t.codigo) "
+                f"OR t.linea IN (SELECT linea FROM (SELECT linea, row_number() OVER "
+                f"(PARTITION BY codigo ORDER BY linea) AS n FROM {TABLA} "
+                f"WHERE error IS NULL AND coalesce(codigo, '') <> '') d "
+                f"WHERE d.n > 1))",
+                [],
+                "codigo: ya existe.",
+            ),
+            _largo("espacio", 3, 150),
+            _largo("solicitante", 3, 150),
+            (
+                f"NOT EXISTS (SELECT 1 FROM {EVENTO} e WHERE e.id = pg_temp.a_entero(t.evento))",
+                [],
+                "evento: no existe.",
+            ),
+            # Mismas reglas que ``services.validar_zona``.
+            (
+                f"coalesce(zona, '') <> '' AND EXISTS (SELECT 1 FROM {EVENTO} e "
+                f"WHERE e.id = pg_temp.a_entero(t.evento) AND e.modo_aforo = %s)",
+                [Evento.MODO_GENERAL],
+                "zona: Este evento no usa zonas.",
+            ),
+            (
+                f"coalesce(zona, '') = '' AND EXISTS (SELECT 1 FROM {EVENTO} e "
+                f"WHERE e.id = pg_temp.a_entero(t.evento) AND e.modo_aforo <> %s)",
+                [Evento.MODO_GENERAL],
+                "zona: Selecciona una zona.",
+            ),
+            (
+                f"coalesce(zona, '') <> '' AND NOT EXISTS (SELECT 1 FROM {ZONA} z "
+                f"WHERE z.id = pg_temp.a_entero(t.zona) AND z.evento_id = pg_temp.a_entero(t.evento))",
+                [],
+                "zona: La zona no pertenece a este evento.",
+            ),
+            _entero("cupos_solicitados", minimo=1),
+            _opcion("estado", Reserva.ESTADOS),
+            ("char_length(coalesce(notas, '')) > 2000", [], "notas: máximo 2000 caracteres."),
+        ],
+    },
+}
+
+
+class ImportacionError(Exception):
+    """El archivo no se puede importar (cabecera inválida o motor sin COPY)."""
+
+
+def _preparar(cursor, columnas):
+    for nombre, tipo in FUNCIONES:
+        cursor.execute(
+            f"CREATE OR REPLACE FUNCTION pg_temp.{nombre}(valor text) RETURNS {tipo} "
+            f"LANGUAGE plpgsql STABLE AS $$ BEGIN RETURN valor::{tipo}; "
+            f"EXCEPTION WHEN others THEN RETURN NULL; END $$"
+        )
+    definicion = ", ".join(f"{columna} text" for columna in columnas)
+    cursor.execute(
+        f"CREATE TEMP TABLE {TABLA} (linea bigserial PRIMARY KEY, {definicion}, error text) ON COMMIT DROP"
+    )
+
+
+def _cabecera(archivo, importacion):
+    primera = archivo.readline().decode("utf-8-sig")
+    cabecera = [columna.strip() for columna in next(csv.reader([primera]), [])]
+    desconocidas = [columna for columna in cabecera if columna not in importacion["columnas"]]
+    if desconocidas:
+        raise ImportacionError(f"Columnas desconocidas: {', '.join(desconocidas)}.")
+    if len(set(cabecera)) != len(cabecera):
+        raise ImportacionError("Hay columnas repetidas en la cabecera.")
+    faltantes = [columna for columna in importacion["obligatorias"] if columna not in cabecera]
+    if faltantes:
+        raise ImportacionError(f"Faltan columnas: {', '.join(faltantes)}.")
+    return cabecera
+
+
+def _copiar(cursor, archivo, cabecera):
+    with cursor.copy(f"COPY {TABLA} ({', '.join(cabecera)}) FROM STDIN WITH (FORMAT csv)") as copia:
+        while bloque := archivo.read(TAMANO_BLOQUE):
+            copia.write(bloque)
+
+
+def _validar(cursor, reglas):
+    for condicion, params, mensaje in reglas:
+        cursor.execute(
+            f"UPDATE {TABLA} AS t SET error = %s WHERE t.error IS NULL AND ({condicion})",
+            [mensaje, *params],
+        )
+
+
+def _errores(cursor):
+    cursor.execute(f"SELECT count(*) FROM {TABLA} WHERE error IS NOT NULL")
+    total = cursor.fetchone()[0]
+    # La línea 1 es la cabecera.
+    cursor.execute(f"SELECT linea + 1, error FROM {TABLA} WHERE error IS NOT NULL ORDER BY linea LIMIT %s", [MAX_ERRORES])
+    return total, cursor.fetchall()
+
+
+def _fusionar_eventos(cursor):
+    cursor.execute(f"CREATE TEMP TABLE {TABLA}_nuevos (id bigint, fecha date) ON COMMIT DROP")
+    cursor.execute(
+        f"""
+        WITH nuevos AS (
+            INSERT INTO {EVENTO}
+                (titulo, fecha, hora, lugar, direccion, estado, descripcion, imagen_portada, imagen_variantes,
+                 modo_aforo, cupo_total, cupos_reservados, creado, actualizado)
+            SELECT titulo, pg_temp.a_fecha(fecha), pg_temp.a_hora(hora), lugar, coalesce(direccion, ''),
+                   coalesce(nullif(estado, ''), %s), coalesce(descripcion, ''), NULL, '{{}}'::jsonb,
+                   coalesce(nullif(modo_aforo, ''), %s), coalesce(pg_temp.a_entero(cupo_total), 0), 0, now(), now()
+            FROM {TABLA} WHERE error IS NULL ORDER BY linea
+            RETURNING id, fecha
+        )
+        INSERT INTO {TABLA}_nuevos SELECT id, fecha FROM nuevos
+        """,
+        [Evento.BORRADOR, Evento.MODO_GENERAL],
+    )
+    insertadas = cursor.rowcount
+    Evento.objects.filter(pk__in=RawSQL(f"SELECT id FROM {TABLA}_nuevos", [])).update(busqueda=vector_busqueda())
+    cursor.execute(f"SELECT DISTINCT date_trunc('month', fecha)::date FROM {TABLA}_nuevos")
+    invalidar_calendario(*[fila[0] for fila in cursor.fetchall()])
+    return insertadas, 0
+
+
+def _fusionar_zonas(cursor):
+    cursor.execute(
+        f"""
+        INSERT INTO {ZONA} (evento_id, nombre, cupo_total, cupos_reservados)
+        SELECT pg_temp.a_entero(evento), nombre, coalesce(pg_temp.a_entero(cupo_total), 0), 0
+        FROM {TABLA} WHERE error IS NULL ORDER BY linea
+        ON CONFLICT (evento_id, nombre) DO UPDATE SET cupo_total = EXCLUDED.cupo_total
+        RETURNING (xmax = 0)
+        """
+    )
+    resultados = [fila[0] for fila in cursor.fetchall()]
+    insertadas = sum(resultados)
+    # Cambia la disponibilidad publicada de los eventos afectados.
+    cursor.execute(
+        f"""
+        UPDATE {EVENTO} e SET actualizado = now()
+        WHERE e.id IN (SELECT pg_temp.a_entero(evento) FROM {TABLA} WHERE error IS NULL)
+        RETURNING e.fecha
+        """
+    )
+    invalidar_calendario(*{fila[0] for fila in cursor.fetchall()})
+    return insertadas, len(resultados) - insertadas
+
+
+def _aforo_reservas(cursor):
+    """Marca las reservas que exceden el aforo, con los contadores ya bloqueados."""
+    cursor.execute(
+        f"""
+        SELECT e.id FROM {EVENTO} e
+        WHERE e.id IN (SELECT pg_temp.a_entero(evento) FROM {TABLA} WHERE error IS NULL)
+        ORDER BY e.id FOR UPDATE
+        """
+    )
+    cursor.execute(
+        f"""
+        SELECT z.id FROM {ZONA} z
+        WHERE z.id IN (SELECT pg_temp.a_entero(zona) FROM {TABLA} WHERE error IS NULL)
+        ORDER BY z.id FOR UPDATE
+        """
+    )
+    cursor.execute(
+        f"""
+        WITH pedidas AS (
+            SELECT t.linea,
+                   sum(CASE WHEN coalesce(nullif(t.estado, ''), %s) <> %s
+                            THEN coalesce(pg_temp.a_entero(t.cupos_solicitados), 1) ELSE 0 END)
+                       OVER (PARTITION BY e.id, z.id ORDER BY t.linea) AS acumulado,
+                   coalesce(z.cupo_total, e.cupo_total) AS limite,
+                   coalesce(z.cupo_total - z.cupos_reservados, e.cupo_total - e.cupos_reservados) AS disponible
+            FROM {TABLA} t
+            JOIN {EVENTO} e ON e.id = pg_temp.a_entero(t.evento)
+            LEFT JOIN {ZONA} z ON z.id = pg_temp.a_entero(t.zona)
+            WHERE t.error IS NULL
+        )
+        UPDATE {TABLA} t SET error = %s
+        FROM pedidas p
+        WHERE t.linea = p.linea AND p.limite > 0 AND p.acumulado > p.disponible
+        """,
+        [Reserva.PENDIENTE, Reserva.CANCELADA, "cupos_solicitados: No hay cupos suficientes."],
+    )
+
+
+def _codigos_reservas(cursor):
+    """Genera los códigos faltantes y repite solo los que choquen con otros."""
+    cursor.execute(f"ALTER TABLE {TABLA} ADD COLUMN generado boolean NOT NULL DEFAULT false")
+    cursor.execute(
+        f"UPDATE {TABLA} SET codigo = substr(md5(random()::text || linea), 1, 12), generado = true "
+        f"WHERE error IS NULL AND coalesce(codigo, '') = ''"
+    )
+    while True:
+        cursor.execute(
+            f"""
+            UPDATE {TABLA} t SET codigo = substr(md5(random()::text || t.linea), 1, 12)
+            WHERE t.generado AND t.error IS NULL AND (
+                EXISTS (SELECT 1 FROM {RESERVA} r WHERE r.codigo = t.codigo)
+                OR EXISTS (SELECT 1 FROM {TABLA} o WHERE o.codigo = t.codigo AND o.linea <> t.linea
+                           AND (NOT o.generado OR o.linea < t.linea))
+            )
+            """
+        )
+        if not cursor.rowcount:
+            return
+
+
+def _fusionar_reservas(cursor):
+    _aforo_reservas(cursor)
+    _codigos_reservas(cursor)
+    cursor.execute(
+        f"""
+        INSERT INTO {RESERVA}
+            (codigo, espacio, fecha, hora, solicitante, evento_id, zona_id, cupos_solicitados, estado, notas,
+             creado, actualizado)
+        SELECT t.codigo, t.espacio, e.fecha, e.hora, t.solicitante, e.id, pg_temp.a_entero(t.zona),
+               coalesce(pg_temp.a_entero(t.cupos_solicitados), 1), coalesce(nullif(t.estado, ''), %s),
+               coalesce(t.notas, ''), now(), now()
+        FROM {TABLA} t JOIN {EVENTO} e ON e.id = pg_temp.a_entero(t.evento)
+        WHERE t.error IS NULL ORDER BY t.linea
+        """,
+        [Reserva.PENDIENTE],
+    )
+    insertadas = cursor.rowcount
+
+    ocupadas = (
+        f"SELECT pg_temp.a_entero(evento) AS evento_id, pg_temp.a_entero(zona) AS zona_id, "
+        f"sum(coalesce(pg_temp.a_entero(cupos_solicitados), 1)) AS cupos FROM {TABLA} "
+        f"WHERE error IS NULL AND coalesce(nullif(estado, ''), %s) <> %s GROUP BY 1, 2"
+    )
+    estados = [Reserva.PENDIENTE, Reserva.CANCELADA]
+    cursor.execute(
+        f"""
+        UPDATE {EVENTO} e SET cupos_reservados = e.cupos_reservados + s.cupos, actualizado = now()
+        FROM (SELECT evento_id, sum(cupos) AS cupos FROM ({ocupadas}) o GROUP BY evento_id) s
+        WHERE e.id = s.evento_id
+        """,
+        estados,
+    )
+    cursor.execute(
+        f"""
+        UPDATE {ZONA} z SET cupos_reservados = z.cupos_reservados + s.cupos
+        FROM ({ocupadas}) s
+        WHERE z.id = s.zona_id
+        """,
+        estados,
+    )
+    cursor.execute(
+        f"SELECT DISTINCT e.fecha FROM {EVENTO} e "
+        f"WHERE e.id IN (SELECT pg_temp.a_entero(evento) FROM {TABLA} WHERE error IS NULL)"
+    )
+    invalidar_calendario(*[fila[0] for fila in cursor.fetchall()])
+    return insertadas, 0
+
+
+FUSIONES = {
+    "eventos": _fusionar_eventos,
+    "zonas": _fusionar_zonas,
+    "reservas": _fusionar_reservas,
+}
+
+
+def importar_copy(tipo, archivo):
+    """
+    Importa ``archivo`` (binario, CSV UTF-8 con cabecera) como ``tipo``
+    (``eventos``, ``zonas`` o ``reservas``).
+
+    Devuelve ``{"insertadas", "actualizadas", "total_errores", "errores"}``;
+    ``errores`` lista hasta ``MAX_ERRORES`` pares ``(línea, mensaje)``.
+    """
+    if connection.vendor != "postgresql":
+        raise ImportacionError("La importación con COPY requiere PostgreSQL.")
+    importacion = IMPORTACIONES[tipo]
+    cabecera = _cabecera(archivo, importacion)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        _preparar(cursor, importacion["columnas"])
+        _copiar(cursor, archivo, cabecera)
+        _validar(cursor, importacion["reglas"])
+        insertadas, actualizadas = FUSIONES[tipo](cursor)
+        total_errores, errores = _errores(cursor)
+        if insertadas or actualizadas:
+            invalidar_respuestas(Evento)
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLA}, {TABLA}_nuevos")
+    return {
+        "insertadas": insertadas,
+        "actualizadas": actualizadas,
+        "total_errores": total_errores,
+        "errores": errores,
+    }
@@ -2,6 +2,7 @@
 from django.core.exceptions import ValidationError
 
 from .models import Reserva
+from .services import guardar_reserva, validar_zona
 
 
 class ReservaForm(forms.ModelForm):
@@ -57,3 +58,16 @@ class ReservaForm(forms.ModelForm):
         if cupos <= 0:
             raise ValidationError("Debe ser mayor a 0.")
         return cupos
+
+    def clean(self):
+        cleaned_data = super().clean()
+        evento = cleaned_data.get("evento")
+        if evento:
+            validar_zona(evento, cleaned_data.get("zona"))
+        return cleaned_data
+
+    def save(self, commit=True):
+        reserva = super().save(commit=False)
+        if commit:
+            guardar_reserva(reserva)
+        return reserva
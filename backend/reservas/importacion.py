@@ -0,0 +1,228 @@
+"""
+Importación por lotes de eventos, zonas y reservas desde CSV o NDJSON.
+
+El archivo se lee como flujo y se procesa en lotes de ``lote`` filas, cada uno
+en su propia transacción: los campos se validan fila a fila sin consultas, los
+eventos y zonas referenciados se cargan con una consulta por lote, el aforo
+se descuenta una sola vez por evento/zona (``crear_reservas_en_lote``) y las
+filas válidas se insertan con ``bulk_create``. La memoria depende del tamaño
+del lote, no del archivo.
+
+Para cargas mayores sin reglas en Python, ver ``reservas.copia``.
+"""
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from comun.cache_respuestas import invalidar_respuestas
+from eventos.busqueda import vector_busqueda
+from eventos.calendario import invalidar_calendario
+from eventos.models import Evento, ZonaEvento
+from .models import Reserva
+from .services import crear_reservas_en_lote, validar_zona
+
+LOTE = 1000
+MAX_ERRORES = 1000
+FORMATOS = ("csv", "ndjson")
+
+CAMPOS = {
+    "eventos": ["titulo", "fecha", "hora", "lugar", "direccion", "estado", "descripcion", "modo_aforo", "cupo_total"],
+    "zonas": ["evento", "nombre", "cupo_total"],
+    "reservas": ["codigo", "espacio", "solicitante", "evento", "zona", "cupos_solicitados", "estado", "notas"],
+}
+
+
+def formato_de(nombre):
+    """Deduce el formato por la extensión del archivo (CSV por defecto)."""
+    return "ndjson" if nombre.lower().endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def leer_filas(archivo, formato):
+    """Genera ``(línea, datos)`` desde un archivo binario; ``datos`` es un dict o el error de la línea."""
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    if formato == "csv":
+        lector = csv.DictReader(texto)
+        for datos in lector:
+            yield lector.line_num, datos
+        return
+
+    for linea, contenido in enumerate(texto, start=1):
+        if not contenido.strip():
+            continue
+        try:
+            datos = json.loads(contenido)
+        except ValueError:
+            yield linea, "JSON inválido."
+            continue
+        yield linea, datos if isinstance(datos, dict) else "Cada línea debe ser un objeto JSON."
+
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _limpiar(datos, campos):
+    """Quita los valores vacíos (se usan los valores por defecto) y rechaza campos desconocidos."""
+    desconocidos = sorted(str(campo) for campo in datos if campo not in campos)
+    if desconocidos:
+        raise ValidationError(f"Campos desconocidos: {', '.join(desconocidos)}.")
+    return {campo: valor for campo, valor in datos.items() if valor not in (None, "")}
+
+
+def _validar(instancia, exclude=()):
+    instancia.full_clean(exclude=list(exclude), validate_unique=False, validate_constraints=False)
+
+
+def _lote_eventos(filas):
+    errores, validos = [], []
+    for linea, datos in filas:
+        evento = Evento(**datos)
+        try:
+            _validar(evento)
+        except ValidationError as exc:
+            errores.append((linea, exc.message_dict))
+            continue
+        validos.append(evento)
+
+    creados = Evento.objects.bulk_create(validos)
+    if creados:
+        # ``bulk_create`` no pasa por ``Evento.save``.
+        Evento.objects.filter(pk__in=[evento.pk for evento in creados]).update(busqueda=vector_busqueda())
+        invalidar_calendario(*{evento.fecha for evento in creados})
+        invalidar_respuestas(Evento)
+    return len(creados), errores
+
+
+def _lote_zonas(filas):
+    eventos = Evento.objects.in_bulk({_entero(datos.get("evento")) for _, datos in filas} - {None})
+    existentes = set(ZonaEvento.objects.filter(evento__in=list(eventos)).values_list("evento_id", "nombre"))
+
+    errores, validas = [], []
+    for linea, datos in filas:
+        evento = eventos.get(_entero(datos.pop("evento", None)))
+        if evento is None:
+            errores.append((linea, {"evento": ["Evento no encontrado."]}))
+            continue
+        zona = ZonaEvento(evento=evento, **datos)
+        try:
+            _validar(zona, exclude=["evento"])
+        except ValidationError as exc:
+            errores.append((linea, exc.message_dict))
+            continue
+        if (evento.pk, zona.nombre) in existentes:
+            errores.append((linea, {"nombre": ["Ya existe una zona con este nombre en el evento."]}))
+            continue
+        existentes.add((evento.pk, zona.nombre))
+        validas.append(zona)
+
+    creadas = ZonaEvento.objects.bulk_create(validas)
+    afectados = {zona.evento for zona in creadas}
+    if afectados:
+        # Las zonas nuevas cambian la disponibilidad publicada del evento.
+        Evento.objects.filter(pk__in=[evento.pk for evento in afectados]).update(actualizado=timezone.now())
+        invalidar_calendario(*{evento.fecha for evento in afectados})
+        invalidar_respuestas(Evento)
+    return len(creadas), errores
+
+
+def _lote_reservas(filas):
+    eventos = Evento.objects.in_bulk({_entero(datos.get("evento")) for _, datos in filas} - {None})
+    zonas = ZonaEvento.objects.in_bulk({_entero(datos.get("zona")) for _, datos in filas} - {None})
+    codigos = {datos["codigo"] for _, datos in filas if datos.get("codigo")}
+    usados = set(Reserva.objects.filter(codigo__in=codigos).values_list("codigo", flat=True))
+
+    errores, pendientes = [], []
+    for linea, datos in filas:
+        evento = eventos.get(_entero(datos.pop("evento", None)))
+        zona_id = datos.pop("zona", None)
+        zona = zonas.get(_entero(zona_id)) if zona_id is not None else None
+        if evento is None:
+            errores.append((linea, {"evento": ["Evento no encontrado."]}))
+            continue
+        if zona_id is not None and zona is None:
+            errores.append((linea, {"zona": ["Zona no encontrada."]}))
+            continue
+
+        reserva = Reserva(evento=evento, zona=zona, **datos)
+        try:
+            _validar(reserva, exclude=["evento", "zona"])
+            if reserva.cupos_solicitados <= 0:
+                raise ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
+            validar_zona(evento, zona)
+        except ValidationError as exc:
+            errores.append((linea, exc.message_dict))
+            continue
+        if reserva.codigo:
+            if reserva.codigo in usados:
+                errores.append((linea, {"codigo": ["Ya existe una reserva con este código."]}))
+                continue
+            usados.add(reserva.codigo)
+        pendientes.append((linea, reserva))
+
+    # Toma el aforo una vez por evento/zona y genera los códigos faltantes en memoria.
+    resultados = crear_reservas_en_lote([reserva for _, reserva in pendientes])
+    creadas = 0
+    for (linea, _), resultado in zip(pendientes, resultados):
+        if isinstance(resultado, ValidationError):
+            errores.append((linea, resultado.message_dict))
+        else:
+            creadas += 1
+    return creadas, errores
+
+
+LOTES = {
+    "eventos": _lote_eventos,
+    "zonas": _lote_zonas,
+    "reservas": _lote_reservas,
+}
+
+
+def importar(tipo, archivo, formato="csv", lote=LOTE):
+    """
+    Importa ``archivo`` (binario) como ``tipo`` (``eventos``, ``zonas`` o ``reservas``).
+
+    Devuelve ``{"procesadas", "creadas", "total_errores", "errores"}``;
+    ``errores`` lista hasta ``MAX_ERRORES`` elementos ``{"linea", "errores"}``.
+    """
+    procesar = LOTES[tipo]
+    resultado = {"procesadas": 0, "creadas": 0, "total_errores": 0, "errores": []}
+
+    def cerrar(filas, invalidas):
+        # Los errores de lectura del tramo se registran junto con los del lote:
+        # así la lista completa queda ordenada por línea.
+        creadas, errores = 0, []
+        if filas:
+            try:
+                with transaction.atomic():
+                    creadas, errores = procesar(filas)
+            except IntegrityError as exc:
+                errores = [(linea, {"__all__": [f"Lote rechazado: {exc}"]}) for linea, _ in filas]
+        resultado["creadas"] += creadas
+        errores = invalidas + errores
+        resultado["total_errores"] += len(errores)
+        for linea, detalle in sorted(errores, key=lambda error: error[0]):
+            if len(resultado["errores"]) < MAX_ERRORES:
+                resultado["errores"].append({"linea": linea, "errores": detalle})
+
+    filas, invalidas = [], []
+    for linea, datos in leer_filas(archivo, formato):
+        resultado["procesadas"] += 1
+        try:
+            if isinstance(datos, str):
+                raise ValidationError(datos)
+            filas.append((linea, _limpiar(datos, CAMPOS[tipo])))
+        except ValidationError as exc:
+            invalidas.append((linea, {"__all__": exc.messages}))
+            continue
+        if len(filas) >= lote:
+            cerrar(filas, invalidas)
+            filas, invalidas = [], []
+    cerrar(filas, invalidas)
+    return resultado
@@ -0,0 +1,203 @@
+"""
+Benchmark de carga tipo "flash crowd" sobre el flujo de reservas.
+
+Siembra eventos (generales y por zonas), abre sesiones para varios usuarios
+y dispara ``POST /api/reservas/`` y ``GET /api/eventos/`` concurrentes contra
+un servidor real (por ejemplo gunicorn sobre PostgreSQL local). Reporta
+p50/p95/p99, throughput, consultas por solicitud y sobreventa, y guarda el
+resultado en JSON para comparar entre commits.
+
+    API_QUERY_COUNT_HEADER=1 API_THROTTLE_USER=100000/min \\
+        gunicorn municipal_backend.wsgi -w 4 &
+    python manage.py benchmark_carga --url http://127.0.0.1:8000 --salida bench.json
+
+El servidor debe usar la misma base de datos que este comando.
+"""
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from eventos.models import Evento, ZonaEvento
+from reservas.models import Reserva
+
+PREFIJO = "Carga "
+CLAVE_USUARIOS = "bench-carga-clave"
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def resumir(muestras, duracion):
+    latencias = [m["ms"] for m in muestras]
+    consultas = [m["consultas"] for m in muestras if m["consultas"] is not None]
+    estados = {}
+    for m in muestras:
+        estados[str(m["estado"])] = estados.get(str(m["estado"]), 0) + 1
+    return {
+        "solicitudes": len(muestras),
+        "throughput_rps": round(len(muestras) / duracion, 1) if duracion else None,
+        "p50_ms": percentil(latencias, 50),
+        "p95_ms": percentil(latencias, 95),
+        "p99_ms": percentil(latencias, 99),
+        "max_ms": max(latencias) if latencias else None,
+        "consultas_promedio": round(statistics.mean(consultas), 2) if consultas else None,
+        "consultas_max": max(consultas) if consultas else None,
+        "estados": estados,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark de carga concurrente de reservas y listado de eventos contra un servidor HTTP."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base del servidor.")
+        parser.add_argument("--eventos", type=int, default=20)
+        parser.add_argument("--cupo", type=int, default=200, help="Cupo por evento (o por zona).")
+        parser.add_argument("--usuarios", type=int, default=32)
+        parser.add_argument("--solicitudes", type=int, default=5000)
+        parser.add_argument("--concurrencia", type=int, default=64)
+        parser.add_argument("--lecturas", type=float, default=0.5, help="Fracción de GET /api/eventos/.")
+        parser.add_argument("--salida", default="", help="Archivo JSON de resultados.")
+        parser.add_argument("--conservar", action="store_true", help="No elimina los datos sembrados.")
+
+    def handle(self, *args, **options):
+        base = options["url"].rstrip("/")
+        eventos = self._sembrar(options["eventos"], options["cupo"])
+        try:
+            sesiones = self._abrir_sesiones(base, options["usuarios"])
+            muestras, duracion = self._disparar(base, sesiones, eventos, options)
+            sobreventa = self._sobreventa(eventos)
+        finally:
+            if not options["conservar"]:
+                Evento.objects.filter(pk__in=[e["id"] for e in eventos]).delete()
+
+        resultado = {
+            "commit": self._commit(),
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "parametros": {k: options[k] for k in ("url", "eventos", "cupo", "usuarios", "solicitudes", "concurrencia", "lecturas")},
+            "duracion_s": round(duracion, 3),
+            "post_reservas": resumir([m for m in muestras if m["tipo"] == "post"], duracion),
+            "get_eventos": resumir([m for m in muestras if m["tipo"] == "get"], duracion),
+            "sobreventa": sobreventa,
+        }
+
+        self.stdout.write(json.dumps(resultado, indent=2, ensure_ascii=False))
+        if options["salida"]:
+            with open(options["salida"], "w", encoding="utf-8") as fh:
+                json.dump(resultado, fh, indent=2, ensure_ascii=False)
+        if sobreventa["cupos"]:
+            raise CommandError(f"Sobreventa detectada: {sobreventa['cupos']} cupos.")
+
+    def _sembrar(self, cantidad, cupo):
+        eventos = []
+        for i in range(cantidad):
+            zonas = i % 2 == 1
+            evento = Evento.objects.create(
+                titulo=f"{PREFIJO}{i}",
+                fecha=date.today() + timedelta(days=i),
+                hora=dt_time(18, 0),
+                lugar="Estadio municipal",
+                estado=Evento.CONFIRMADO,
+                modo_aforo=Evento.MODO_ZONAS if zonas else Evento.MODO_GENERAL,
+                cupo_total=0 if zonas else cupo,
+            )
+            zona_ids = []
+            if zonas:
+                zona_ids = [
+                    ZonaEvento.objects.create(evento=evento, nombre=nombre, cupo_total=cupo).pk
+                    for nombre in ("Platea", "Galería", "Cancha")
+                ]
+            eventos.append({"id": evento.pk, "zonas": zona_ids, "cupo": cupo})
+        return eventos
+
+    def _abrir_sesiones(self, base, cantidad):
+        user_model = get_user_model()
+        sesiones = []
+        for i in range(cantidad):
+            username = f"bench_carga_{i}"
+            user, creado = user_model.objects.get_or_create(username=username)
+            if creado or not user.check_password(CLAVE_USUARIOS):
+                user.set_password(CLAVE_USUARIOS)
+                user.save()
+            sesion = requests.Session()
+            response = sesion.post(
+                f"{base}/api/session/login/",
+                json={"username": username, "password": CLAVE_USUARIOS, "remember": True},
+                timeout=30,
+            )
+            if response.status_code != 200:
+                raise CommandError(f"No fue posible iniciar sesión como {username}: {response.status_code}")
+            sesion.headers["X-CSRFToken"] = sesion.cookies.get("csrftoken", "")
+            sesiones.append(sesion)
+        return sesiones
+
+    def _disparar(self, base, sesiones, eventos, options):
+        locales = threading.local()
+        contador = iter(range(options["solicitudes"]))
+        lock = threading.Lock()
+
+        def una_solicitud(_):
+            if not hasattr(locales, "sesion"):
+                with lock:
+                    locales.sesion = sesiones[next(contador) % len(sesiones)]
+            evento = random.choice(eventos)
+            if random.random() < options["lecturas"]:
+                tipo, metodo, url, payload = "get", "get", f"{base}/api/eventos/", None
+            else:
+                payload = {"evento": evento["id"], "cupos_solicitados": random.randint(1, 4), "espacio": "Estadio"}
+                if evento["zonas"]:
+                    payload["zona"] = random.choice(evento["zonas"])
+                tipo, metodo, url = "post", "post", f"{base}/api/reservas/"
+            inicio = time.perf_counter()
+            response = getattr(locales.sesion, metodo)(url, json=payload, timeout=60)
+            ms = round((time.perf_counter() - inicio) * 1000, 2)
+            consultas = response.headers.get("X-Query-Count")
+            return {
+                "tipo": tipo,
+                "estado": response.status_code,
+                "ms": ms,
+                "consultas": int(consultas) if consultas else None,
+            }
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrencia"]) as pool:
+            muestras = list(pool.map(una_solicitud, range(options["solicitudes"])))
+        return muestras, time.perf_counter() - inicio
+
+    def _sobreventa(self, eventos):
+        detalle = []
+        for evento in eventos:
+            activas = Reserva.objects.filter(evento_id=evento["id"]).exclude(estado=Reserva.CANCELADA)
+            if evento["zonas"]:
+                for zona_id in evento["zonas"]:
+                    total = activas.filter(zona_id=zona_id).aggregate(t=Sum("cupos_solicitados"))["t"] or 0
+                    if total > evento["cupo"]:
+                        detalle.append({"evento": evento["id"], "zona": zona_id, "exceso": total - evento["cupo"]})
+            else:
+                total = activas.aggregate(t=Sum("cupos_solicitados"))["t"] or 0
+                if total > evento["cupo"]:
+                    detalle.append({"evento": evento["id"], "zona": None, "exceso": total - evento["cupo"]})
+        return {"cupos": sum(d["exceso"] for d in detalle), "detalle": detalle}
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
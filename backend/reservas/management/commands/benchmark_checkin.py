@@ -0,0 +1,93 @@
+"""
+Mide el throughput sostenido de ``POST /api/reservas/checkin/``.
+
+Siembra reservas con ``bulk_create`` y registra su asistencia en lotes (como
+un lector que sincroniza en ráfagas) y también de a un código.
+
+    python manage.py benchmark_checkin --reservas 20000 --lote 200
+"""
+import time
+from datetime import date, time as dt_time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+
+from eventos.models import Evento
+from reservas.api import MAX_CODIGOS_CHECKIN
+from reservas.management.commands.concurrencia_reservas import api_host
+from reservas.models import Reserva
+
+
+class Command(BaseCommand):
+    help = "Mide check-ins por segundo por lote y de a un código."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reservas", type=int, default=20000)
+        parser.add_argument("--lote", type=int, default=200)
+        parser.add_argument("--individuales", type=int, default=2000, help="Check-ins de a un código.")
+
+    def handle(self, *args, **options):
+        if options["lote"] > MAX_CODIGOS_CHECKIN:
+            raise CommandError(f"El lote admite como máximo {MAX_CODIGOS_CHECKIN} códigos.")
+
+        admin, _ = get_user_model().objects.get_or_create(
+            username="bench_checkin", defaults={"is_superuser": True, "is_staff": True}
+        )
+        client = APIClient(SERVER_NAME=api_host())
+        client.force_authenticate(admin)
+
+        evento = Evento.objects.create(
+            titulo="Benchmark check-in",
+            fecha=date.today(),
+            hora=dt_time(20, 0),
+            lugar="Estadio municipal",
+            estado=Evento.CONFIRMADO,
+        )
+        try:
+            reservas = [
+                Reserva(evento=evento, espacio="Estadio", solicitante="bench", estado=Reserva.CONFIRMADA)
+                for _ in range(options["reservas"])
+            ]
+            for reserva in reservas:
+                reserva.completar_campos()
+            Reserva.objects.bulk_create(reservas, batch_size=5000)
+            codigos = [reserva.codigo for reserva in reservas]
+
+            individuales = codigos[: options["individuales"]]
+            en_lote = codigos[options["individuales"]:]
+
+            inicio = time.perf_counter()
+            for codigo in individuales:
+                client.post("/api/reservas/checkin/", {"codigo": codigo, "evento": evento.pk}, format="json")
+            tiempo_individual = time.perf_counter() - inicio
+
+            aceptados = 0
+            inicio = time.perf_counter()
+            for i in range(0, len(en_lote), options["lote"]):
+                response = client.post(
+                    "/api/reservas/checkin/",
+                    {"codigos": en_lote[i:i + options["lote"]], "evento": evento.pk},
+                    format="json",
+                )
+                aceptados += response.data["aceptados"]
+            tiempo_lote = time.perf_counter() - inicio
+
+            # Un segundo pase debe rechazarlos todos como duplicados.
+            response = client.post(
+                "/api/reservas/checkin/", {"codigos": en_lote[: options["lote"]]}, format="json"
+            )
+            duplicados_ok = response.data["aceptados"] == 0
+        finally:
+            evento.delete()
+
+        if individuales:
+            self.stdout.write(f"Individual: {len(individuales) / tiempo_individual:,.0f} check-ins/s")
+        if en_lote:
+            self.stdout.write(
+                f"Lotes de {options['lote']}: {len(en_lote) / tiempo_lote:,.0f} check-ins/s "
+                f"({aceptados}/{len(en_lote)} aceptados)"
+            )
+        if not duplicados_ok:
+            raise CommandError("Un check-in repetido fue aceptado.")
+        self.stdout.write(self.style.SUCCESS("Duplicados rechazados correctamente."))
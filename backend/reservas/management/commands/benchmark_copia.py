@@ -0,0 +1,107 @@
+"""
+Compara la ruta COPY de PostgreSQL con el ORM para importar y exportar reservas.
+
+- Importación: ``bulk_create`` por lotes contra ``importar_copy`` (COPY FROM a
+  una tabla temporal, validación por conjuntos e INSERT ... SELECT).
+- Exportación: ``export_to_csv`` (modelo completo, todo en memoria) contra
+  ``export_to_csv_stream`` y ``export_to_csv_copy`` (COPY TO STDOUT).
+
+Todo corre dentro de una transacción que se revierte al final.
+
+    python manage.py benchmark_copia --filas 1000000
+"""
+import csv
+import tempfile
+import time
+from datetime import date, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from cuentas.export_utils import export_to_csv, export_to_csv_copy, export_to_csv_stream
+from eventos.models import Evento
+from reservas.api import ReservaViewSet
+from reservas.copia import importar_copy
+from reservas.models import Reserva
+
+CAMPOS_ORM = [
+    'codigo', 'espacio', 'fecha', 'hora', 'solicitante', 'estado', 'evento', 'zona', 'cupos_solicitados', 'creado',
+]
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mide COPY FROM/TO frente a bulk_create y la exportación CSV del ORM."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=1000000)
+        parser.add_argument("--lote", type=int, default=5000, help="batch_size de bulk_create.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Este benchmark requiere PostgreSQL.")
+        try:
+            with transaction.atomic():
+                self._medir(options["filas"], options["lote"])
+                raise _Revertir
+        except _Revertir:
+            pass
+
+    def _evento(self, nombre):
+        # Sin límite de aforo: se mide la carga, no el rechazo por cupos.
+        return Evento.objects.create(
+            titulo=f"Benchmark COPY {nombre}", fecha=date.today(), hora=dt_time(12, 0), lugar="Laboratorio",
+        )
+
+    def _fila(self, segundos, filas, extra=""):
+        return f"{segundos:>10.2f}{filas / segundos:>14.0f}  {extra}"
+
+    def _medir(self, filas, lote):
+        self.stdout.write(f"{'':<22}{'segundos':>10}{'filas/s':>14}")
+
+        orm = self._evento("bulk_create")
+        inicio = time.perf_counter()
+        pendientes = []
+        for i in range(filas):
+            reserva = Reserva(evento=orm, espacio="Laboratorio", solicitante=f"Área {i % 100:03d}")
+            reserva.completar_campos()
+            pendientes.append(reserva)
+            if len(pendientes) >= lote:
+                Reserva.objects.bulk_create(pendientes)
+                pendientes = []
+        Reserva.objects.bulk_create(pendientes)
+        self.stdout.write(f"{'import bulk_create':<22}" + self._fila(time.perf_counter() - inicio, filas))
+
+        copia = self._evento("copy")
+        with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as archivo:
+            writer = csv.writer(archivo)
+            writer.writerow(["espacio", "solicitante", "evento"])
+            for i in range(filas):
+                writer.writerow(["Laboratorio", f"Área {i % 100:03d}", copia.pk])
+            archivo.seek(0)
+            inicio = time.perf_counter()
+            resultado = importar_copy("reservas", archivo.buffer)
+            segundos = time.perf_counter() - inicio
+        if resultado["total_errores"]:
+            raise CommandError(f"COPY rechazó {resultado['total_errores']} filas: {resultado['errores'][:3]}")
+        self.stdout.write(f"{'import COPY FROM':<22}" + self._fila(segundos, resultado["insertadas"]))
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE reservas_reserva")
+
+        queryset = Reserva.objects.filter(evento=copia)
+        for nombre, exportar in (
+            ("export_to_csv", lambda: export_to_csv(queryset.select_related("evento", "zona"), CAMPOS_ORM)),
+            ("export stream", lambda: export_to_csv_stream(queryset, ReservaViewSet.campos_exportacion)),
+            ("export COPY TO", lambda: export_to_csv_copy(queryset, ReservaViewSet.campos_exportacion)),
+        ):
+            inicio = time.perf_counter()
+            response = exportar()
+            contenido = response.streaming_content if response.streaming else [response.content]
+            tamano = sum(len(bloque) for bloque in contenido)
+            self.stdout.write(
+                f"{nombre:<22}" + self._fila(time.perf_counter() - inicio, filas, f"{tamano / 1024 / 1024:.1f} MiB")
+            )
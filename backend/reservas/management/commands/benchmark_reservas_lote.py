@@ -0,0 +1,79 @@
+"""
+Compara crear reservas una a una contra ``POST /api/reservas/bulk/``.
+
+    python manage.py benchmark_reservas_lote --cantidad 1000
+"""
+import time
+from datetime import date, time as dt_time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from eventos.models import Evento
+from reservas.api import MAX_RESERVAS_LOTE
+from reservas.management.commands.concurrencia_reservas import api_host
+
+
+class Command(BaseCommand):
+    help = "Mide tiempo y consultas de N reservas individuales frente a un único lote."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cantidad", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cantidad = options["cantidad"]
+        if cantidad > MAX_RESERVAS_LOTE:
+            raise CommandError(f"El lote admite como máximo {MAX_RESERVAS_LOTE} reservas.")
+
+        usuario, _ = get_user_model().objects.get_or_create(username="bench_reservas")
+        client = APIClient(SERVER_NAME=api_host())
+        client.force_authenticate(usuario)
+
+        def crear_evento(nombre):
+            return Evento.objects.create(
+                titulo=f"Benchmark {nombre}",
+                fecha=date.today(),
+                hora=dt_time(12, 0),
+                lugar="Laboratorio",
+                cupo_total=cantidad * 2,
+            )
+
+        individual = crear_evento("individual")
+        lote = crear_evento("lote")
+        try:
+            with CaptureQueriesContext(connection) as consultas_individual:
+                inicio = time.perf_counter()
+                for _ in range(cantidad):
+                    response = client.post(
+                        "/api/reservas/",
+                        {"evento": individual.pk, "cupos_solicitados": 1, "espacio": "Laboratorio"},
+                        format="json",
+                    )
+                    if response.status_code != 201:
+                        raise CommandError(f"POST individual falló: {response.status_code} {response.data}")
+                tiempo_individual = time.perf_counter() - inicio
+
+            payload = [
+                {"evento": lote.pk, "cupos_solicitados": 1, "espacio": "Laboratorio"}
+                for _ in range(cantidad)
+            ]
+            with CaptureQueriesContext(connection) as consultas_lote:
+                inicio = time.perf_counter()
+                response = client.post("/api/reservas/bulk/", payload, format="json")
+                tiempo_lote = time.perf_counter() - inicio
+            if response.status_code != 201 or response.data["rechazadas"]:
+                raise CommandError(f"POST en lote falló: {response.status_code}")
+        finally:
+            individual.delete()
+            lote.delete()
+
+        self.stdout.write(f"{'modo':<12}{'segundos':>10}{'consultas':>12}{'reservas/s':>12}")
+        for nombre, segundos, consultas in (
+            ("individual", tiempo_individual, len(consultas_individual)),
+            ("lote", tiempo_lote, len(consultas_lote)),
+        ):
+            self.stdout.write(f"{nombre:<12}{segundos:>10.3f}{consultas:>12}{cantidad / segundos:>12.0f}")
+        self.stdout.write(self.style.SUCCESS(f"Aceleración: x{tiempo_individual / tiempo_lote:.1f}"))
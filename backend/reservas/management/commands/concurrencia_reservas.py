@@ -0,0 +1,98 @@
+"""
+Prueba de concurrencia del motor de reservas.
+
+Lanza cientos de ``POST /api/reservas/`` en paralelo contra un evento con
+aforo limitado y verifica que la suma de cupos reservados nunca supere el
+cupo total. Requiere PostgreSQL (los bloqueos de fila no aplican en SQLite).
+
+    python manage.py concurrencia_reservas --solicitudes 500 --hilos 64 --cupo 100
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from rest_framework.test import APIClient
+
+from eventos.models import Evento, ZonaEvento
+from reservas.models import Reserva
+
+
+def api_host():
+    """Host aceptado por ALLOWED_HOSTS para el cliente de pruebas."""
+    hosts = [h for h in settings.ALLOWED_HOSTS if h and not h.startswith(".") and h != "*"]
+    return hosts[0] if hosts else "localhost"
+
+
+class Command(BaseCommand):
+    help = "Dispara POST concurrentes contra /api/reservas/ y verifica que no haya sobreventa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--solicitudes", type=int, default=300, help="Total de POST a enviar.")
+        parser.add_argument("--hilos", type=int, default=50, help="Solicitudes simultáneas.")
+        parser.add_argument("--cupo", type=int, default=100, help="Cupo total del evento de prueba.")
+        parser.add_argument("--cupos-por-reserva", type=int, default=1)
+        parser.add_argument("--zonas", action="store_true", help="Usa un evento con aforo por zona.")
+        parser.add_argument("--conservar", action="store_true", help="No elimina los datos de prueba.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Esta prueba requiere PostgreSQL.")
+
+        usuario, _ = get_user_model().objects.get_or_create(username="bench_reservas")
+        evento = Evento.objects.create(
+            titulo="Prueba de concurrencia",
+            fecha=date.today(),
+            hora=time(12, 0),
+            lugar="Laboratorio",
+            modo_aforo=Evento.MODO_ZONAS if options["zonas"] else Evento.MODO_GENERAL,
+            cupo_total=0 if options["zonas"] else options["cupo"],
+        )
+        zona = None
+        if options["zonas"]:
+            zona = ZonaEvento.objects.create(evento=evento, nombre="General", cupo_total=options["cupo"])
+
+        payload = {
+            "evento": evento.pk,
+            "cupos_solicitados": options["cupos_por_reserva"],
+            "espacio": "Laboratorio",
+        }
+        if zona:
+            payload["zona"] = zona.pk
+
+        def reservar(_):
+            client = APIClient(SERVER_NAME=api_host())
+            client.force_authenticate(usuario)
+            try:
+                return client.post("/api/reservas/", payload, format="json").status_code
+            finally:
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=options["hilos"]) as pool:
+                codigos = list(pool.map(reservar, range(options["solicitudes"])))
+
+            reservados = (
+                Reserva.objects.filter(evento=evento).aggregate(total=Sum("cupos_solicitados"))["total"] or 0
+            )
+            aceptadas = codigos.count(201)
+            rechazadas = codigos.count(400)
+            otros = len(codigos) - aceptadas - rechazadas
+            sobreventa = max(reservados - options["cupo"], 0)
+
+            self.stdout.write(
+                f"Aceptadas: {aceptadas}  Rechazadas: {rechazadas}  Otros: {otros}  "
+                f"Reservados: {reservados}/{options['cupo']}  Sobreventa: {sobreventa}"
+            )
+        finally:
+            if not options["conservar"]:
+                evento.delete()
+
+        if sobreventa:
+            raise CommandError(f"Sobreventa detectada: {sobreventa} cupos.")
+        if otros:
+            raise CommandError(f"{otros} solicitudes terminaron con un estado inesperado.")
+        self.stdout.write(self.style.SUCCESS("Sin sobreventa."))
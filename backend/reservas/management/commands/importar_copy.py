@@ -0,0 +1,34 @@
+"""
+Importa eventos, zonas o reservas desde un CSV con ``COPY FROM``.
+
+    python manage.py importar_copy eventos eventos.csv
+    python manage.py importar_copy zonas zonas.csv
+    python manage.py importar_copy reservas reservas.csv
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from reservas.copia import IMPORTACIONES, ImportacionError, importar_copy
+
+
+class Command(BaseCommand):
+    help = "Importa un CSV de eventos, zonas o reservas mediante COPY y una tabla temporal."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tipo", choices=sorted(IMPORTACIONES))
+        parser.add_argument("archivo")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["archivo"], "rb") as archivo:
+                resultado = importar_copy(options["tipo"], archivo)
+        except (OSError, ImportacionError) as exc:
+            raise CommandError(str(exc))
+
+        for linea, error in resultado["errores"]:
+            self.stderr.write(f"Línea {linea}: {error}")
+        if resultado["total_errores"] > len(resultado["errores"]):
+            self.stderr.write(f"... y {resultado['total_errores'] - len(resultado['errores'])} errores más.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Insertadas: {resultado['insertadas']}  actualizadas: {resultado['actualizadas']}  "
+            f"con error: {resultado['total_errores']}"
+        ))
@@ -0,0 +1,37 @@
+"""
+Importa eventos, zonas o reservas desde CSV o NDJSON por lotes.
+
+    python manage.py importar_lotes eventos temporada.csv
+    python manage.py importar_lotes reservas legado.ndjson --lote 2000
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from reservas import importacion
+
+
+class Command(BaseCommand):
+    help = "Importa un CSV o NDJSON de eventos, zonas o reservas en lotes validados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tipo", choices=sorted(importacion.CAMPOS))
+        parser.add_argument("archivo")
+        parser.add_argument("--formato", choices=importacion.FORMATOS, help="Por defecto según la extensión.")
+        parser.add_argument("--lote", type=int, default=importacion.LOTE)
+
+    def handle(self, *args, **options):
+        formato = options["formato"] or importacion.formato_de(options["archivo"])
+        try:
+            with open(options["archivo"], "rb") as archivo:
+                resultado = importacion.importar(options["tipo"], archivo, formato, lote=options["lote"])
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in resultado["errores"]:
+            detalle = "; ".join(f"{campo}: {' '.join(mensajes)}" for campo, mensajes in error["errores"].items())
+            self.stderr.write(f"Línea {error['linea']}: {detalle}")
+        if resultado["total_errores"] > len(resultado["errores"]):
+            self.stderr.write(f"... y {resultado['total_errores'] - len(resultado['errores'])} errores más.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Procesadas: {resultado['procesadas']}  creadas: {resultado['creadas']}  "
+            f"con error: {resultado['total_errores']}"
+        ))
@@ -0,0 +1,29 @@
+"""
+Barrido periódico de retenciones de cupos vencidas.
+
+Pensado para cron (una pasada) o como proceso permanente con ``--cada``:
+
+    python manage.py liberar_retenciones --cada 30
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservas.services import liberar_retenciones_vencidas
+
+
+class Command(BaseCommand):
+    help = "Devuelve al aforo los cupos de las retenciones vencidas, por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Retenciones por transacción.")
+        parser.add_argument("--cada", type=int, default=0, help="Repite cada N segundos (0 = una vez).")
+
+    def handle(self, *args, **options):
+        while True:
+            liberadas = liberar_retenciones_vencidas(lote=options["lote"])
+            if liberadas or options["verbosity"] > 1:
+                self.stdout.write(f"Retenciones liberadas: {liberadas}")
+            if not options["cada"]:
+                break
+            time.sleep(options["cada"])
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservas.sincronizacion import purgar_bajas
+
+
+class Command(BaseCommand):
+    help = "Elimina las bajas de reservas anteriores a RESERVAS_BAJAS_RETENCION_DIAS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=5000)
+        parser.add_argument("--cada", type=int, default=0, help="Repite cada N segundos (0 = una vez).")
+
+    def handle(self, *args, **options):
+        while True:
+            borradas = purgar_bajas(lote=options["lote"])
+            if borradas or options["verbosity"] > 1:
+                self.stdout.write(f"Bajas de reservas eliminadas: {borradas}")
+            if not options["cada"]:
+                break
+            time.sleep(options["cada"])
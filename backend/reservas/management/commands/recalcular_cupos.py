@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reservas.services import recalcular_cupos
+
+
+class Command(BaseCommand):
+    help = "Recalcula los cupos ocupados de eventos y zonas (reservas no canceladas y retenciones vigentes)."
+
+    def handle(self, *args, **options):
+        recalcular_cupos()
+        self.stdout.write(self.style.SUCCESS("Contadores de cupos actualizados."))
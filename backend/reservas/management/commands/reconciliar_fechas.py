@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reservas.services import reconciliar_fechas
+
+
+class Command(BaseCommand):
+    help = "Copia la fecha/hora vigente de cada evento a sus reservas desfasadas, por lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=5000, help="Reservas por UPDATE (rango de id).")
+
+    def handle(self, *args, **options):
+        corregidas = reconciliar_fechas(lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Reservas corregidas: {corregidas}"))
@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def recalcular_cupos(apps, schema_editor):
+    Reserva = apps.get_model("reservas", "Reserva")
+    Evento = apps.get_model("eventos", "Evento")
+    ZonaEvento = apps.get_model("eventos", "ZonaEvento")
+    activas = Reserva.objects.exclude(estado="cancelada")
+
+    por_evento = (
+        activas.filter(evento=OuterRef("pk"))
+        .values("evento")
+        .annotate(total=Sum("cupos_solicitados"))
+        .values("total")
+    )
+    por_zona = (
+        activas.filter(zona=OuterRef("pk"))
+        .values("zona")
+        .annotate(total=Sum("cupos_solicitados"))
+        .values("total")
+    )
+    Evento.objects.update(cupos_reservados=Coalesce(Subquery(por_evento), 0))
+    ZonaEvento.objects.update(cupos_reservados=Coalesce(Subquery(por_zona), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0007_cupos_reservados"),
+        ("reservas", "0005_merge_0004_indexes_reservas_0004_merge_20251216_2017"),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_cupos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0007_cupos_reservados"),
+        ("reservas", "0006_recalcular_cupos"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EsperaReserva",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("turno", models.PositiveIntegerField(editable=False, help_text="Correlativo dentro de la cola del evento/zona.", verbose_name="Turno")),
+                ("espacio", models.CharField(max_length=150, validators=[django.core.validators.MinLengthValidator(3)], verbose_name="Espacio")),
+                ("solicitante", models.CharField(max_length=150, validators=[django.core.validators.MinLengthValidator(3)], verbose_name="Solicitante")),
+                ("cupos_solicitados", models.PositiveIntegerField(default=1, verbose_name="Cupos solicitados")),
+                ("notas", models.TextField(blank=True, validators=[django.core.validators.MaxLengthValidator(2000)], verbose_name="Notas")),
+                ("estado", models.CharField(choices=[("esperando", "En espera"), ("promovida", "Promovida"), ("retirada", "Retirada")], default="esperando", max_length=20, verbose_name="Estado")),
+                ("creado", models.DateTimeField(auto_now_add=True)),
+                ("actualizado", models.DateTimeField(auto_now=True)),
+                ("evento", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="lista_espera", to="eventos.evento", verbose_name="Evento")),
+                ("zona", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="lista_espera", to="eventos.zonaevento", verbose_name="Zona")),
+                ("reserva", models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="espera", to="reservas.reserva", verbose_name="Reserva generada")),
+            ],
+            options={
+                "verbose_name": "entrada en lista de espera",
+                "verbose_name_plural": "lista de espera",
+                "ordering": ["evento", "zona", "turno"],
+                "indexes": [
+                    models.Index(fields=["evento", "zona", "turno"], name="espera_cola_idx"),
+                    models.Index(fields=["evento", "zona", "estado", "turno"], name="espera_cola_estado_idx"),
+                ],
+            },
+        ),
+    ]
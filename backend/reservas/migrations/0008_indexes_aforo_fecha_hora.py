@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0007_esperareserva"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(
+                condition=~models.Q(estado="cancelada"),
+                fields=["evento", "zona"],
+                include=["cupos_solicitados"],
+                name="reserva_aforo_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(fields=["fecha", "hora", "id"], name="reserva_fecha_hora_idx"),
+        ),
+        migrations.RemoveIndex(
+            model_name="reserva",
+            name="reserva_fecha_idx",
+        ),
+    ]
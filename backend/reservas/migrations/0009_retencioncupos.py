@@ -0,0 +1,34 @@
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0008_indexes_fecha_hora"),
+        ("reservas", "0008_indexes_aforo_fecha_hora"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetencionCupos",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("token", models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name="Token")),
+                ("cupos_solicitados", models.PositiveIntegerField(default=1, verbose_name="Cupos solicitados")),
+                ("solicitante", models.CharField(max_length=150, verbose_name="Solicitante")),
+                ("expira", models.DateTimeField(verbose_name="Expira")),
+                ("creado", models.DateTimeField(auto_now_add=True)),
+                ("evento", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="retenciones", to="eventos.evento", verbose_name="Evento")),
+                ("zona", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="retenciones", to="eventos.zonaevento", verbose_name="Zona")),
+            ],
+            options={
+                "verbose_name": "retención de cupos",
+                "verbose_name_plural": "retenciones de cupos",
+                "ordering": ["expira"],
+                "indexes": [models.Index(fields=["expira"], name="retencion_expira_idx")],
+            },
+        ),
+    ]
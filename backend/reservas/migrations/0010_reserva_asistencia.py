@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reservas", "0009_retencioncupos"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reserva",
+            name="asistencia",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="Momento del check-in en la entrada.",
+                null=True,
+                verbose_name="Asistencia",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0008_indexes_fecha_hora"),
+        ("reservas", "0010_reserva_asistencia"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reserva",
+            index=models.Index(fields=["evento", "actualizado"], name="reserva_evento_actualizado_idx"),
+        ),
+        migrations.CreateModel(
+            name="ReservaEliminada",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("codigo", models.CharField(max_length=32, verbose_name="Código")),
+                ("eliminado", models.DateTimeField(auto_now_add=True)),
+                ("evento", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="reservas_eliminadas", to="eventos.evento", verbose_name="Evento")),
+            ],
+            options={
+                "verbose_name": "reserva eliminada",
+                "verbose_name_plural": "reservas eliminadas",
+                "ordering": ["eliminado"],
+                "indexes": [models.Index(fields=["evento", "eliminado"], name="reserva_baja_evento_idx")],
+            },
+        ),
+    ]
@@ -67,6 +67,13 @@ class Reserva(models.Model):
     )
     estado = models.CharField("Estado", max_length=20, choices=ESTADOS, default=PENDIENTE)
     notas = models.TextField("Notas", blank=True, validators=[MaxLengthValidator(2000)])
+    asistencia = models.DateTimeField(
+        "Asistencia",
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Momento del check-in en la entrada.",
+    )
     creado = models.DateTimeField(auto_now_add=True)
     actualizado = models.DateTimeField(auto_now=True)
 
@@ -74,18 +81,155 @@ class Reserva(models.Model):
         ordering = ["-fecha", "-hora"]
         verbose_name = "reserva"
         verbose_name_plural = "reservas"
+        indexes = [
+            models.Index(fields=["fecha", "hora", "id"], name="reserva_fecha_hora_idx"),
+            models.Index(fields=["estado"], name="reserva_estado_idx"),
+            models.Index(fields=["evento"], name="reserva_evento_idx"),
+            models.Index(fields=["zona"], name="reserva_zona_idx"),
+            models.Index(fields=["evento", "actualizado"], name="reserva_evento_actualizado_idx"),
+            # Suma de cupos por evento/zona resuelta solo con el índice (index-only scan).
+            models.Index(
+                fields=["evento", "zona"],
+                include=["cupos_solicitados"],
+                condition=~models.Q(estado="cancelada"),
+                name="reserva_aforo_idx",
+            ),
+        ]
 
     @staticmethod
     def _generate_code() -> str:
         return uuid.uuid4().hex[:12]
 
-    def save(self, *args, **kwargs):
+    def completar_campos(self):
+        """Genera el código y copia fecha/hora del evento (también usado antes de ``bulk_create``)."""
         if not self.codigo:
             self.codigo = self._generate_code()
         if self.evento:
             self.fecha = self.evento.fecha
             self.hora = self.evento.hora
+
+    def save(self, *args, **kwargs):
+        self.completar_campos()
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.codigo} - {self.espacio}"
+
+
+class EsperaReserva(models.Model):
+    """Solicitud en lista de espera para un evento (o zona) sin cupos."""
+
+    ESPERANDO = "esperando"
+    PROMOVIDA = "promovida"
+    RETIRADA = "retirada"
+    ESTADOS = [
+        (ESPERANDO, "En espera"),
+        (PROMOVIDA, "Promovida"),
+        (RETIRADA, "Retirada"),
+    ]
+
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name="lista_espera",
+        verbose_name="Evento",
+    )
+    zona = models.ForeignKey(
+        ZonaEvento,
+        on_delete=models.CASCADE,
+        related_name="lista_espera",
+        verbose_name="Zona",
+        null=True,
+        blank=True,
+    )
+    turno = models.PositiveIntegerField(
+        "Turno",
+        editable=False,
+        help_text="Correlativo dentro de la cola del evento/zona.",
+    )
+    espacio = models.CharField("Espacio", max_length=150, validators=[MinLengthValidator(3)])
+    solicitante = models.CharField("Solicitante", max_length=150, validators=[MinLengthValidator(3)])
+    cupos_solicitados = models.PositiveIntegerField("Cupos solicitados", default=1)
+    notas = models.TextField("Notas", blank=True, validators=[MaxLengthValidator(2000)])
+    estado = models.CharField("Estado", max_length=20, choices=ESTADOS, default=ESPERANDO)
+    reserva = models.OneToOneField(
+        Reserva,
+        on_delete=models.SET_NULL,
+        related_name="espera",
+        verbose_name="Reserva generada",
+        null=True,
+        blank=True,
+    )
+    creado = models.DateTimeField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["evento", "zona", "turno"]
+        verbose_name = "entrada en lista de espera"
+        verbose_name_plural = "lista de espera"
+        indexes = [
+            models.Index(fields=["evento", "zona", "turno"], name="espera_cola_idx"),
+            models.Index(fields=["evento", "zona", "estado", "turno"], name="espera_cola_estado_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.solicitante} - turno {self.turno}"
+
+
+class RetencionCupos(models.Model):
+    """Cupos apartados por unos minutos mientras el usuario completa la reserva."""
+
+    token = models.UUIDField("Token", default=uuid.uuid4, unique=True, editable=False)
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name="retenciones",
+        verbose_name="Evento",
+    )
+    zona = models.ForeignKey(
+        ZonaEvento,
+        on_delete=models.CASCADE,
+        related_name="retenciones",
+        verbose_name="Zona",
+        null=True,
+        blank=True,
+    )
+    cupos_solicitados = models.PositiveIntegerField("Cupos solicitados", default=1)
+    solicitante = models.CharField("Solicitante", max_length=150)
+    expira = models.DateTimeField("Expira")
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["expira"]
+        verbose_name = "retención de cupos"
+        verbose_name_plural = "retenciones de cupos"
+        indexes = [
+            models.Index(fields=["expira"], name="retencion_expira_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.solicitante} - {self.cupos_solicitados} cupos hasta {self.expira:%H:%M}"
+
+
+class ReservaEliminada(models.Model):
+    """Registro de bajas para que los lectores sin conexión descarten códigos borrados."""
+
+    codigo = models.CharField("Código", max_length=32)
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name="reservas_eliminadas",
+        verbose_name="Evento",
+    )
+    eliminado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["eliminado"]
+        verbose_name = "reserva eliminada"
+        verbose_name_plural = "reservas eliminadas"
+        indexes = [
+            models.Index(fields=["evento", "eliminado"], name="reserva_baja_evento_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.codigo
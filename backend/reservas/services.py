@@ -0,0 +1,586 @@
+"""
+Motor de reservas: descuenta cupos contra el aforo del evento o de la zona
+dentro de una única transacción, de modo que dos solicitudes simultáneas
+no puedan sobrevender el mismo cupo.
+
+Los cupos ocupados se mantienen materializados en ``Evento.cupos_reservados``
+y ``ZonaEvento.cupos_reservados``; cada reserva los ajusta con un UPDATE
+condicional en lugar de volver a sumar la tabla de reservas. El mismo UPDATE
+renueva ``Evento.actualizado``, ya que cambia la disponibilidad publicada
+(y con ella el ETag del evento). La caché anónima de eventos se renueva solo
+si el UPDATE tocó la fila, y a lo sumo una vez cada
+``API_CACHE_ANONIMA_CUPOS_SEGUNDOS``.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    DateTimeField,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from comun.cache_respuestas import invalidar_respuestas
+from eventos.calendario import invalidar_calendario
+from eventos.models import Evento, ZonaEvento
+from .models import EsperaReserva, Reserva, RetencionCupos
+
+
+def validar_zona(evento, zona):
+    """Verifica que la zona sea coherente con el modo de aforo del evento."""
+    if evento.modo_aforo == Evento.MODO_GENERAL:
+        if zona is not None:
+            raise ValidationError({"zona": "Este evento no usa zonas."})
+        return
+
+    if not zona:
+        raise ValidationError({"zona": "Selecciona una zona."})
+    if zona.evento_id != evento.id:
+        raise ValidationError({"zona": "La zona no pertenece a este evento."})
+
+
+def _ocupa_cupos(estado):
+    return estado != Reserva.CANCELADA
+
+
+def _marca(model):
+    """Campos extra del UPDATE de cupos: el evento cambia de disponibilidad publicada."""
+    return {"actualizado": timezone.now()} if model is Evento else {}
+
+
+def _cupos_cambiados(model, filas):
+    """Renueva (espaciada) la caché anónima si el UPDATE de cupos del evento tocó filas."""
+    if filas and model is Evento:
+        invalidar_respuestas(Evento, espaciado=settings.API_CACHE_ANONIMA_CUPOS_SEGUNDOS)
+    return filas
+
+
+def _tomar_cupos(model, pk, cupos):
+    """
+    Suma ``cupos`` al contador solo si caben en el aforo (``cupo_total`` 0 = sin límite).
+
+    El UPDATE condicional bloquea la fila, por lo que las reservas concurrentes
+    sobre el mismo evento/zona se serializan sin consultas adicionales.
+    """
+    filas = (
+        model.objects.filter(pk=pk)
+        .filter(Q(cupo_total=0) | Q(cupos_reservados__lte=F("cupo_total") - cupos))
+        .update(cupos_reservados=F("cupos_reservados") + cupos, **_marca(model))
+    )
+    return _cupos_cambiados(model, filas)
+
+
+def _sumar_cupos(model, pk, cupos):
+    filas = model.objects.filter(pk=pk).update(cupos_reservados=F("cupos_reservados") + cupos, **_marca(model))
+    _cupos_cambiados(model, filas)
+
+
+def liberar_cupos(evento_id, zona_id, cupos):
+    """
+    Devuelve cupos a la zona y al evento (sin bajar de cero).
+
+    Bloquea en el mismo orden que ``_ocupar_cupos`` (zona y luego evento) para
+    que una baja y una reserva simultáneas en la misma zona no se interbloqueen.
+    """
+    if zona_id:
+        ZonaEvento.objects.filter(pk=zona_id).update(
+            cupos_reservados=Greatest(F("cupos_reservados") - cupos, 0)
+        )
+    filas = Evento.objects.filter(pk=evento_id).update(
+        cupos_reservados=Greatest(F("cupos_reservados") - cupos, 0),
+        **_marca(Evento),
+    )
+    _cupos_cambiados(Evento, filas)
+
+
+def _ocupar_cupos(evento, zona, cupos):
+    if zona is not None:
+        if not _tomar_cupos(ZonaEvento, zona.pk, cupos):
+            disponible = ZonaEvento.objects.get(pk=zona.pk).disponible
+            raise ValidationError({
+                "cupos_solicitados": f"No hay cupos suficientes en la zona. Disponible: {disponible}.",
+            })
+        _sumar_cupos(Evento, evento.pk, cupos)
+        return
+
+    if not _tomar_cupos(Evento, evento.pk, cupos):
+        disponible = Evento.objects.get(pk=evento.pk).disponible
+        raise ValidationError({
+            "cupos_solicitados": f"No hay cupos suficientes. Disponible: {disponible}.",
+        })
+
+
+def verificar_aforo(evento, zona, cupos, estado=Reserva.PENDIENTE, reserva_id=None):
+    """
+    Comprueba sin guardar que ``cupos`` caben en el aforo del evento o de la zona.
+
+    Bloquea la fila del evento/zona hasta el final de la transacción en curso,
+    así que un ``guardar_reserva`` posterior dentro de ella no puede quedarse
+    sin cupos. Al editar (``reserva_id``) se descuentan los cupos que la
+    reserva ya ocupa en el mismo evento/zona. Lanza ``ValidationError``.
+    """
+    if not _ocupa_cupos(estado):
+        return
+    model, pk = (ZonaEvento, zona.pk) if zona is not None else (Evento, evento.pk)
+    limite = model.objects.select_for_update().only("cupo_total", "cupos_reservados").get(pk=pk)
+    disponible = _disponible(limite)
+    if disponible is None:
+        return
+
+    if reserva_id:
+        anterior = (
+            Reserva.objects.filter(pk=reserva_id)
+            .values("evento_id", "zona_id", "cupos_solicitados", "estado")
+            .first()
+        )
+        misma_cola = anterior and (anterior["evento_id"], anterior["zona_id"]) == (evento.pk, zona and zona.pk)
+        if misma_cola and _ocupa_cupos(anterior["estado"]):
+            disponible += anterior["cupos_solicitados"]
+    if cupos > disponible:
+        detalle = " en la zona" if zona is not None else ""
+        raise ValidationError({
+            "cupos_solicitados": f"No hay cupos suficientes{detalle}. Disponible: {disponible}.",
+        })
+
+
+@transaction.atomic
+def guardar_reserva(reserva, retencion=None):
+    """
+    Valida el aforo y guarda la reserva de forma atómica.
+
+    Si se indica una ``retencion``, sus cupos se devuelven y se vuelven a tomar
+    para la reserva en la misma transacción, de modo que nadie más los ocupe.
+    Lanza ``ValidationError`` (con errores por campo) si no hay cupos suficientes.
+    """
+    evento = reserva.evento
+    zona = reserva.zona
+    cupos = reserva.cupos_solicitados or 0
+
+    if cupos <= 0:
+        raise ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
+    validar_zona(evento, zona)
+
+    if retencion is not None and not _consumir_retencion(retencion):
+        raise ValidationError({"retencion": "Retención no encontrada o vencida."})
+
+    anterior = None
+    if reserva.pk:
+        anterior = (
+            Reserva.objects.select_for_update()
+            .filter(pk=reserva.pk)
+            .values("evento_id", "zona_id", "cupos_solicitados", "estado", "fecha")
+            .first()
+        )
+        if anterior and _ocupa_cupos(anterior["estado"]):
+            liberar_cupos(anterior["evento_id"], anterior["zona_id"], anterior["cupos_solicitados"])
+            invalidar_calendario(anterior["fecha"])
+        else:
+            anterior = None
+
+    ocupa = _ocupa_cupos(reserva.estado)
+    if ocupa:
+        _ocupar_cupos(evento, zona, cupos)
+
+    reserva.save()
+
+    # Si la edición liberó cupos en la cola anterior (cancelación, menos cupos o
+    # cambio de evento/zona), se ofrecen a la lista de espera.
+    if anterior:
+        misma_cola = (anterior["evento_id"], anterior["zona_id"]) == (reserva.evento_id, reserva.zona_id)
+        if not ocupa or not misma_cola or cupos < anterior["cupos_solicitados"]:
+            promover_espera(anterior["evento_id"], anterior["zona_id"])
+    return reserva
+
+
+def _disponible(limite):
+    if not limite.cupo_total:
+        return None
+    return max(limite.cupo_total - limite.cupos_reservados, 0)
+
+
+@transaction.atomic
+def crear_reservas_en_lote(reservas):
+    """
+    Crea varias reservas tomando cupos una sola vez por cada evento/zona.
+
+    Recibe instancias sin guardar (ya validadas con ``validar_zona``) y devuelve
+    una lista paralela con la reserva creada o el ``ValidationError`` que la
+    rechazó. Dentro de cada grupo las reservas se aceptan en el orden recibido
+    mientras alcance el aforo.
+    """
+    grupos = defaultdict(list)
+    for indice, reserva in enumerate(reservas):
+        grupos[(reserva.evento_id, reserva.zona_id)].append(indice)
+
+    resultados = [None] * len(reservas)
+    por_crear = []
+    # Orden fijo de bloqueo para evitar interbloqueos entre lotes concurrentes.
+    for (evento_id, zona_id), indices in sorted(grupos.items(), key=lambda g: (g[0][0], g[0][1] or 0)):
+        model, pk = (ZonaEvento, zona_id) if zona_id else (Evento, evento_id)
+        limite = model.objects.select_for_update().only("cupo_total", "cupos_reservados").get(pk=pk)
+        disponible = _disponible(limite)
+
+        tomados = 0
+        for indice in indices:
+            reserva = reservas[indice]
+            cupos = reserva.cupos_solicitados if _ocupa_cupos(reserva.estado) else 0
+            if disponible is not None and cupos > disponible - tomados:
+                detalle = " en la zona" if zona_id else ""
+                resultados[indice] = ValidationError({
+                    "cupos_solicitados": (
+                        f"No hay cupos suficientes{detalle}. Disponible: {disponible - tomados}."
+                    ),
+                })
+                continue
+            tomados += cupos
+            reserva.completar_campos()
+            por_crear.append(reserva)
+            resultados[indice] = reserva
+
+        if tomados:
+            _sumar_cupos(Evento, evento_id, tomados)
+            if zona_id:
+                _sumar_cupos(ZonaEvento, zona_id, tomados)
+
+    Reserva.objects.bulk_create(por_crear)
+    invalidar_calendario(*{reserva.fecha for reserva in por_crear})
+    return resultados
+
+
+@transaction.atomic
+def retener_cupos(retencion):
+    """
+    Aparta cupos por ``RESERVAS_RETENCION_MINUTOS`` contra el aforo del evento/zona.
+
+    Los cupos retenidos se suman al contador, así que la validación de aforo
+    los descuenta sin consultas adicionales.
+    """
+    if (retencion.cupos_solicitados or 0) <= 0:
+        raise ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
+    validar_zona(retencion.evento, retencion.zona)
+    _ocupar_cupos(retencion.evento, retencion.zona, retencion.cupos_solicitados)
+    retencion.expira = timezone.now() + timedelta(minutes=settings.RESERVAS_RETENCION_MINUTOS)
+    retencion.save()
+    invalidar_calendario(retencion.evento.fecha)
+    return retencion
+
+
+def _consumir_retencion(retencion):
+    """
+    Borra la retención y devuelve sus cupos; ``False`` si ya venció.
+
+    Una retención vencida queda para el barrido periódico, que es quien
+    devuelve sus cupos (o ya lo hizo, si no se encuentra).
+    """
+    eliminadas, _ = RetencionCupos.objects.filter(pk=retencion.pk, expira__gt=timezone.now()).delete()
+    if not eliminadas:
+        return False
+    liberar_cupos(retencion.evento_id, retencion.zona_id, retencion.cupos_solicitados)
+    invalidar_calendario(retencion.evento.fecha)
+    return True
+
+
+@transaction.atomic
+def liberar_retencion(retencion):
+    """Devuelve los cupos de una retención abandonada por el usuario."""
+    _consumir_retencion(retencion)
+    promover_espera(retencion.evento_id, retencion.zona_id)
+
+
+def liberar_retenciones_vencidas(lote=1000):
+    """
+    Devuelve al aforo los cupos de las retenciones vencidas, por lotes.
+
+    Cada lote descuenta los contadores con un UPDATE por evento/zona y borra
+    las retenciones con un solo DELETE. Devuelve cuántas se liberaron.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            vencidas = list(
+                RetencionCupos.objects.select_for_update(skip_locked=True)
+                .filter(expira__lte=timezone.now())
+                .order_by("expira")
+                .values_list("pk", "evento_id", "zona_id", "cupos_solicitados")[:lote]
+            )
+            if not vencidas:
+                return total
+
+            grupos = defaultdict(int)
+            for _, evento_id, zona_id, cupos in vencidas:
+                grupos[(evento_id, zona_id)] += cupos
+            RetencionCupos.objects.filter(pk__in=[pk for pk, *_ in vencidas]).delete()
+            for (evento_id, zona_id), cupos in sorted(grupos.items(), key=lambda g: (g[0][0], g[0][1] or 0)):
+                liberar_cupos(evento_id, zona_id, cupos)
+                promover_espera(evento_id, zona_id)
+            eventos = {evento_id for evento_id, _ in grupos}
+            invalidar_calendario(*Evento.objects.filter(pk__in=eventos).values_list("fecha", flat=True))
+        total += len(vencidas)
+
+
+def _cola(evento_id, zona_id):
+    return EsperaReserva.objects.filter(evento_id=evento_id, zona_id=zona_id)
+
+
+@transaction.atomic
+def encolar_espera(entrada):
+    """
+    Agrega la solicitud al final de la cola del evento/zona.
+
+    Si en ese momento hay cupos, la entrada se promueve de inmediato a reserva.
+    """
+    if (entrada.cupos_solicitados or 0) <= 0:
+        raise ValidationError({"cupos_solicitados": "Debe ser mayor a 0."})
+    validar_zona(entrada.evento, entrada.zona)
+
+    # El bloqueo del evento/zona serializa la asignación de turnos.
+    model, pk = (ZonaEvento, entrada.zona_id) if entrada.zona_id else (Evento, entrada.evento_id)
+    model.objects.select_for_update().only("pk").get(pk=pk)
+    ultimo = _cola(entrada.evento_id, entrada.zona_id).aggregate(ultimo=Max("turno"))["ultimo"]
+    entrada.turno = (ultimo or 0) + 1
+    entrada.estado = EsperaReserva.ESPERANDO
+    entrada.save()
+
+    promover_espera(entrada.evento_id, entrada.zona_id)
+    entrada.refresh_from_db(fields=["estado", "reserva"])
+    return entrada
+
+
+def promover_espera(evento_id, zona_id):
+    """
+    Convierte en reservas las primeras entradas de la cola mientras haya cupos.
+
+    Se respeta el orden FIFO: si la primera entrada no cabe, las siguientes
+    esperan. Cada paso lee solo la cabeza de la cola por índice, sin recorrerla.
+    """
+    model, pk = (ZonaEvento, zona_id) if zona_id else (Evento, evento_id)
+    promovidas = []
+    while True:
+        entrada = (
+            _cola(evento_id, zona_id)
+            .select_for_update()
+            .filter(estado=EsperaReserva.ESPERANDO)
+            .order_by("turno")
+            .first()
+        )
+        if entrada is None or not _tomar_cupos(model, pk, entrada.cupos_solicitados):
+            break
+        if zona_id:
+            _sumar_cupos(Evento, evento_id, entrada.cupos_solicitados)
+
+        reserva = Reserva(
+            evento=entrada.evento,
+            zona=entrada.zona,
+            espacio=entrada.espacio,
+            solicitante=entrada.solicitante,
+            cupos_solicitados=entrada.cupos_solicitados,
+            notas=entrada.notas,
+            estado=Reserva.PENDIENTE,
+        )
+        reserva.save()
+        entrada.estado = EsperaReserva.PROMOVIDA
+        entrada.reserva = reserva
+        entrada.save(update_fields=["estado", "reserva", "actualizado"])
+        promovidas.append(entrada)
+    return promovidas
+
+
+@transaction.atomic
+def retirar_espera(entrada):
+    """Saca la entrada de la cola; el registro se conserva como historial."""
+    entrada.estado = EsperaReserva.RETIRADA
+    entrada.save(update_fields=["estado", "actualizado"])
+    promover_espera(entrada.evento_id, entrada.zona_id)
+
+
+def _en_su_cola(subconsulta):
+    """
+    Evalúa ``subconsulta`` sobre la cola (evento y zona) de la fila externa.
+
+    La zona es opcional y ``zona = NULL`` no coincide en SQL, así que cada caso
+    tiene su propia rama; PostgreSQL ejecuta solo la que corresponde a la fila.
+    """
+    cola = EsperaReserva.objects.order_by().filter(evento=OuterRef("evento"))
+    return Case(
+        When(zona__isnull=True, then=subconsulta(cola.filter(zona__isnull=True))),
+        default=subconsulta(cola.filter(zona=OuterRef("zona"))),
+    )
+
+
+def anotar_posiciones(queryset):
+    """
+    Anota ``posicion`` en cada entrada de ``queryset`` (``None`` si ya no espera).
+
+    Los turnos de una cola son consecutivos y las promociones siempre salen por
+    la cabeza, así que la posición es ``turno - cabeza + 1`` menos las entradas
+    retiradas que quedaron entre la cabeza y el turno. Por fila se hace una
+    búsqueda de la cabeza y un rango de retiradas sobre ``espera_cola_estado_idx``:
+    O(log n + r), con r las retiradas pendientes de alcanzar por la cabeza,
+    sin recorrer las entradas que siguen esperando. No depende de los filtros
+    del listado.
+    """
+    cabeza = _en_su_cola(
+        lambda cola: Subquery(cola.filter(estado=EsperaReserva.ESPERANDO).order_by("turno").values("turno")[:1])
+    )
+    huecos = _en_su_cola(
+        lambda cola: Subquery(
+            cola.filter(estado=EsperaReserva.RETIRADA, turno__gt=OuterRef("cabeza"), turno__lt=OuterRef("turno"))
+            .values("evento")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+    )
+    return queryset.annotate(cabeza=cabeza).annotate(
+        posicion=Case(
+            When(
+                estado=EsperaReserva.ESPERANDO,
+                then=F("turno") - F("cabeza") + 1 - Coalesce(huecos, 0),
+            ),
+            default=None,
+        )
+    )
+
+
+def posicion_en_espera(entrada):
+    """Posición (1 = siguiente) de una entrada en su cola, o ``None`` si ya no espera."""
+    if entrada.estado != EsperaReserva.ESPERANDO:
+        return None
+    return anotar_posiciones(EsperaReserva.objects.filter(pk=entrada.pk)).values_list("posicion", flat=True).get()
+
+
+ASISTENCIA_OK = "ok"
+ASISTENCIA_DUPLICADA = "duplicado"
+ASISTENCIA_CANCELADA = "cancelada"
+ASISTENCIA_NO_ENCONTRADA = "no_encontrado"
+
+
+def registrar_asistencia(codigos, evento_id=None, momentos=None):
+    """
+    Marca la asistencia de uno o varios códigos con un único UPDATE condicional.
+
+    Solo se marcan reservas no canceladas y sin check-in previo. ``momentos``
+    (código -> datetime) permite subir check-ins registrados sin conexión con
+    su hora real. Si todas las marcas se aplican no hay más consultas; si alguna
+    se rechaza, una segunda lectura por el índice único de ``codigo`` explica
+    el motivo. Devuelve pares ``(codigo, resultado)`` en el orden recibido.
+    """
+    normalizados = [str(codigo).strip().lower() for codigo in codigos]
+    unicos = list(dict.fromkeys(c for c in normalizados if c))
+    ahora = timezone.now()
+    momentos = {str(c).strip().lower(): m for c, m in (momentos or {}).items()}
+    marca = {codigo: momentos.get(codigo) or ahora for codigo in unicos}
+
+    queryset = Reserva.objects.filter(codigo__in=unicos)
+    if evento_id:
+        queryset = queryset.filter(evento_id=evento_id)
+    valor = Value(ahora)
+    if momentos:
+        valor = Case(
+            *[When(codigo=codigo, then=Value(momento)) for codigo, momento in marca.items()],
+            default=Value(ahora),
+            output_field=DateTimeField(),
+        )
+    marcadas = (
+        queryset.filter(asistencia__isnull=True)
+        .exclude(estado=Reserva.CANCELADA)
+        .update(asistencia=valor, actualizado=ahora)
+    )
+
+    if marcadas == len(unicos):
+        estados = {codigo: (marca[codigo], None) for codigo in unicos}
+    else:
+        estados = {
+            codigo: (asistencia, estado)
+            for codigo, asistencia, estado in queryset.order_by().values_list("codigo", "asistencia", "estado")
+        }
+
+    resultados = []
+    vistos = set()
+    for codigo in normalizados:
+        asistencia, estado = estados.get(codigo, (None, None))
+        if codigo not in estados:
+            resultado = ASISTENCIA_NO_ENCONTRADA
+        elif codigo in vistos or asistencia != marca[codigo]:
+            resultado = ASISTENCIA_CANCELADA if estado == Reserva.CANCELADA else ASISTENCIA_DUPLICADA
+        else:
+            resultado = ASISTENCIA_OK
+        vistos.add(codigo)
+        resultados.append((codigo, resultado))
+    return resultados
+
+
+def reconciliar_fechas(lote=5000):
+    """
+    Corrige por rangos de id las reservas cuya fecha/hora difiere de su evento.
+
+    Cada lote es un único UPDATE; devuelve cuántas reservas se corrigieron.
+    """
+    rango = Reserva.objects.aggregate(minimo=Min("pk"), maximo=Max("pk"))
+    if rango["minimo"] is None:
+        return 0
+
+    evento = Evento.objects.filter(pk=OuterRef("evento_id"))
+    corregidas = 0
+    for inicio in range(rango["minimo"], rango["maximo"] + 1, lote):
+        desfasadas = Reserva.objects.filter(pk__gte=inicio, pk__lt=inicio + lote).filter(
+            Q(fecha__isnull=True)
+            | Q(hora__isnull=True)
+            | ~Q(fecha=F("evento__fecha"))
+            | ~Q(hora=F("evento__hora"))
+        )
+        corregidas += desfasadas.update(
+            fecha=Subquery(evento.values("fecha")[:1]),
+            hora=Subquery(evento.values("hora")[:1]),
+            actualizado=timezone.now(),
+        )
+    return corregidas
+
+
+def _suma_por(queryset, campo):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{campo: OuterRef("pk")})
+            .order_by()
+            .values(campo)
+            .annotate(total=Sum("cupos_solicitados"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def recalcular_cupos():
+    """
+    Reconstruye los contadores de cupos desde las reservas y las retenciones.
+
+    Primero se liberan las retenciones vencidas (como el barrido periódico);
+    las que quedan siguen apartando cupos y se suman a las reservas no
+    canceladas. Contar también las vencidas sin barrer haría que el barrido
+    posterior las descontara dos veces.
+    """
+    liberar_retenciones_vencidas()
+    activas = Reserva.objects.exclude(estado=Reserva.CANCELADA)
+    retenciones = RetencionCupos.objects.all()
+    por_evento = _suma_por(activas, "evento") + _suma_por(retenciones, "evento")
+    por_zona = _suma_por(activas, "zona") + _suma_por(retenciones, "zona")
+    with transaction.atomic():
+        filas = Evento.objects.exclude(cupos_reservados=por_evento).update(
+            cupos_reservados=por_evento,
+            **_marca(Evento),
+        )
+        _cupos_cambiados(Evento, filas)
+        ZonaEvento.objects.exclude(cupos_reservados=por_zona).update(cupos_reservados=por_zona)
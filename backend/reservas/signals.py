@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from eventos.calendario import invalidar_calendario
+from eventos.models import Evento
+from .models import Reserva, ReservaEliminada
+from .services import liberar_cupos, promover_espera
+
+
+def _origen_es(origin, model):
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+@receiver(post_delete, sender=Reserva)
+def liberar_cupos_al_eliminar(sender, instance, origin=None, **kwargs):
+    """Devuelve al aforo los cupos de una reserva eliminada (API, admin o cascada)."""
+    if instance.estado == Reserva.CANCELADA:
+        return
+    with transaction.atomic():
+        liberar_cupos(instance.evento_id, instance.zona_id, instance.cupos_solicitados)
+        # En la cascada de un evento o zona no se promueve la lista de espera.
+        if _origen_es(origin, Reserva):
+            promover_espera(instance.evento_id, instance.zona_id)
+
+
+@receiver(post_delete, sender=Reserva)
+def registrar_baja(sender, instance, origin=None, **kwargs):
+    """Deja constancia del código borrado para el delta de los lectores sin conexión."""
+    if not _origen_es(origin, Evento):
+        ReservaEliminada.objects.create(codigo=instance.codigo, evento_id=instance.evento_id)
+
+
+@receiver(post_save, sender=Reserva)
+@receiver(post_delete, sender=Reserva)
+def invalidar_calendario_reserva(sender, instance, **kwargs):
+    invalidar_calendario(instance.fecha)
@@ -0,0 +1,140 @@
+"""
+Snapshot binario de códigos válidos por evento para lectores sin conexión.
+
+Formato (little endian)::
+
+    cabecera   4s magic "SGRE" | B versión | B tipo (0 snapshot, 1 delta)
+               | B ancho de código | H zonas | I registros | q evento | q cursor
+    zonas      por zona: q id | B largo | nombre UTF-8
+    registros  ordenados por código: {ancho}s código (relleno con NUL)
+               | H índice de zona (0xFFFF = sin zona) | H cupos | B flags
+
+Flags: bit 0 = asistencia registrada, bit 1 = baja (cancelada o eliminada).
+Al ser registros de ancho fijo y ordenados, el lector busca un código por
+búsqueda binaria directamente sobre el archivo. ``cursor`` (microsegundos
+desde epoch) se envía como ``desde`` para pedir solo los cambios posteriores.
+
+Las bajas se guardan ``RESERVAS_BAJAS_RETENCION_DIAS`` (``purgar_bajas``); un
+cursor anterior a ese límite recibe un snapshot completo (tipo 0), que el
+lector debe aplicar reemplazando su copia local.
+"""
+import struct
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from eventos.models import ZonaEvento
+from .models import Reserva, ReservaEliminada
+
+MAGIC = b"SGRE"
+VERSION = 1
+TIPO_SNAPSHOT = 0
+TIPO_DELTA = 1
+SIN_ZONA = 0xFFFF
+FLAG_ASISTENCIA = 0b01
+FLAG_BAJA = 0b10
+CONTENT_TYPE = "application/vnd.sgre.checkin"
+# Solape del delta para no perder filas confirmadas con un ``actualizado`` anterior
+# al cursor; el lector aplica los registros como upsert, así que repetir es inocuo.
+SOLAPE_DELTA = timedelta(seconds=5)
+
+_CABECERA = struct.Struct("<4sBBBHIqq")
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def a_cursor(momento):
+    if momento is None:
+        return 0
+    return (momento - _EPOCH) // timedelta(microseconds=1)
+
+
+def desde_cursor(cursor):
+    return _EPOCH + timedelta(microseconds=int(cursor))
+
+
+def limite_bajas():
+    """Momento desde el que se conservan las bajas; antes de él no hay delta posible."""
+    return timezone.now() - timedelta(days=settings.RESERVAS_BAJAS_RETENCION_DIAS)
+
+
+def purgar_bajas(lote=5000):
+    """Elimina por lotes las bajas anteriores a ``limite_bajas()``. Devuelve cuántas se borraron."""
+    limite = limite_bajas()
+    total = 0
+    while True:
+        ids = list(ReservaEliminada.objects.filter(eliminado__lt=limite).values_list("pk", flat=True)[:lote])
+        if not ids:
+            return total
+        total += ReservaEliminada.objects.filter(pk__in=ids).delete()[0]
+
+
+def _registros(evento, desde):
+    """Filas ``(codigo, zona_id, cupos, asistencia, baja)`` y el cursor resultante."""
+    reservas = Reserva.objects.filter(evento=evento).order_by()
+    if desde is None:
+        reservas = reservas.exclude(estado=Reserva.CANCELADA)
+    else:
+        reservas = reservas.filter(actualizado__gt=desde - SOLAPE_DELTA)
+
+    filas = []
+    marcas = [desde] if desde else []
+    columnas = ("codigo", "zona_id", "cupos_solicitados", "asistencia", "estado", "actualizado")
+    for codigo, zona_id, cupos, asistencia, estado, actualizado in reservas.values_list(*columnas).iterator(
+        chunk_size=5000
+    ):
+        filas.append((codigo, zona_id, cupos, asistencia is not None, estado == Reserva.CANCELADA))
+        marcas.append(actualizado)
+
+    if desde is not None:
+        bajas = ReservaEliminada.objects.filter(evento=evento, eliminado__gt=desde - SOLAPE_DELTA)
+        for codigo, eliminado in bajas.values_list("codigo", "eliminado"):
+            filas.append((codigo, None, 0, False, True))
+            marcas.append(eliminado)
+
+    filas.sort(key=lambda fila: fila[0])
+    return filas, max(marcas, default=None)
+
+
+def empaquetar(evento, desde=None):
+    """
+    Arma el snapshot (o el delta si se indica ``desde``) de un evento.
+
+    Si ``desde`` es anterior a la retención de bajas, el delta podría omitir
+    códigos eliminados y se devuelve el snapshot completo.
+    """
+    if desde is not None and desde - SOLAPE_DELTA < limite_bajas():
+        desde = None
+    filas, cursor = _registros(evento, desde)
+    zonas = list(ZonaEvento.objects.filter(evento=evento).order_by("pk").values_list("pk", "nombre"))
+    indice_zona = {pk: indice for indice, (pk, _) in enumerate(zonas)}
+    ancho = max((len(fila[0]) for fila in filas), default=0)
+
+    partes = [
+        _CABECERA.pack(
+            MAGIC,
+            VERSION,
+            TIPO_SNAPSHOT if desde is None else TIPO_DELTA,
+            ancho,
+            len(zonas),
+            len(filas),
+            evento.pk,
+            a_cursor(cursor),
+        )
+    ]
+    for pk, nombre in zonas:
+        nombre_bytes = nombre.encode("utf-8")[:255]
+        partes.append(struct.pack("<qB", pk, len(nombre_bytes)) + nombre_bytes)
+
+    registro = struct.Struct(f"<{ancho}sHHB")
+    for codigo, zona_id, cupos, asistencia, baja in filas:
+        flags = (FLAG_ASISTENCIA if asistencia else 0) | (FLAG_BAJA if baja else 0)
+        partes.append(
+            registro.pack(
+                codigo.encode("ascii"),
+                indice_zona.get(zona_id, SIN_ZONA),
+                min(cupos, 0xFFFF),
+                flags,
+            )
+        )
+    return b"".join(partes), a_cursor(cursor)
@@ -1,3 +1,557 @@
-﻿from django.test import TestCase
+﻿import io
+import json
+import os
+import threading
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from comun import cache_respuestas
+from eventos.models import Evento, ZonaEvento
+from . import importacion, sincronizacion
+from .models import EsperaReserva, Reserva, ReservaEliminada, RetencionCupos
+from .services import (
+    _tomar_cupos,
+    encolar_espera,
+    guardar_reserva,
+    liberar_retenciones_vencidas,
+    posicion_en_espera,
+    recalcular_cupos,
+    retener_cupos,
+    retirar_espera,
+)
+
+
+def crear_evento(**datos):
+    datos.setdefault("titulo", "Concierto de prueba")
+    datos.setdefault("fecha", date(2030, 1, 15))
+    datos.setdefault("hora", time(18, 0))
+    datos.setdefault("lugar", "Teatro municipal")
+    return Evento.objects.create(**datos)
+
+
+class CheckinTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        self.client.force_authenticate(self.admin)
+
+    def test_url_de_checkin_resuelve(self):
+        url = reverse("reserva-checkin")
+        self.assertEqual(url, "/api/reservas/checkin/")
+        self.assertEqual(resolve(url).func.actions, {"post": "checkin"})
+        self.assertEqual(resolve(reverse("reserva-checkin-offline")).func.actions, {"post": "checkin_offline"})
+
+    def test_checkin_marca_asistencia(self):
+        evento = crear_evento()
+        reserva = Reserva.objects.create(evento=evento, espacio="Sala 1", solicitante="Cultura")
+
+        response = self.client.post(reverse("reserva-checkin"), {"codigo": reserva.codigo}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["aceptados"], 1)
+        reserva.refresh_from_db()
+        self.assertIsNotNone(reserva.asistencia)
+
+
+class ReservaAdminTests(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        self.client.force_login(admin)
+        self.evento = crear_evento(cupo_total=2)
+
+    def _datos(self, **extra):
+        datos = {
+            "espacio": "Sala 1",
+            "solicitante": "Cultura",
+            "evento": self.evento.pk,
+            "zona": "",
+            "cupos_solicitados": 2,
+            "estado": Reserva.PENDIENTE,
+            "notas": "",
+        }
+        datos.update(extra)
+        return datos
+
+    def test_reserva_sin_cupos_muestra_error_en_el_formulario(self):
+        response = self.client.post(reverse("admin:reservas_reserva_add"), self._datos(cupos_solicitados=3))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("cupos_solicitados", response.context["adminform"].form.errors)
+        self.assertFalse(Reserva.objects.exists())
+
+    def test_editar_reserva_descuenta_sus_propios_cupos(self):
+        reserva = guardar_reserva(
+            Reserva(evento=self.evento, espacio="Sala 1", solicitante="Cultura", cupos_solicitados=2)
+        )
+        url = reverse("admin:reservas_reserva_change", args=[reserva.pk])
+
+        response = self.client.post(url, self._datos(notas="Sin cambios de cupos."))
+
+        self.assertEqual(response.status_code, 302)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.cupos_reservados, 2)
+
+
+class ListaEsperaTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        self.client.force_authenticate(self.admin)
+        self.evento = crear_evento(cupo_total=1)
+        self.ocupada = guardar_reserva(Reserva(evento=self.evento, espacio="Sala 1", solicitante="Cultura"))
+
+    def _encolar(self, cantidad):
+        return [
+            encolar_espera(EsperaReserva(evento=self.evento, espacio="Sala 1", solicitante=f"Área {indice:02d}"))
+            for indice in range(cantidad)
+        ]
+
+    def _posiciones_api(self):
+        response = self.client.get(reverse("espera-list"), {"evento": self.evento.pk, "page_size": 100})
+        self.assertEqual(response.status_code, 200)
+        return {item["id"]: item["posicion"] for item in response.data["results"]}
+
+    def test_posicion_ignora_retiradas_y_promovidas(self):
+        primera, segunda, tercera, cuarta = self._encolar(4)
+        retirar_espera(segunda)
+        self.ocupada.delete()  # Libera el cupo: se promueve la primera.
+
+        primera.refresh_from_db()
+        tercera.refresh_from_db()
+        cuarta.refresh_from_db()
+        self.assertEqual(primera.estado, EsperaReserva.PROMOVIDA)
+        self.assertEqual(posicion_en_espera(tercera), 1)
+        self.assertEqual(posicion_en_espera(cuarta), 2)
+        self.assertEqual(
+            self._posiciones_api(),
+            {primera.pk: None, segunda.pk: None, tercera.pk: 1, cuarta.pk: 2},
+        )
+
+    def test_posicion_por_cola_con_retiradas_intercaladas(self):
+        con_zonas = crear_evento(modo_aforo=Evento.MODO_ZONAS)
+        zona = ZonaEvento.objects.create(evento=con_zonas, nombre="Platea", cupo_total=1)
+        guardar_reserva(Reserva(evento=con_zonas, zona=zona, espacio="Sala 1", solicitante="Cultura"))
+        en_zona = [
+            encolar_espera(EsperaReserva(evento=con_zonas, zona=zona, espacio="Sala 1", solicitante=f"Zona {indice}"))
+            for indice in range(2)
+        ]
+        entradas = self._encolar(6)
+        for indice in (1, 2, 4):
+            retirar_espera(entradas[indice])
+
+        retirar_espera(en_zona[0])
+        self.assertEqual(posicion_en_espera(en_zona[1]), 1)
+        esperadas = {entradas[0].pk: 1, entradas[3].pk: 2, entradas[5].pk: 3}
+        posiciones = self._posiciones_api()
+        self.assertEqual({pk: posiciones[pk] for pk in esperadas}, esperadas)
+        for pk, posicion in esperadas.items():
+            self.assertEqual(posicion_en_espera(EsperaReserva.objects.get(pk=pk)), posicion)
+
+    def test_posicion_no_depende_de_los_filtros_del_listado(self):
+        primera, segunda = self._encolar(2)
+        response = self.client.get(reverse("espera-list"), {"evento": self.evento.pk, "ordering": "-turno"})
+        self.assertEqual(response.data["results"][0]["id"], segunda.pk)
+        self.assertEqual(response.data["results"][0]["posicion"], 2)
+
+    def test_listado_no_consulta_la_posicion_por_fila(self):
+        self._encolar(2)
+        # Filtro por evento + COUNT de la paginación + página con las posiciones.
+        with self.assertNumQueries(3):
+            self._posiciones_api()
+        self._encolar(8)
+        with self.assertNumQueries(3):
+            self._posiciones_api()
+
+
+@override_settings(CACHE_COMPARTIDA=True, API_CACHE_ANONIMA_CUPOS_SEGUNDOS=60)
+class CacheCuposTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.evento = crear_evento(cupo_total=2)
+
+    def reservar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            guardar_reserva(Reserva(evento=self.evento, espacio="Sala", solicitante="Cultura"))
+
+    def test_update_sin_filas_no_invalida(self):
+        Evento.objects.filter(pk=self.evento.pk).update(cupos_reservados=2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(_tomar_cupos(Evento, self.evento.pk, 1), 0)
+        self.assertEqual(callbacks, [])
+
+    def test_renovaciones_por_cupos_espaciadas(self):
+        inicial = cache_respuestas._version(Evento)
+        self.reservar()
+        primera = cache_respuestas._version(Evento)
+        self.assertNotEqual(primera, inicial)
+
+        # Dentro de la ventana el cambio queda pendiente y la versión se mantiene.
+        self.reservar()
+        self.assertEqual(cache_respuestas._version(Evento), primera)
+
+        # Vencida la ventana, la primera lectura aplica el cambio pendiente.
+        cache.delete(cache_respuestas._clave_ventana(Evento))
+        self.assertNotEqual(cache_respuestas._version(Evento), primera)
+
+    def test_sin_cache_compartida_no_cachea_anonimos(self):
+        url = reverse("evento-detail", args=[self.evento.pk])
+        for compartida, esperado in ((True, ["MISS", "HIT"]), (False, [None, None])):
+            cache.clear()
+            with self.subTest(compartida=compartida), self.settings(CACHE_COMPARTIDA=compartida):
+                respuestas = [APIClient().get(url) for _ in range(2)]
+                self.assertEqual([response.get("X-Cache") for response in respuestas], esperado)
+
+
+class RecalcularCuposTests(TestCase):
+    def test_conserva_los_cupos_retenidos(self):
+        evento = crear_evento(cupo_total=10)
+        retener_cupos(RetencionCupos(evento=evento, cupos_solicitados=4, solicitante="Cultura"))
+        Evento.objects.filter(pk=evento.pk).update(cupos_reservados=0)  # Contador desfasado.
+
+        recalcular_cupos()
+
+        evento.refresh_from_db()
+        self.assertEqual(evento.cupos_reservados, 4)
+        with self.assertRaises(ValidationError):
+            guardar_reserva(Reserva(evento=evento, espacio="Sala 1", solicitante="Deportes", cupos_solicitados=7))
+        guardar_reserva(Reserva(evento=evento, espacio="Sala 1", solicitante="Deportes", cupos_solicitados=6))
+
+    def test_suma_retenciones_por_zona_y_libera_las_vencidas(self):
+        evento = crear_evento(modo_aforo=Evento.MODO_ZONAS)
+        zona = ZonaEvento.objects.create(evento=evento, nombre="Platea", cupo_total=10)
+        guardar_reserva(Reserva(evento=evento, zona=zona, espacio="Sala 1", solicitante="Cultura", cupos_solicitados=2))
+        retener_cupos(RetencionCupos(evento=evento, zona=zona, cupos_solicitados=3, solicitante="Cultura"))
+        vencida = retener_cupos(RetencionCupos(evento=evento, zona=zona, cupos_solicitados=5, solicitante="Salud"))
+        RetencionCupos.objects.filter(pk=vencida.pk).update(expira=timezone.now())
+        ZonaEvento.objects.filter(pk=zona.pk).update(cupos_reservados=0)
+
+        recalcular_cupos()
+
+        zona.refresh_from_db()
+        evento.refresh_from_db()
+        self.assertEqual(zona.cupos_reservados, 5)
+        self.assertEqual(evento.cupos_reservados, 5)
+        self.assertFalse(RetencionCupos.objects.filter(pk=vencida.pk).exists())
+
+
+@override_settings(RESERVAS_BAJAS_RETENCION_DIAS=30)
+class RetencionesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.usuario = get_user_model().objects.create_user("vecina", "vecina@municipio.local", "clave-segura")
+        self.client.force_authenticate(self.usuario)
+        self.evento = crear_evento(cupo_total=10)
+
+    def _reservar(self, retencion):
+        datos = {
+            "evento": self.evento.pk,
+            "espacio": "Sala 1",
+            "solicitante": "vecina",
+            "cupos_solicitados": 2,
+            "retencion": str(retencion.token),
+        }
+        return self.client.post(reverse("reserva-list"), datos, format="json")
+
+    def test_confirma_con_una_retencion_vigente(self):
+        retencion = retener_cupos(RetencionCupos(evento=self.evento, cupos_solicitados=2, solicitante="vecina"))
+        response = self._reservar(retencion)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.cupos_reservados, 2)
+        self.assertFalse(RetencionCupos.objects.exists())
+
+    def test_rechaza_una_retencion_vencida(self):
+        retencion = retener_cupos(RetencionCupos(evento=self.evento, cupos_solicitados=2, solicitante="vecina"))
+        RetencionCupos.objects.filter(pk=retencion.pk).update(expira=timezone.now())
+
+        response = self._reservar(retencion)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("retencion", response.data)
+        # Aunque pase la validación, el motor no consume una retención vencida.
+        with self.assertRaises(ValidationError):
+            guardar_reserva(
+                Reserva(evento=self.evento, espacio="Sala 1", solicitante="vecina", cupos_solicitados=2),
+                retencion=retencion,
+            )
+        self.assertFalse(Reserva.objects.filter(solicitante="vecina").exists())
+        # Sus cupos los devuelve el barrido periódico.
+        self.assertEqual(liberar_retenciones_vencidas(), 1)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.cupos_reservados, 0)
+
+
+class BajasSincronizacionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+        self.evento = crear_evento()
+        for solicitante in ("Cultura", "Deportes"):
+            Reserva.objects.create(evento=self.evento, espacio="Sala", solicitante=solicitante).delete()
+        self.antigua, self.reciente = ReservaEliminada.objects.order_by("pk")
+        ReservaEliminada.objects.filter(pk=self.antigua.pk).update(eliminado=timezone.now() - timedelta(days=40))
+
+    def tipo_snapshot(self, desde):
+        response = self.client.get(
+            reverse("reserva-snapshot"),
+            {"evento": self.evento.pk, "desde": sincronizacion.a_cursor(desde)},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content[5]
+
+    def test_purga_solo_las_bajas_vencidas(self):
+        self.assertEqual(sincronizacion.purgar_bajas(lote=1), 1)
+        self.assertQuerySetEqual(ReservaEliminada.objects.all(), [self.reciente])
+
+    def test_cursor_anterior_a_la_retencion_recibe_snapshot_completo(self):
+        self.assertEqual(self.tipo_snapshot(timezone.now() - timedelta(days=31)), sincronizacion.TIPO_SNAPSHOT)
+        self.assertEqual(self.tipo_snapshot(timezone.now() - timedelta(days=1)), sincronizacion.TIPO_DELTA)
+
+
+class ConsultasApiTests(TestCase):
+    """Listado, detalle y exportación de reservas no consultan evento ni zona fila por fila."""
+
+    CONSULTAS = {"list": 3, "detail": 1, "export": 1}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+
+    def sembrar(self, cantidad):
+        for _ in range(cantidad):
+            evento = crear_evento(modo_aforo=Evento.MODO_ZONAS, estado=Evento.CONFIRMADO)
+            zona = ZonaEvento.objects.create(evento=evento, nombre="Platea", cupo_total=100)
+            reserva = Reserva.objects.create(
+                evento=evento, zona=zona, espacio="Sala", solicitante="Cultura", estado=Reserva.CONFIRMADA
+            )
+        return reserva
+
+    def test_consultas_constantes(self):
+        for cantidad in (2, 18):
+            reserva = self.sembrar(cantidad)
+            urls = {
+                "list": reverse("reserva-list"),
+                "detail": reverse("reserva-detail", args=[reserva.pk]),
+                "export": reverse("reserva-export"),
+            }
+            for accion, url in urls.items():
+                with self.subTest(accion, reservas=Reserva.objects.count()):
+                    with self.assertNumQueries(self.CONSULTAS[accion]):
+                        response = self.client.get(url)
+                        b"".join(response.streaming_content if response.streaming else [response.content])
+                    self.assertEqual(response.status_code, 200)
+
+
+class ImportacionTests(TestCase):
+    def test_errores_ordenados_por_linea_entre_lotes(self):
+        lineas = [
+            {"evento": 999, "nombre": "Platea"},
+            "no es JSON",
+            {"evento": 999, "nombre": "Palco"},
+            {"evento": 999, "nombre": "Galería"},
+            "tampoco",
+        ]
+        archivo = io.BytesIO("\n".join(
+            linea if isinstance(linea, str) else json.dumps(linea) for linea in lineas
+        ).encode("utf-8"))
+
+        resultado = importacion.importar("zonas", archivo, "ndjson", lote=2)
+
+        self.assertEqual(resultado["total_errores"], 5)
+        self.assertEqual([error["linea"] for error in resultado["errores"]], [1, 2, 3, 4, 5])
+
+    @override_settings(IMPORTACIONES_MAX_MB=0)
+    def test_archivo_grande_se_rechaza_sin_procesar(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_superuser("admin", "admin@municipio.local", "clave-segura")
+        )
+        archivo = SimpleUploadedFile("eventos.csv", b"titulo,fecha,hora,lugar\n", content_type="text/csv")
+
+        response = client.post(reverse("importacion-list"), {"tipo": "eventos", "archivo": archivo})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("importar_lotes", response.data["archivo"])
+
+
+class ConcurrenciaReservasTests(TransactionTestCase):
+    """Varias reservas simultáneas por el último cupo: solo una puede ganar."""
+
+    HILOS = 12
+
+    def _competir(self, evento, zona=None):
+        barrera = threading.Barrier(self.HILOS)
+        resultados = []
+
+        def reservar(indice):
+            try:
+                barrera.wait()
+                guardar_reserva(Reserva(
+                    evento=evento, zona=zona, espacio="Sala 1", solicitante=f"Área {indice:02d}",
+                ))
+                resultados.append("ok")
+            except ValidationError:
+                resultados.append("rechazada")
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=reservar, args=(indice,)) for indice in range(self.HILOS)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return resultados
+
+    def test_ultimo_cupo_del_evento_no_se_sobrevende(self):
+        evento = crear_evento(cupo_total=5)
+        for indice in range(4):
+            guardar_reserva(Reserva(evento=evento, espacio="Sala 1", solicitante=f"Previa {indice}"))
+
+        resultados = self._competir(evento)
+
+        self.assertEqual(resultados.count("ok"), 1)
+        self.assertEqual(resultados.count("rechazada"), self.HILOS - 1)
+        evento.refresh_from_db()
+        self.assertEqual(evento.cupos_reservados, 5)
+        self.assertEqual(Reserva.objects.filter(evento=evento).aggregate(total=Sum("cupos_solicitados"))["total"], 5)
+
+    def test_ultimo_cupo_de_la_zona_no_se_sobrevende(self):
+        evento = crear_evento(modo_aforo=Evento.MODO_ZONAS)
+        zona = ZonaEvento.objects.create(evento=evento, nombre="Platea", cupo_total=1)
+
+        resultados = self._competir(evento, zona)
+
+        self.assertEqual(resultados.count("ok"), 1)
+        zona.refresh_from_db()
+        self.assertEqual(zona.cupos_reservados, 1)
+        self.assertEqual(Reserva.objects.filter(zona=zona).count(), 1)
+
+    def test_baja_y_alta_simultaneas_en_la_zona_no_se_interbloquean(self):
+        evento = crear_evento(modo_aforo=Evento.MODO_ZONAS)
+        zona = ZonaEvento.objects.create(evento=evento, nombre="Platea", cupo_total=100)
+        previas = [
+            guardar_reserva(Reserva(evento=evento, zona=zona, espacio="Sala 1", solicitante=f"Previa {indice}"))
+            for indice in range(self.HILOS // 2)
+        ]
+        barrera = threading.Barrier(self.HILOS)
+        errores = []
+
+        def cancelar(reserva):
+            reserva.estado = Reserva.CANCELADA
+            guardar_reserva(reserva)
+
+        def reservar(indice):
+            guardar_reserva(Reserva(evento=evento, zona=zona, espacio="Sala 1", solicitante=f"Área {indice:02d}"))
+
+        def correr(funcion, argumento):
+            try:
+                barrera.wait()
+                with transaction.atomic():
+                    funcion(argumento)
+            except Exception as exc:
+                errores.append(exc)
+            finally:
+                connection.close()
+
+        tareas = [(cancelar, reserva) for reserva in previas] + [(reservar, i) for i in range(self.HILOS // 2)]
+        hilos = [threading.Thread(target=correr, args=tarea) for tarea in tareas]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        evento.refresh_from_db()
+        zona.refresh_from_db()
+        self.assertEqual((evento.cupos_reservados, zona.cupos_reservados), (self.HILOS // 2, self.HILOS // 2))
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+class IndicesTests(TestCase):
+    """
+    Las consultas de aforo y de listado deben resolverse con índices (EXPLAIN).
+
+    Siembra ``INDICES_FILAS`` reservas (20 000 por defecto) con ``generate_series``;
+    para la verificación con un millón de filas:
+
+        INDICES_FILAS=1000000 python manage.py test reservas.tests.IndicesTests
+    """
+
+    EVENTOS = 200
+
+    @classmethod
+    def setUpTestData(cls):
+        filas = int(os.getenv("INDICES_FILAS", "20000"))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO eventos_evento
+                    (titulo, fecha, hora, lugar, direccion, estado, descripcion, modo_aforo,
+                     cupo_total, cupos_reservados, creado, actualizado)
+                SELECT 'Índices ' || g, CURRENT_DATE + (g %% 365), TIME '08:00' + (g %% 12) * INTERVAL '1 hour',
+                       'Lugar ' || g, '', 'confirmado', '', 'general', 0, 0, NOW(), NOW()
+                FROM generate_series(1, %s) AS g
+                """,
+                [cls.EVENTOS],
+            )
+            cursor.execute(
+                """
+                WITH sembrados AS (SELECT array_agg(id ORDER BY id) AS ids FROM eventos_evento)
+                INSERT INTO reservas_reserva
+                    (codigo, espacio, fecha, hora, solicitante, evento_id, zona_id,
+                     cupos_solicitados, estado, notas, creado, actualizado)
+                SELECT 'idx' || g, 'Sala', e.fecha, e.hora, 'bench', e.id, NULL, 1,
+                       CASE WHEN g %% 10 = 0 THEN 'cancelada' ELSE 'confirmada' END, '', NOW(), NOW()
+                FROM sembrados
+                CROSS JOIN generate_series(1, %s) AS g
+                JOIN eventos_evento e ON e.id = sembrados.ids[1 + g %% array_length(sembrados.ids, 1)]
+                """,
+                [filas],
+            )
+            cursor.execute("ANALYZE eventos_evento")
+            cursor.execute("ANALYZE reservas_reserva")
+        cls.evento_id = Evento.objects.values_list("pk", flat=True).first()
+
+    def assertUsaIndice(self, queryset, tabla, indice):
+        plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+        nodos = list(_nodos(plan))
+        tipos = [nodo["Node Type"] for nodo in nodos if nodo.get("Relation Name") == tabla]
+        self.assertTrue(tipos, f"{tabla} no aparece en el plan: {plan}")
+        self.assertNotIn("Seq Scan", tipos, f"{tabla} se recorre completa: {plan}")
+        self.assertIn(indice, {nodo.get("Index Name") for nodo in nodos}, f"No se usa {indice}: {plan}")
+
+    def test_aforo_usa_el_indice_parcial(self):
+        aforo = (
+            Reserva.objects.filter(evento_id=self.evento_id, zona__isnull=True)
+            .exclude(estado=Reserva.CANCELADA)
+            .values("evento")
+            .annotate(total=Sum("cupos_solicitados"))
+        )
+        self.assertUsaIndice(aforo, "reservas_reserva", "reserva_aforo_idx")
+
+    def test_listado_de_reservas_usa_indice_de_fecha_y_hora(self):
+        listado = Reserva.objects.order_by("-fecha", "-hora", "-id")[:10]
+        self.assertUsaIndice(listado, "reservas_reserva", "reserva_fecha_hora_idx")
+
+    def test_listado_de_eventos_usa_indice_de_fecha_y_hora(self):
+        listado = Evento.objects.order_by("-fecha", "-hora", "-id")[:10]
+        self.assertUsaIndice(listado, "eventos_evento", "evento_fecha_hora_idx")
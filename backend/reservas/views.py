@@ -1,19 +1,24 @@
 ﻿from datetime import date
 
+from django.core.exceptions import ValidationError
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
 
 from .forms import ReservaForm
-from .models import Reserva
+from .models import EsperaReserva, Reserva
 
 
 def panel(request):
     # Panel de ejemplo conservado
     reservas_activas = []
     espacios = []
-    espera = []
+    espera = (
+        EsperaReserva.objects.filter(estado=EsperaReserva.ESPERANDO)
+        .select_related("evento", "zona")
+        .order_by("creado")[:10]
+    )
     return render(request, "reservas/index.html", {"reservas_activas": reservas_activas, "espacios": espacios, "espera": espera})
 
 
@@ -29,14 +34,25 @@ class ReservaDetail(DetailView):
     template_name = "reservas/reserva_detail.html"
 
 
-class ReservaCreate(CreateView):
+class ReservaFormMixin:
+    """Devuelve el formulario con errores si el motor de reservas rechaza el aforo."""
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ValidationError as exc:
+            form.add_error(None, exc)
+            return self.form_invalid(form)
+
+
+class ReservaCreate(ReservaFormMixin, CreateView):
     model = Reserva
     form_class = ReservaForm
     template_name = "reservas/reserva_form.html"
     success_url = reverse_lazy("reservas:reserva_list")
 
 
-class ReservaUpdate(UpdateView):
+class ReservaUpdate(ReservaFormMixin, UpdateView):
     model = Reserva
     form_class = ReservaForm
     template_name = "reservas/reserva_form.html"
@@ -0,0 +1,38 @@
+import PropTypes from "prop-types";
+
+/**
+ * Portada de un evento en la variante indicada (thumbnail, card o full).
+ * Ofrece WebP con respaldo JPEG y usa el original mientras no existan variantes.
+ */
+function EventImage({ evento, variant = "card", lazy = true, style }) {
+  if (!evento?.imagen_portada) {
+    return null;
+  }
+  const formatos = evento.imagen_variantes?.[variant];
+
+  return (
+    <picture>
+      {formatos?.webp && <source srcSet={formatos.webp} type="image/webp" />}
+      <img
+        src={formatos?.jpeg ?? evento.imagen_portada}
+        alt={`Imagen del lugar de ${evento.titulo}`}
+        loading={lazy ? "lazy" : "eager"}
+        decoding="async"
+        style={{ display: "block", width: "100%", objectFit: "cover", borderRadius: "8px", ...style }}
+      />
+    </picture>
+  );
+}
+
+EventImage.propTypes = {
+  evento: PropTypes.shape({
+    titulo: PropTypes.string,
+    imagen_portada: PropTypes.string,
+    imagen_variantes: PropTypes.object,
+  }).isRequired,
+  variant: PropTypes.oneOf(["thumbnail", "card", "full"]),
+  lazy: PropTypes.bool,
+  style: PropTypes.object,
+};
+
+export default EventImage;
@@ -1,5 +1,6 @@
 import { Link, useParams } from "react-router-dom";
 
+import EventImage from "../components/EventImage.jsx";
 import StatusPill from "../components/StatusPill.jsx";
 import { useAsync } from "../hooks/useAsync.js";
 import { useBackendStyles } from "../hooks/useBackendStyles.js";
@@ -55,11 +56,7 @@ function EventDetailPage() {
       </p>
       {data.imagen_portada && (
         <div style={{ marginTop: "12px" }}>
-          <img
-            src={data.imagen_portada}
-            alt={`Imagen del lugar de ${data.titulo}`}
-            style={{ maxWidth: "100%", borderRadius: "8px" }}
-          />
+          <EventImage evento={data} variant="full" lazy={false} />
         </div>
       )}
       {data.descripcion && (
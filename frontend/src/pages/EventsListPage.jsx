@@ -1,13 +1,14 @@
 import { useMemo, useState } from "react";
 import { Link } from "react-router-dom";
 
+import EventImage from "../components/EventImage.jsx";
 import PaginationControls from "../components/PaginationControls.jsx";
 import StatusPill from "../components/StatusPill.jsx";
 import { useAuth } from "../contexts/AuthContext.jsx";
 import { useAsync } from "../hooks/useAsync.js";
 import { useBackendStyles } from "../hooks/useBackendStyles.js";
 import { useDebounce } from "../hooks/useDebounce.js";
-import { listEventos } from "../services/eventsService.js";
+import { autocompleteEventos, listEventos } from "../services/eventsService.js";
 
 const ESTADO_OPTIONS = [
   { value: "", label: "Todos los estados" },
@@ -16,6 +17,7 @@ const ESTADO_OPTIONS = [
   { value: "confirmado", label: "Confirmado" },
 ];
 const PAGE_SIZE = 10;
+const MIN_SUGERENCIA = 2;
 
 function EventsListPage() {
   const { canEdit } = useAuth();
@@ -39,6 +41,15 @@ function EventsListPage() {
     () => listEventos(queryParams),
     [queryParams],
   );
+  // Sugerencias livianas mientras se escribe; el listado completo sigue esperando la pausa larga.
+  const textoSugerencias = useDebounce(filters.search.trim(), 150);
+  const { data: sugerencias } = useAsync(
+    () =>
+      textoSugerencias.length >= MIN_SUGERENCIA
+        ? autocompleteEventos(textoSugerencias)
+        : Promise.resolve([]),
+    [textoSugerencias],
+  );
   useBackendStyles("eventos");
 
   return (
@@ -77,11 +88,20 @@ function EventsListPage() {
         <input
           type="search"
           placeholder="Buscar por titulo o lugar"
+          list="eventos-sugerencias"
+          autoComplete="off"
           value={filters.search}
           onChange={(event) =>
             setFilters((prev) => ({ ...prev, search: event.target.value, page: 1 }))
           }
         />
+        <datalist id="eventos-sugerencias">
+          {(sugerencias ?? []).map((sugerencia) => (
+            <option key={sugerencia.id} value={sugerencia.titulo}>
+              {sugerencia.lugar}
+            </option>
+          ))}
+        </datalist>
         <select
           value={filters.estado}
           onChange={(event) =>
@@ -115,6 +135,11 @@ function EventsListPage() {
         <div className="grid" style={{ marginTop: "16px", gap: "16px" }}>
           {data.results.map((evento) => (
             <article key={evento.id} className="card">
+              <EventImage
+                evento={evento}
+                variant="thumbnail"
+                style={{ width: "160px", aspectRatio: "4 / 3", marginBottom: "8px" }}
+              />
               <div className="card__header">
                 <h3 className="card__title">{evento.titulo}</h3>
                 <span className="badge">
@@ -1,5 +1,6 @@
 import { Link, useNavigate } from "react-router-dom";
 
+import EventImage from "../components/EventImage.jsx";
 import Footer from "../components/Footer.jsx";
 import StatusPill from "../components/StatusPill.jsx";
 import { useAuth } from "../contexts/AuthContext.jsx";
@@ -90,6 +91,7 @@ function PublicLandingPage() {
               <div className="grid" style={{ marginTop: "12px", gap: "12px", gridTemplateColumns: "repeat(auto-fit, minmax(280px, 1fr))" }}>
                 {data.results.map((evento) => (
                   <article key={evento.id} className="card" style={{ display: "flex", flexDirection: "column", gap: "8px" }}>
+                    <EventImage evento={evento} variant="card" style={{ aspectRatio: "16 / 9" }} />
                     <div className="card__header" style={{ alignItems: "flex-start" }}>
                       <div>
                         <h3 className="card__title" style={{ margin: 0 }}>{evento.titulo}</h3>
@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { Link, useNavigate, useParams, useSearchParams } from "react-router-dom";
 
 import { useAuth } from "../contexts/AuthContext.jsx";
@@ -6,6 +6,8 @@ import { useBackendStyles } from "../hooks/useBackendStyles.js";
 import Header from "../components/Header.jsx";
 import {
   createReserva,
+  holdCupos,
+  releaseHold,
   retrieveReserva,
   updateReserva,
 } from "../services/reservationsService.js";
@@ -18,6 +20,9 @@ const ESTADO_OPTIONS = [
   { value: "cancelada", label: "Cancelada" },
 ];
 
+// Espera antes de apartar cupos para no retener en cada tecla del campo de cupos.
+const HOLD_DELAY_MS = 400;
+
 const EMPTY_VALUES = {
   espacio: "",
   solicitante: "",
@@ -56,12 +61,53 @@ function ReservationFormPage() {
   const [loadingInitial, setLoadingInitial] = useState(isEdit);
   const [eventOptions, setEventOptions] = useState([]);
   const [loadingEventos, setLoadingEventos] = useState(true);
+  const holdRef = useRef(null);
   const selectedEvent = useMemo(() => {
     const idNum = Number(formValues.evento);
     if (!idNum) return null;
     return eventOptions.find((ev) => ev.id === idNum) || null;
   }, [formValues.evento, eventOptions]);
 
+  // Apartar los cupos mientras se completa el formulario; se liberan al cambiar
+  // de evento, zona o cantidad y al salir de la pagina.
+  useEffect(() => {
+    if (isEdit || !selectedEvent) {
+      return undefined;
+    }
+    const usesZones = selectedEvent.modo_aforo === "zonas";
+    const cupos = Number(formValues.cupos_solicitados);
+    if ((usesZones && !formValues.zona) || !Number.isInteger(cupos) || cupos <= 0) {
+      return undefined;
+    }
+    let active = true;
+    const timer = setTimeout(() => {
+      holdCupos({
+        evento: selectedEvent.id,
+        zona: usesZones ? formValues.zona : null,
+        cupos_solicitados: cupos,
+      })
+        .then((hold) => {
+          if (active) {
+            holdRef.current = hold;
+          } else {
+            releaseHold(hold.token).catch(() => {});
+          }
+        })
+        // Sin retencion la reserva igual valida el aforo al guardar.
+        .catch(() => {});
+    }, HOLD_DELAY_MS);
+
+    return () => {
+      active = false;
+      clearTimeout(timer);
+      const hold = holdRef.current;
+      holdRef.current = null;
+      if (hold) {
+        releaseHold(hold.token).catch(() => {});
+      }
+    };
+  }, [isEdit, selectedEvent, formValues.zona, formValues.cupos_solicitados]);
+
   useEffect(() => {
     if (!isEdit) {
       return;
@@ -217,7 +263,10 @@ function ReservationFormPage() {
         await updateReserva(id, payload);
         setFeedback({ type: "success", message: "Reserva actualizada." });
       } else {
+        payload.retencion = holdRef.current?.token;
         await createReserva(payload);
+        // La reserva consumio la retencion: no hay nada que liberar.
+        holdRef.current = null;
         setFeedback({ type: "success", message: "Reserva creada correctamente." });
         setFormValues(EMPTY_VALUES);
       }
@@ -236,7 +285,11 @@ function ReservationFormPage() {
             ? messages.join(" ")
             : String(messages);
 
-          if (field === "non_field_errors") {
+          if (field === "retencion") {
+            // Retencion vencida: el proximo intento valida el aforo sin ella.
+            holdRef.current = null;
+            serverMessage = normalizedMessage;
+          } else if (field === "non_field_errors") {
             serverMessage = normalizedMessage;
           } else {
             serverErrors[field] = normalizedMessage;
@@ -22,6 +22,16 @@ export async function listEventos(params = {}) {
   return normalizeListResponse(response.data);
 }
 
+export async function autocompleteEventos(q, limite = 8) {
+  const response = await apiClient.get("eventos/autocomplete/", { params: { q, limite } });
+  return response.data;
+}
+
+export async function getCalendarioEventos(mes) {
+  const response = await apiClient.get("eventos/calendario/", { params: { mes } });
+  return response.data;
+}
+
 export async function retrieveEvento(id) {
   if (!id) {
     throw new Error("ID de evento requerido.");
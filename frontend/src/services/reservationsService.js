@@ -19,6 +19,15 @@ export async function createReserva(payload) {
   return response.data;
 }
 
+export async function holdCupos(payload) {
+  const response = await apiClient.post("reservas/retenciones/", payload);
+  return response.data;
+}
+
+export async function releaseHold(token) {
+  return apiClient.delete("reservas/retenciones/", { params: { token } });
+}
+
 export async function updateReserva(id, payload) {
   const response = await apiClient.put(`reservas/${id}/`, payload);
   return response.data;